@@ -0,0 +1,128 @@
+"""Command line entry point, ``flasx <command>`` or ``python -m flasx.cli``."""
+
+import argparse
+import asyncio
+import datetime
+
+from flasx import migrations
+from flasx import models
+from flasx.core import config
+from flasx.core import parcel_events
+from flasx.core import station_stats
+
+
+async def migrate_upgrade(args):
+    applied = await migrations.upgrade(models.engine, target=args.to)
+    for m in applied:
+        print(f"Applied migration {m.version:04d}: {m.description}")
+
+    version = await migrations.get_current_version(models.engine)
+    if not applied:
+        print(f"Database is up to date at version {version}")
+
+
+async def migrate_current(args):
+    version = await migrations.get_current_version(models.engine)
+    print(f"Current version: {version}")
+    print(f"Head version: {migrations.head_version()}")
+
+
+async def migrate_history(args):
+    applied = {
+        row["version"]: row for row in await migrations.get_history(models.engine)
+    }
+    for m in migrations.MIGRATIONS:
+        row = applied.get(m.version)
+        applied_at = row["applied_at"].isoformat() if row else "pending"
+        print(f"{m.version:04d}  {applied_at:26}  {m.description}")
+
+
+async def events_compact(args):
+    days = args.days
+    if days is None:
+        days = config.get_settings().PARCEL_EVENT_RETENTION_DAYS
+
+    before = datetime.datetime.now() - datetime.timedelta(days=days)
+    deleted = await parcel_events.compact_events(models.async_session, before)
+    print(f"Deleted {deleted} parcel events older than {before:%Y-%m-%d}")
+
+
+async def events_partitions(args):
+    if models.engine.dialect.name != "postgresql":
+        print("Parcel event partitions are only supported on PostgreSQL")
+        return
+
+    start = datetime.date.today().replace(day=1)
+    async with models.engine.begin() as connection:
+        names = await connection.run_sync(
+            parcel_events.create_monthly_partitions, start, args.months
+        )
+    for name in names:
+        print(f"Partition {name} is ready")
+
+
+async def stats_rebuild(args):
+    async with models.engine.begin() as connection:
+        for statement in station_stats.rebuild_statements(models.engine.dialect.name):
+            await connection.execute(statement)
+    print("Rebuilt the station parcel counts")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="flasx")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Manage the database schema")
+    migrate_commands = migrate.add_subparsers(dest="migrate_command", required=True)
+
+    upgrade = migrate_commands.add_parser("upgrade", help="Apply pending migrations")
+    upgrade.add_argument("--to", type=int, default=None, help="Target version")
+    upgrade.set_defaults(handler=migrate_upgrade)
+
+    current = migrate_commands.add_parser("current", help="Show the schema version")
+    current.set_defaults(handler=migrate_current)
+
+    history = migrate_commands.add_parser("history", help="List the migrations")
+    history.set_defaults(handler=migrate_history)
+
+    events = commands.add_parser("events", help="Maintain the parcel event log")
+    events_commands = events.add_subparsers(dest="events_command", required=True)
+
+    compact = events_commands.add_parser(
+        "compact", help="Delete superseded events older than the retention"
+    )
+    compact.add_argument("--days", type=int, default=None, help="Retention in days")
+    compact.set_defaults(handler=events_compact)
+
+    partitions = events_commands.add_parser(
+        "partitions", help="Create the upcoming monthly partitions"
+    )
+    partitions.add_argument("--months", type=int, default=3)
+    partitions.set_defaults(handler=events_partitions)
+
+    stats = commands.add_parser("stats", help="Maintain the station rollups")
+    stats_commands = stats.add_subparsers(dest="stats_command", required=True)
+
+    rebuild = stats_commands.add_parser(
+        "rebuild", help="Recount the station parcel counts from the parcels"
+    )
+    rebuild.set_defaults(handler=stats_rebuild)
+
+    return parser
+
+
+async def run(args):
+    await models.init_engines()
+    try:
+        await args.handler(args)
+    finally:
+        await models.close_db()
+
+
+def main(argv: list[str] | None = None):
+    args = get_parser().parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Read-through cache for public tracking responses.
+
+Backends store serialized values under string keys with a TTL:
+``MemoryCache`` is a per-process LRU bounded by its number of entries, and
+``RedisCache`` shares entries between workers through a Redis-protocol
+server. ``TrackingCache`` keeps the hit and miss counters.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from flasx.core import config
+from flasx.core import resp
+from flasx.schemas import parcel_schema
+
+
+class MemoryCache:
+    name = "memory"
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    values.append(None)
+                elif entry[0] <= now:
+                    del self._entries[key]
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+        return values
+
+    async def set_many(self, items: dict[str, str]):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def delete(self, keys: list[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def size(self) -> int | None:
+        return len(self._entries)
+
+    async def close(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "flasx:"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.connection = resp.RespConnection(url)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        values = await self.connection.execute(
+            "MGET", *[self.prefix + key for key in keys]
+        )
+        return [value.decode() if value is not None else None for value in values]
+
+    async def set_many(self, items: dict[str, str]):
+        ttl = max(int(self.ttl * 1000), 1)
+        for key, value in items.items():
+            await self.connection.execute("SET", self.prefix + key, value, "PX", ttl)
+
+    async def delete(self, keys: list[str]):
+        await self.connection.execute("DEL", *[self.prefix + key for key in keys])
+
+    def size(self) -> int | None:
+        return None
+
+    async def close(self):
+        await self.connection.close()
+
+
+class NullCache:
+    """Backend used when the cache is disabled, every lookup misses."""
+
+    name = "none"
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        return [None] * len(keys)
+
+    async def set_many(self, items: dict[str, str]):
+        pass
+
+    async def delete(self, keys: list[str]):
+        pass
+
+    def size(self) -> int | None:
+        return 0
+
+    async def close(self):
+        pass
+
+
+class TrackingCache:
+    """Cache of ``ParcelTracking`` responses keyed by tracking number."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(tracking_number: str) -> str:
+        return f"track:{tracking_number}"
+
+    async def get_many(
+        self, tracking_numbers: list[str]
+    ) -> dict[str, parcel_schema.ParcelTracking]:
+        """Return the cached responses, missing numbers are left out."""
+        try:
+            values = await self.backend.get_many(
+                [self.key(number) for number in tracking_numbers]
+            )
+        except (resp.RespError, ConnectionError, OSError, asyncio.TimeoutError):
+            # an unavailable cache must not break tracking
+            self.errors += 1
+            values = [None] * len(tracking_numbers)
+
+        found = {}
+        for tracking_number, value in zip(tracking_numbers, values):
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                found[tracking_number] = (
+                    parcel_schema.ParcelTracking.model_validate_json(value)
+                )
+        return found
+
+    async def get(self, tracking_number: str) -> parcel_schema.ParcelTracking | None:
+        return (await self.get_many([tracking_number])).get(tracking_number)
+
+    async def set_many(self, trackings: list[parcel_schema.ParcelTracking]):
+        if not trackings:
+            return
+
+        try:
+            await self.backend.set_many(
+                {
+                    self.key(tracking.tracking_number): tracking.model_dump_json()
+                    for tracking in trackings
+                }
+            )
+        except (resp.RespError, ConnectionError, OSError, asyncio.TimeoutError):
+            self.errors += 1
+
+    async def set(self, tracking: parcel_schema.ParcelTracking):
+        await self.set_many([tracking])
+
+    async def invalidate(self, *tracking_numbers: str):
+        if not tracking_numbers:
+            return
+
+        self.invalidations += len(tracking_numbers)
+        try:
+            await self.backend.delete([self.key(number) for number in tracking_numbers])
+        except (resp.RespError, ConnectionError, OSError, asyncio.TimeoutError):
+            self.errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "entries": self.backend.size(),
+        }
+
+    async def close(self):
+        await self.backend.close()
+
+
+tracking_cache: TrackingCache = None
+
+
+def get_tracking_cache() -> TrackingCache:
+    """Get the process-wide tracking cache, created on first use."""
+    global tracking_cache
+    if tracking_cache is None:
+        settings = config.get_settings()
+        if settings.TRACKING_CACHE_BACKEND == "redis":
+            backend = RedisCache(settings.REDIS_URL, settings.TRACKING_CACHE_TTL)
+        elif settings.TRACKING_CACHE_BACKEND == "memory":
+            backend = MemoryCache(
+                settings.TRACKING_CACHE_TTL, settings.TRACKING_CACHE_MAX_ENTRIES
+            )
+        else:
+            backend = NullCache()
+        tracking_cache = TrackingCache(backend)
+
+    return tracking_cache
+
+
+async def close_tracking_cache():
+    global tracking_cache
+    if tracking_cache is not None:
+        await tracking_cache.close()
+        tracking_cache = None
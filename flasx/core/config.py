@@ -1,10 +1,91 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     SQLDB_URL: str
+    SQLDB_ECHO: bool = False
+
+    # Connection pool, ignored for in-memory SQLite
+    SQLDB_POOL_SIZE: int = 10
+    SQLDB_MAX_OVERFLOW: int = 20
+    SQLDB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    SQLDB_POOL_RECYCLE: int = 30 * 60  # 30 minutes
+    SQLDB_POOL_PRE_PING: bool = True
+
+    # Apply pending migrations on startup, disable when running many workers
+    # and run `flasx migrate upgrade` before the rollout instead
+    SQLDB_AUTO_MIGRATE: bool = True
+
+    # Read replica used by GET endpoints, reads go to the primary when unset
+    SQLDB_READ_URL: str | None = None
+    # Seconds a client's reads stay on the primary after it writes
+    SQLDB_READ_AFTER_WRITE_WINDOW: float = 5.0
+
+    # SQLite performance profile: WAL, one writer connection and a reader pool
+    SQLITE_PERFORMANCE_MODE: bool = False
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256 MB
+    SQLITE_CACHE_SIZE: int = -64 * 1024  # negative is KiB, 64 MB
+    SQLITE_READ_POOL_SIZE: int = 8
+
     SECRET_KEY: str = "secret"
 
+    # Node id (0-46655) in generated tracking numbers, leased from the
+    # database per process when unset
+    TRACKING_NODE_ID: int | None = None
+    # Seconds a leased node id stays held without renewal
+    TRACKING_NODE_LEASE_SECONDS: float = 60.0
+
+    # Partition parcel_event by month on PostgreSQL, see `flasx events`
+    PARCEL_EVENT_PARTITIONING: bool = False
+    # Days of full parcel history kept by `flasx events compact`
+    PARCEL_EVENT_RETENTION_DAYS: int = 365
+
+    # Queue single parcel status updates and commit them in batches, see
+    # flasx/core/status_queue.py. "accepted" answers once queued, "committed"
+    # once the batch holding the update is committed
+    STATUS_WRITE_BEHIND: bool = False
+    STATUS_WRITE_BEHIND_DURABILITY: Literal["accepted", "committed"] = "committed"
+    STATUS_FLUSH_INTERVAL_MS: int = 50
+    STATUS_FLUSH_MAX_ITEMS: int = 1000
+
+    # Files written by export jobs, and the number of jobs run concurrently
+    EXPORT_DIR: str = "./data/exports"
+    EXPORT_WORKERS: int = 2
+    # Seconds without progress before another worker takes over a running job
+    EXPORT_JOB_STALE_AFTER: int = 600
+
+    # JSON rate card used for quotes, see flasx/core/pricing.py for the fields
+    RATE_CARD_PATH: str | None = None
+
+    # Seconds between checks of the station links for changes made by other
+    # workers, see flasx/core/station_routing.py
+    ROUTING_REFRESH_INTERVAL: float = 5.0
+    # Seconds between checks of the station version for changes made by
+    # other workers, see flasx/core/station_directory.py
+    STATION_DIRECTORY_REFRESH_INTERVAL: float = 5.0
+
+    # Customer search: "auto" uses the FTS5 or pg_trgm index of the database,
+    # "like" scans, see flasx/core/customer_search.py
+    CUSTOMER_SEARCH_BACKEND: Literal["auto", "like"] = "auto"
+
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Cache of public tracking responses: "memory" per process, "redis" shared
+    # between workers, or "none"
+    TRACKING_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    TRACKING_CACHE_TTL: float = 30.0  # seconds
+    TRACKING_CACHE_MAX_ENTRIES: int = 100_000
+
+    # Live tracking fan-out: "memory" within the process, "redis" across
+    # workers; messages buffered per client before the oldest are dropped
+    LIVE_BROKER_BACKEND: Literal["memory", "redis"] = "memory"
+    LIVE_CLIENT_BUFFER: int = 100
+    LIVE_KEEPALIVE: float = 15.0  # seconds between SSE keep-alive comments
+
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 5 * 60  # 5 minutes
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 7 * 24 * 60  # 7 days
 
@@ -0,0 +1,199 @@
+"""Indexed customer search on name and email.
+
+Searches keep the substring semantics of ``ilike '%text%'`` but are served by
+trigram indexes, kept in sync by the database on every customer write:
+
+- SQLite: ``customer_fts``, an external content FTS5 table with the
+  ``trigram`` tokenizer, filled by triggers on ``customer``; results are
+  ranked by BM25 with the name weighted above the email;
+- PostgreSQL: ``pg_trgm`` GIN indexes on ``name`` and ``email``, which serve
+  ``ilike`` directly; results are ranked by trigram similarity.
+
+Trigram indexes cannot serve text shorter than three characters, such text
+falls back to a scan with ``LikeSearch`` (which is also the backend for other
+databases, or when ``CUSTOMER_SEARCH_BACKEND`` is "like"). Autocomplete ranks
+names and emails starting with the text first.
+
+The DDL runs with ``create_all`` of the customer table and in migration 12.
+"""
+
+from sqlalchemy import DDL, case, column, event, func, literal_column, or_, table
+from sqlmodel import select
+
+from flasx.core import config
+from flasx.models import Customer
+
+MIN_TRIGRAM_LENGTH = 3
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS customer_fts USING fts5("
+    "name, email, content='customer', content_rowid='id', "
+    "tokenize='trigram case_sensitive 0')",
+    "CREATE TRIGGER IF NOT EXISTS customer_fts_insert AFTER INSERT ON customer "
+    "BEGIN INSERT INTO customer_fts(rowid, name, email) "
+    "VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_fts_delete AFTER DELETE ON customer "
+    "BEGIN INSERT INTO customer_fts(customer_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS customer_fts_update "
+    "AFTER UPDATE OF name, email ON customer "
+    "BEGIN INSERT INTO customer_fts(customer_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO customer_fts(rowid, name, email) "
+    "VALUES (new.id, new.name, new.email); END",
+]
+
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_customer_name_trgm "
+    "ON customer USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_customer_email_trgm "
+    "ON customer USING gin (email gin_trgm_ops)",
+]
+
+DDL_STATEMENTS = {"sqlite": SQLITE_DDL, "postgresql": POSTGRESQL_DDL}
+
+for dialect_name, statements in DDL_STATEMENTS.items():
+    for statement in statements:
+        event.listen(
+            Customer.__table__,
+            "after_create",
+            DDL(statement).execute_if(dialect=dialect_name),
+        )
+event.listen(
+    Customer.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS customer_fts").execute_if(dialect="sqlite"),
+)
+
+customer_fts = table("customer_fts", column("rowid"), column("rank"))
+
+
+def escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class LikeSearch:
+    """Scans with ``ilike``, for short text and databases without an index."""
+
+    name = "like"
+
+    def match(self, text: str):
+        """Condition on ``Customer`` for the customers matching ``text``."""
+        pattern = f"%{escape_like(text)}%"
+        return or_(
+            Customer.name.ilike(pattern, escape="\\"),
+            Customer.email.ilike(pattern, escape="\\"),
+        )
+
+    def select_matches(self, text: str):
+        return select(Customer).where(self.match(text))
+
+    def ranking(self, text: str) -> list:
+        """Order of the matches, best first."""
+        pattern = f"{escape_like(text)}%"
+        starts = or_(
+            Customer.name.ilike(pattern, escape="\\"),
+            Customer.email.ilike(pattern, escape="\\"),
+        )
+        return [case((starts, 0), else_=1)]
+
+    def search(self, text: str, limit: int, is_active: bool | None = None):
+        """Select the customers matching ``text``, best first."""
+        query = self.select_matches(text)
+        if is_active is not None:
+            query = query.where(Customer.is_active == is_active)
+        return query.order_by(*self.ranking(text), Customer.name).limit(limit)
+
+    async def autocomplete(self, session, text: str, limit: int) -> list[Customer]:
+        """Active customers for a typeahead, names starting with ``text`` first.
+
+        The name prefix is a range scan of ``ix_customer_lower_name``, ranked
+        matches anywhere in the name or email fill the rest.
+        """
+        prefix = text.lower()
+        lower_name = func.lower(Customer.name)
+        result = await session.exec(
+            select(Customer)
+            .where(
+                lower_name >= prefix,
+                lower_name < prefix + "\uffff",
+                lower_name.startswith(prefix, autoescape=True),
+                Customer.is_active == True,
+            )
+            .order_by(lower_name)
+            .limit(limit)
+        )
+        customers = list(result.all())
+
+        if len(customers) < limit:
+            query = self.search(text, limit, is_active=True)
+            if customers:
+                query = query.where(
+                    Customer.id.not_in([customer.id for customer in customers])
+                )
+            result = await session.exec(query.limit(limit - len(customers)))
+            customers += result.all()
+
+        return customers
+
+
+class Fts5Search(LikeSearch):
+    name = "fts5"
+
+    @staticmethod
+    def fts_match(text: str):
+        phrase = '"' + text.replace('"', '""') + '"'
+        return literal_column("customer_fts").op("MATCH")(phrase)
+
+    def match(self, text: str):
+        if len(text) < MIN_TRIGRAM_LENGTH:
+            return super().match(text)
+        return Customer.id.in_(select(customer_fts.c.rowid).where(self.fts_match(text)))
+
+    def select_matches(self, text: str):
+        if len(text) < MIN_TRIGRAM_LENGTH:
+            return super().select_matches(text)
+        return (
+            select(Customer)
+            .join(customer_fts, customer_fts.c.rowid == Customer.id)
+            .where(self.fts_match(text))
+        )
+
+    def ranking(self, text: str) -> list:
+        if len(text) < MIN_TRIGRAM_LENGTH:
+            return super().ranking(text)
+        # lower is better, a name match weighs twice an email match
+        return [func.bm25(literal_column("customer_fts"), 2.0, 1.0)]
+
+
+class TrigramSearch(LikeSearch):
+    name = "pg_trgm"
+
+    def ranking(self, text: str) -> list:
+        if len(text) < MIN_TRIGRAM_LENGTH:
+            return super().ranking(text)
+        return [
+            func.greatest(
+                func.similarity(Customer.name, text),
+                func.similarity(func.coalesce(Customer.email, ""), text),
+            ).desc()
+        ]
+
+
+BACKENDS = {"sqlite": Fts5Search, "postgresql": TrigramSearch}
+
+
+def get_search_backend(dialect_name: str) -> LikeSearch:
+    """The search backend for a database dialect."""
+    if config.get_settings().CUSTOMER_SEARCH_BACKEND == "like":
+        return LikeSearch()
+    return BACKENDS.get(dialect_name, LikeSearch)()
+
+
+def setup_statements(dialect_name: str) -> list[str]:
+    """Statements creating the search index of an existing customer table."""
+    statements = list(DDL_STATEMENTS.get(dialect_name, []))
+    if dialect_name == "sqlite":
+        statements.append("INSERT INTO customer_fts(customer_fts) VALUES ('rebuild')")
+    return statements
@@ -0,0 +1,109 @@
+"""Row streaming and serialization for exports.
+
+Rows are read with a server-side cursor in partitions of ``yield_per`` and
+serialized straight from the result tuples, so memory stays constant however
+many rows are exported.
+"""
+
+import csv
+import datetime
+import decimal
+import enum
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import Select
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+YIELD_PER = 1000
+
+
+def to_text(value):
+    """Convert a column value to its JSON/CSV representation."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+async def stream_rows(
+    session_factory, query: Select, yield_per: int = YIELD_PER
+) -> AsyncIterator[list]:
+    """Yield the rows of ``query`` in partitions, from a server-side cursor."""
+    async with session_factory() as session:
+        result = await session.stream(query.execution_options(yield_per=yield_per))
+        async for partition in result.partitions():
+            yield partition
+
+
+def ndjson_lines(columns: list[str], rows: Iterable) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, map(to_text, row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def csv_lines(rows: Iterable, columns: list[str] | None = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if columns is not None:
+        writer.writerow(columns)
+    writer.writerows(map(to_text, row) for row in rows)
+    return buffer.getvalue()
+
+
+async def serialize(
+    partitions: AsyncIterator[list], columns: list[str], format: str
+) -> AsyncIterator[bytes]:
+    """Serialize row partitions as NDJSON or CSV (with a header row)."""
+    if format == "csv":
+        yield csv_lines([], columns).encode()
+
+    async for rows in partitions:
+        if format == "csv":
+            yield csv_lines(rows).encode()
+        else:
+            yield ndjson_lines(columns, rows).encode()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header accepts gzip, q-values included.
+
+    ``gzip;q=0`` refuses it; without a gzip entry the ``*`` entry decides.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,361 @@
+"""Background export jobs writing compressed CSV or Parquet files.
+
+``POST /v1/exports`` stores an ``ExportJob`` and hands its id to a pool of
+``EXPORT_WORKERS`` asyncio workers. A worker counts the matching rows, reads
+them from a server-side cursor in partitions and appends every partition to
+``EXPORT_DIR`` as CSV rows (gzip) or a Parquet row group, updating the
+progress of the job as it goes.
+
+Every process queues the pending and running jobs on start, but a job only
+runs where it is claimed: one UPDATE moves it from pending to running, so
+several workers or replicas never run the same job. A running job is taken
+over only once its heartbeat, refreshed with the progress, is older than
+``EXPORT_JOB_STALE_AFTER`` seconds. Jobs still running on shutdown are put
+back to pending for the next start.
+
+Parquet needs the optional ``pyarrow`` dependency (``flasx[parquet]``).
+"""
+
+import asyncio
+import csv
+import datetime
+import decimal
+import gzip
+import json
+import os
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    Integer,
+    Numeric,
+    and_,
+    func,
+    or_,
+    select,
+)
+from sqlmodel import update
+
+from flasx.core import config
+from flasx.core import export
+from flasx.models import Customer, ExportJob, ExportStatus, Parcel, Station
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# exportable tables and the columns they can be filtered on
+ENTITIES = {
+    "parcels": (
+        Parcel,
+        {
+            "status",
+            "sender_id",
+            "receiver_id",
+            "origin_station_id",
+            "destination_station_id",
+            "vehicle_id",
+            "delivery_staff_id",
+        },
+    ),
+    "customers": (Customer, {"is_active"}),
+    "stations": (Station, {"city", "state", "is_active"}),
+}
+
+FILE_EXTENSIONS = {"csv": "csv.gz", "parquet": "parquet"}
+MEDIA_TYPES = {"csv": "application/gzip", "parquet": "application/vnd.apache.parquet"}
+
+YIELD_PER = 10_000
+
+
+def has_parquet() -> bool:
+    return pyarrow is not None
+
+
+def get_unknown_filters(entity: str, filters: dict) -> list[str]:
+    _, allowed = ENTITIES[entity]
+    return sorted(set(filters) - allowed)
+
+
+def build_query(entity: str, filters: dict):
+    """Select the plain columns of ``entity`` matching ``filters``, by ID.
+
+    Raises ``ValueError`` for a value not valid for an enum column.
+    """
+    model, _ = ENTITIES[entity]
+    table = model.__table__
+    query = select(*table.columns)
+    for name, value in filters.items():
+        column = table.c[name]
+        enum_class = getattr(column.type, "enum_class", None)
+        if enum_class is not None and value is not None:
+            value = enum_class(value)
+        query = query.where(column == value)
+    return query.order_by(table.c.id)
+
+
+class CsvWriter:
+    """Gzip compressed CSV with a header row."""
+
+    def __init__(self, path: str, columns: list):
+        self.file = gzip.open(path, "wt", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column.name for column in columns])
+
+    def write(self, rows: list):
+        self.writer.writerows(map(export.to_text, row) for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Parquet file with one row group per partition."""
+
+    def __init__(self, path: str, columns: list):
+        self.names = [column.name for column in columns]
+        self.schema = pyarrow.schema(
+            [(column.name, self.arrow_type(column.type)) for column in columns]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression="zstd"
+        )
+
+    @staticmethod
+    def arrow_type(column_type):
+        if isinstance(column_type, Boolean):
+            return pyarrow.bool_()
+        if isinstance(column_type, Integer):
+            return pyarrow.int64()
+        if isinstance(column_type, Float):
+            return pyarrow.float64()
+        if isinstance(column_type, Numeric):
+            return pyarrow.decimal128(38, 9)
+        if isinstance(column_type, DateTime):
+            return pyarrow.timestamp("us")
+        return pyarrow.string()
+
+    def write(self, rows: list):
+        columns = {name: [] for name in self.names}
+        for row in rows:
+            for name, value in zip(self.names, row):
+                if isinstance(value, dict):
+                    value = json.dumps(value)
+                elif not isinstance(value, (datetime.datetime, decimal.Decimal)):
+                    value = export.to_text(value)
+                columns[name].append(value)
+
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter}
+
+
+class ExportWorkers:
+    """Pool of asyncio tasks running export jobs one at a time each."""
+
+    def __init__(
+        self,
+        session_factory,
+        directory: str,
+        workers: int,
+        read_session_factory=None,
+    ):
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+        self.directory = directory
+        self.workers = workers
+
+        self.queue: asyncio.Queue[int] = asyncio.Queue()
+        self.tasks: list[asyncio.Task] = []
+        # ids of the jobs claimed by this process
+        self.running: set[int] = set()
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        # resume the jobs of a previous process, they run where claimed
+        async with self.session_factory() as session:
+            result = await session.exec(
+                select(ExportJob.id)
+                .where(
+                    ExportJob.status.in_([ExportStatus.PENDING, ExportStatus.RUNNING])
+                )
+                .order_by(ExportJob.id)
+            )
+            for (job_id,) in result.all():
+                self.submit(job_id)
+
+        self.tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers, running jobs are resumed on the next start."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        if self.running:
+            async with self.session_factory() as session:
+                await session.exec(
+                    update(ExportJob)
+                    .where(
+                        ExportJob.id.in_(self.running),
+                        ExportJob.status == ExportStatus.RUNNING,
+                    )
+                    .values(status=ExportStatus.PENDING)
+                )
+                await session.commit()
+            self.running = set()
+
+    def submit(self, job_id: int):
+        self.queue.put_nowait(job_id)
+
+    async def _run(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self.run_job(job_id)
+            finally:
+                self.queue.task_done()
+
+    async def _update_job(self, job_id: int, **values):
+        async with self.session_factory() as session:
+            await session.exec(
+                update(ExportJob)
+                .where(ExportJob.id == job_id)
+                .values(heartbeat_at=datetime.datetime.now(), **values)
+            )
+            await session.commit()
+
+    async def claim(self, job_id: int):
+        """Mark a pending or stale running job as running by this process.
+
+        Returns the entity, format and filters of the job, ``None`` when it
+        is done or run elsewhere.
+        """
+        now = datetime.datetime.now()
+        stale = now - datetime.timedelta(
+            seconds=config.get_settings().EXPORT_JOB_STALE_AFTER
+        )
+        async with self.session_factory() as session:
+            result = await session.exec(
+                update(ExportJob)
+                .where(
+                    ExportJob.id == job_id,
+                    or_(
+                        ExportJob.status == ExportStatus.PENDING,
+                        and_(
+                            ExportJob.status == ExportStatus.RUNNING,
+                            or_(
+                                ExportJob.heartbeat_at.is_(None),
+                                ExportJob.heartbeat_at < stale,
+                            ),
+                        ),
+                    ),
+                )
+                .values(
+                    status=ExportStatus.RUNNING,
+                    rows_written=0,
+                    started_at=now,
+                    heartbeat_at=now,
+                )
+                .returning(ExportJob.entity, ExportJob.format, ExportJob.filters)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.first()
+            await session.commit()
+        return job
+
+    async def run_job(self, job_id: int):
+        job = await self.claim(job_id)
+        if job is None:
+            return
+
+        # left in ``running`` when cancelled, for ``close`` to put it back
+        self.running.add(job_id)
+        await self._write_job(job_id, job)
+        self.running.discard(job_id)
+
+    async def _write_job(self, job_id: int, job):
+        file_name = f"{job.entity}-{job_id}.{FILE_EXTENSIONS[job.format]}"
+        path = os.path.join(self.directory, file_name)
+        part_path = path + ".part"
+
+        try:
+            query = build_query(job.entity, job.filters)
+            async with self.read_session_factory() as session:
+                result = await session.exec(
+                    select(func.count()).select_from(query.subquery())
+                )
+                (total_rows,) = result.one()
+            await self._update_job(job_id, total_rows=total_rows)
+
+            columns = list(query.selected_columns)
+            writer = await asyncio.to_thread(WRITERS[job.format], part_path, columns)
+            rows_written = 0
+            try:
+                async for rows in export.stream_rows(
+                    self.read_session_factory, query, yield_per=YIELD_PER
+                ):
+                    await asyncio.to_thread(writer.write, rows)
+                    rows_written += len(rows)
+                    await self._update_job(job_id, rows_written=rows_written)
+            finally:
+                await asyncio.to_thread(writer.close)
+
+            os.replace(part_path, path)
+            await self._update_job(
+                job_id,
+                status=ExportStatus.COMPLETED,
+                file_name=file_name,
+                file_size=os.path.getsize(path),
+                finished_at=datetime.datetime.now(),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._update_job(
+                job_id,
+                status=ExportStatus.FAILED,
+                error=str(e),
+                finished_at=datetime.datetime.now(),
+            )
+
+
+export_workers: ExportWorkers = None
+
+
+def get_export_workers() -> ExportWorkers | None:
+    """Get the running export workers, ``None`` before startup."""
+    return export_workers
+
+
+async def start_export_workers(
+    session_factory, read_session_factory=None
+) -> ExportWorkers:
+    global export_workers
+    if export_workers is None:
+        settings = config.get_settings()
+        export_workers = ExportWorkers(
+            session_factory,
+            settings.EXPORT_DIR,
+            settings.EXPORT_WORKERS,
+            read_session_factory=read_session_factory,
+        )
+        await export_workers.start()
+
+    return export_workers
+
+
+async def close_export_workers():
+    global export_workers
+    if export_workers is not None:
+        await export_workers.close()
+        export_workers = None
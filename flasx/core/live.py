@@ -0,0 +1,254 @@
+"""In-process pub/sub hub for live tracking.
+
+Parcel status changes are published to the topics ``parcel:<tracking
+number>`` and ``station:<station id>`` (the destination station, and the
+station where the change happened). Every SSE or WebSocket client holds a
+``Subscription`` with a bounded buffer: a client that does not keep up loses
+its oldest messages instead of holding memory or slowing the publisher.
+
+Messages go through a broker. ``MemoryBroker`` delivers within the process;
+``RedisBroker`` publishes to Redis and delivers what it receives back from
+Redis, so subscribers on every worker see every change. Batches of changes
+go through ``publish_many``, one Redis pipeline per batch.
+"""
+
+import asyncio
+import contextlib
+import datetime
+import json
+
+from flasx.core import config
+from flasx.core import resp
+
+
+def parcel_topic(tracking_number: str) -> str:
+    return f"parcel:{tracking_number}"
+
+
+def station_topic(station_id: int) -> str:
+    return f"station:{station_id}"
+
+
+def status_messages(
+    tracking_number: str,
+    status,
+    updated_at: datetime.datetime,
+    station_id: int | None = None,
+    destination_station_id: int | None = None,
+) -> list[tuple[str, dict]]:
+    """The (topic, message) pairs publishing a parcel status change."""
+    message = {
+        "tracking_number": tracking_number,
+        "status": getattr(status, "value", status),
+        "station_id": station_id,
+        "destination_station_id": destination_station_id,
+        "updated_at": updated_at.isoformat(),
+    }
+    topics = [parcel_topic(tracking_number)]
+    for id in dict.fromkeys([destination_station_id, station_id]):
+        if id is not None:
+            topics.append(station_topic(id))
+    return [(topic, message) for topic in topics]
+
+
+class Subscription:
+    """Messages of some topics for one client, oldest dropped when full."""
+
+    def __init__(self, topics: tuple[str, ...], buffer: int):
+        self.topics = topics
+        self.queue: asyncio.Queue[str] = asyncio.Queue(buffer)
+        self.dropped = 0
+
+    def put(self, message: str):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class MemoryBroker:
+    name = "memory"
+
+    def __init__(self):
+        self.dispatch = None
+
+    async def start(self, dispatch):
+        self.dispatch = dispatch
+
+    async def publish(self, topic: str, message: str):
+        self.dispatch(topic, message)
+
+    async def publish_many(self, messages: list[tuple[str, str]]):
+        for topic, message in messages:
+            self.dispatch(topic, message)
+
+    async def close(self):
+        pass
+
+
+class RedisBroker:
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "flasx:live:", retry: float = 1.0):
+        self.url = url
+        self.prefix = prefix
+        self.retry = retry
+        self.connection = resp.RespConnection(url)
+        self._task: asyncio.Task | None = None
+
+    async def start(self, dispatch):
+        self._task = asyncio.create_task(self._listen(dispatch))
+
+    async def _listen(self, dispatch):
+        while True:
+            listener = resp.RespConnection(self.url)
+            try:
+                async for channel, data in listener.listen(self.prefix + "*"):
+                    dispatch(channel[len(self.prefix) :], data.decode())
+            except (resp.RespError, ConnectionError, OSError, asyncio.TimeoutError):
+                # keep retrying, subscribers miss what is published meanwhile
+                await asyncio.sleep(self.retry)
+
+    async def publish(self, topic: str, message: str):
+        await self.connection.execute("PUBLISH", self.prefix + topic, message)
+
+    async def publish_many(self, messages: list[tuple[str, str]]):
+        """Publish ``messages`` in one pipeline, a single round trip."""
+        await self.connection.execute_many(
+            [("PUBLISH", self.prefix + topic, message) for topic, message in messages]
+        )
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.connection.close()
+
+
+class LiveHub:
+    """Fans published messages out to the subscriptions of their topic."""
+
+    def __init__(self, broker=None, buffer: int = 100):
+        self.broker = broker or MemoryBroker()
+        self.buffer = buffer
+        self.subscriptions: dict[str, set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.errors = 0
+        self._started = False
+
+    async def start(self):
+        if not self._started:
+            await self.broker.start(self.dispatch)
+            self._started = True
+
+    async def close(self):
+        await self.broker.close()
+        self._started = False
+
+    @contextlib.contextmanager
+    def subscribe(self, *topics: str):
+        subscription = Subscription(topics, self.buffer)
+        for topic in topics:
+            self.subscriptions.setdefault(topic, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            for topic in topics:
+                subscribers = self.subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscriptions[topic]
+
+    def dispatch(self, topic: str, message: str):
+        for subscription in self.subscriptions.get(topic, ()):
+            subscription.put(message)
+            self.delivered += 1
+
+    async def publish(self, topic: str, message: dict):
+        """Publish ``message`` to ``topic``, a broker failure is only counted."""
+        await self.publish_many([(topic, message)])
+
+    async def publish_many(self, messages: list[tuple[str, dict]]):
+        """Publish (topic, message) pairs, in one pipeline with Redis."""
+        if not messages:
+            return
+        if not self._started:
+            await self.start()
+
+        self.published += len(messages)
+        try:
+            await self.broker.publish_many(
+                [
+                    (topic, json.dumps(message, default=str))
+                    for topic, message in messages
+                ]
+            )
+        except (resp.RespError, ConnectionError, OSError, asyncio.TimeoutError):
+            self.errors += 1
+
+    async def publish_status(
+        self,
+        tracking_number: str,
+        status,
+        updated_at: datetime.datetime,
+        station_id: int | None = None,
+        destination_station_id: int | None = None,
+    ):
+        """Publish a parcel status change to the parcel and its station feeds."""
+        await self.publish_many(
+            status_messages(
+                tracking_number,
+                status,
+                updated_at,
+                station_id=station_id,
+                destination_station_id=destination_station_id,
+            )
+        )
+
+    def stats(self) -> dict:
+        subscriptions = set().union(*self.subscriptions.values())
+        return {
+            "broker": self.broker.name,
+            "topics": len(self.subscriptions),
+            "subscriptions": len(subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": sum(s.dropped for s in subscriptions),
+            "errors": self.errors,
+        }
+
+
+live_hub: LiveHub = None
+
+
+def get_live_hub() -> LiveHub:
+    """Get the process-wide live hub, created on first use."""
+    global live_hub
+    if live_hub is None:
+        settings = config.get_settings()
+        broker = None
+        if settings.LIVE_BROKER_BACKEND == "redis":
+            broker = RedisBroker(settings.REDIS_URL)
+        live_hub = LiveHub(broker, settings.LIVE_CLIENT_BUFFER)
+
+    return live_hub
+
+
+async def start_live_hub() -> LiveHub:
+    hub = get_live_hub()
+    await hub.start()
+    return hub
+
+
+async def close_live_hub():
+    global live_hub
+    if live_hub is not None:
+        await live_hub.close()
+        live_hub = None
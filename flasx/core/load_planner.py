@@ -0,0 +1,93 @@
+"""Packing of parcels into vehicles by weight and volume.
+
+First-fit decreasing over two dimensions: parcels are sorted by their larger
+share of the average vehicle weight or volume capacity, biggest first, and
+each goes into the first vehicle with enough weight and volume left. The
+fit test for one parcel is a single vectorized comparison over every
+vehicle, so planning costs O(parcels * vehicles) in NumPy rather than in
+Python.
+"""
+
+import numpy as np
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.models import Parcel, ParcelStatus
+
+UNASSIGNED = -1
+
+# parcels in these statuses no longer take room in their vehicle
+UNLOADED_STATUSES = (ParcelStatus.DELIVERED, ParcelStatus.RETURNED)
+
+
+def parcel_volumes(length, width, height) -> np.ndarray:
+    """Volumes in m3 of parcels measured in cm."""
+    return np.asarray(length) * np.asarray(width) * np.asarray(height) / 1_000_000
+
+
+def plan_loads(
+    weights: np.ndarray,
+    volumes: np.ndarray,
+    weight_left: np.ndarray,
+    volume_left: np.ndarray,
+) -> np.ndarray:
+    """Return the vehicle index of each parcel, ``UNASSIGNED`` when none fits.
+
+    ``weight_left`` and ``volume_left`` are the remaining capacities of the
+    vehicles, ``np.inf`` for no volume limit; they are not modified.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+    weight_left = np.array(weight_left, dtype=np.float64)
+    volume_left = np.array(volume_left, dtype=np.float64)
+
+    assignment = np.full(len(weights), UNASSIGNED, dtype=np.int64)
+    if not len(weights) or not len(weight_left):
+        return assignment
+
+    # size relative to the average vehicle, on the tighter dimension
+    mean_weight = weight_left[weight_left > 0].mean() if (weight_left > 0).any() else 1
+    finite = np.isfinite(volume_left) & (volume_left > 0)
+    mean_volume = volume_left[finite].mean() if finite.any() else np.inf
+    size = np.maximum(weights / mean_weight, volumes / mean_volume)
+    order = np.argsort(-size, kind="stable")
+
+    for parcel in order:
+        weight = weights[parcel]
+        volume = volumes[parcel]
+        fits = (weight_left >= weight) & (volume_left >= volume)
+        vehicle = fits.argmax()
+        if not fits[vehicle]:
+            continue
+
+        assignment[parcel] = vehicle
+        weight_left[vehicle] -= weight
+        volume_left[vehicle] -= volume
+
+    return assignment
+
+
+async def get_vehicle_loads(
+    session: AsyncSession, vehicle_ids: list[int], exclude_parcel_id: int | None = None
+) -> dict[int, tuple[float, float]]:
+    """Return the (weight, volume) of the parcels loaded in each vehicle."""
+    query = (
+        select(
+            Parcel.vehicle_id,
+            func.sum(Parcel.weight),
+            func.sum(Parcel.length * Parcel.width * Parcel.height) / 1_000_000,
+        )
+        .where(
+            Parcel.vehicle_id.in_(vehicle_ids),
+            Parcel.status.not_in(UNLOADED_STATUSES),
+        )
+        .group_by(Parcel.vehicle_id)
+    )
+    if exclude_parcel_id is not None:
+        query = query.where(Parcel.id != exclude_parcel_id)
+
+    result = await session.exec(query)
+    return {
+        vehicle_id: (weight or 0.0, volume or 0.0)
+        for vehicle_id, weight, volume in result.all()
+    }
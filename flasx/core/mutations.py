@@ -0,0 +1,102 @@
+"""Updates and deletes by primary key in one statement.
+
+``update_returning`` issues ``UPDATE ... WHERE id = :id RETURNING *`` and
+``delete_returning`` ``DELETE ... WHERE id = :id RETURNING ...``: the handler
+gets the row back from the statement itself, instead of loading the object,
+flushing it and refreshing it after the commit. No row back means no such id.
+
+Unique constraints are checked by the statement too: an ``IntegrityError``
+naming one of the ``conflicts`` columns rolls back and becomes a 400 with its
+detail.
+
+A raw DELETE does not null the foreign keys of the related rows the way the
+ORM did, ``clear_references`` does it in the same transaction before the
+delete.
+"""
+
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import case, or_
+from sqlmodel import delete, update
+
+# keep IN lists below the bind parameter limits of SQLite and asyncpg
+IN_CHUNK_SIZE = 5000
+
+
+async def _execute(session, statement, conflicts: dict[str, str] | None):
+    try:
+        return await session.exec(
+            statement.execution_options(synchronize_session=False)
+        )
+    except IntegrityError as e:
+        await session.rollback()
+        message = str(e.orig)
+        for column, detail in (conflicts or {}).items():
+            if column in message:
+                raise HTTPException(status_code=400, detail=detail)
+        raise
+
+
+async def update_returning(
+    session,
+    model,
+    id: int,
+    values: dict,
+    conflicts: dict[str, str] | None = None,
+) -> dict | None:
+    """Update the row ``id`` of ``model`` and return its new values.
+
+    ``updated_at`` is set when the table has it. Returns ``None`` when there
+    is no row ``id``.
+    """
+    table = model.__table__
+    values = dict(values)
+    if "updated_at" in table.c:
+        values["updated_at"] = datetime.now()
+
+    result = await _execute(
+        session,
+        update(model).where(model.id == id).values(**values).returning(*table.c),
+        conflicts,
+    )
+    row = result.first()
+    return None if row is None else dict(row._mapping)
+
+
+async def delete_returning(session, model, id: int, *columns) -> dict | None:
+    """Delete the row ``id`` of ``model`` and return the old ``columns``.
+
+    Returns ``None`` when there is no row ``id``.
+    """
+    result = await _execute(
+        session,
+        delete(model).where(model.id == id).returning(*(columns or [model.id])),
+        None,
+    )
+    row = result.first()
+    return None if row is None else dict(row._mapping)
+
+
+async def clear_references(session, id: int, *columns, returning=()) -> list:
+    """Set the ``columns`` referencing the row ``id`` to NULL in one UPDATE.
+
+    ``columns`` belong to the same table. Returns the ``returning`` columns of
+    the updated rows, an empty list without ``returning``.
+    """
+    statement = (
+        update(columns[0].table)
+        .where(or_(*(column == id for column in columns)))
+        .values(
+            {
+                column.name: case((column == id, None), else_=column)
+                for column in columns
+            }
+        )
+    )
+    if returning:
+        statement = statement.returning(*returning)
+
+    result = await _execute(session, statement, None)
+    return result.all() if returning else []
@@ -0,0 +1,97 @@
+import base64
+import binascii
+import bisect
+import datetime
+import json
+from typing import Literal
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortKey = Literal["id", "created_at"]
+
+
+def encode_cursor(sort: str, value, id: int) -> str:
+    """Encode the sort key value and id of the last row of a page."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+
+    data = json.dumps({"s": sort, "v": value, "id": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """Decode a cursor made by ``encode_cursor`` for the same sort key."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        if data["s"] != sort:
+            raise ValueError("cursor was made for another sort key")
+
+        value = data["v"]
+        if sort != "id":
+            value = datetime.datetime.fromisoformat(value)
+
+        return value, int(data["id"])
+    except (binascii.Error, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query, model, sort: str, limit: int, skip: int = 0, cursor: str | None = None
+):
+    """Order ``query`` by (sort key, id) and select one page.
+
+    With a cursor the page starts after the row it points to, so the cost does
+    not grow with the depth of the page and inserted rows do not shift pages.
+    Without one, ``skip`` is used as an offset.
+    """
+    column = getattr(model, sort)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        if sort == "id":
+            query = query.where(model.id > last_id)
+        else:
+            query = query.where(tuple_(column, model.id) > tuple_(value, last_id))
+    elif skip:
+        query = query.offset(skip)
+
+    if sort == "id":
+        query = query.order_by(model.id)
+    else:
+        query = query.order_by(column, model.id)
+
+    return query.limit(limit)
+
+
+def paginate_items(
+    items: list, sort: str, limit: int, skip: int = 0, cursor: str | None = None
+) -> list:
+    """``paginate`` for objects already in memory, with the same cursors."""
+    if sort == "id":
+        key = lambda item: item.id
+    else:
+        key = lambda item: (getattr(item, sort), item.id)
+    items = sorted(items, key=key)
+
+    start = skip
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        last = last_id if sort == "id" else (value, last_id)
+        start = bisect.bisect_right(items, last, key=key)
+
+    return items[start : start + limit]
+
+
+def set_next_cursor(response: Response, items: list, sort: str, limit: int):
+    """Send the cursor of the next page when the page is full."""
+    if not items or len(items) < limit:
+        return
+
+    last = items[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        sort, getattr(last, sort), last.id
+    )
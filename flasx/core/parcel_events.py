@@ -0,0 +1,134 @@
+"""Append-only parcel status event log.
+
+Events are inserted in the same transaction as the status change they
+record. On PostgreSQL the table can be partitioned by month on
+``occurred_at`` (``PARCEL_EVENT_PARTITIONING``), and old history is
+compacted down to the latest event of each parcel.
+"""
+
+import datetime
+
+from sqlalchemy import exists, insert, delete, select, text, tuple_
+from sqlalchemy.orm import aliased
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.models import ParcelEvent
+
+
+def make_event(
+    parcel_id: int,
+    status,
+    station_id: int | None = None,
+    occurred_at: datetime.datetime | None = None,
+    note: str | None = None,
+) -> dict:
+    return dict(
+        parcel_id=parcel_id,
+        status=status,
+        station_id=station_id,
+        occurred_at=occurred_at or datetime.datetime.now(),
+        note=note,
+    )
+
+
+async def record_events(session: AsyncSession, events: list[dict]):
+    """Append events in the current transaction of ``session``."""
+    if events:
+        await session.exec(insert(ParcelEvent), params=events)
+
+
+def create_partitioned_table(connection):
+    """Create ``parcel_event`` partitioned by range of ``occurred_at``.
+
+    PostgreSQL requires the partition key in the primary key, so the table is
+    keyed on (id, occurred_at). Rows outside the monthly partitions land in
+    the default partition.
+    """
+    table = ParcelEvent.__table__
+    columns = []
+    for column in table.columns:
+        if column.name == "id":
+            columns.append("id BIGINT GENERATED BY DEFAULT AS IDENTITY")
+            continue
+
+        ddl = f"{column.name} {column.type.compile(dialect=connection.dialect)}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+        columns.append(ddl)
+
+    for foreign_key in table.foreign_keys:
+        columns.append(
+            f"FOREIGN KEY ({foreign_key.parent.name}) REFERENCES "
+            f"{foreign_key.column.table.name} ({foreign_key.column.name})"
+        )
+    columns.append("PRIMARY KEY (id, occurred_at)")
+
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {table.name} ({', '.join(columns)}) "
+            "PARTITION BY RANGE (occurred_at)"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {table.name}_default "
+            f"PARTITION OF {table.name} DEFAULT"
+        )
+    )
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def create_monthly_partitions(
+    connection, start: datetime.date, months: int
+) -> list[str]:
+    """Create the partitions of ``months`` months from the month of ``start``."""
+    table = ParcelEvent.__table__.name
+    month = start.replace(day=1)
+    names = []
+    for _ in range(months):
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+        name = f"{table}_p{month:%Y%m}"
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') "
+                f"TO ('{next_month.isoformat()}')"
+            )
+        )
+        names.append(name)
+        month = next_month
+
+    return names
+
+
+async def compact_events(
+    session_factory, before: datetime.datetime, batch_size: int = 10_000
+) -> int:
+    """Delete events older than ``before`` except the latest of each parcel.
+
+    Works in batches, each one its own transaction, and returns the number
+    of deleted events.
+    """
+    later = aliased(ParcelEvent)
+    superseded = exists().where(
+        later.parcel_id == ParcelEvent.parcel_id,
+        tuple_(later.occurred_at, later.id)
+        > tuple_(ParcelEvent.occurred_at, ParcelEvent.id),
+    )
+    query = (
+        select(ParcelEvent.id)
+        .where(ParcelEvent.occurred_at < before, superseded)
+        .limit(batch_size)
+    )
+
+    deleted = 0
+    while True:
+        async with session_factory() as session:
+            ids = (await session.exec(query)).all()
+            if not ids:
+                return deleted
+
+            await session.exec(delete(ParcelEvent).where(ParcelEvent.id.in_(ids)))
+            await session.commit()
+            deleted += len(ids)
@@ -0,0 +1,195 @@
+"""Rate-card quoting of parcel prices.
+
+The price of a parcel is the rate of its chargeable weight bracket in its
+zone, plus a per-kg rate above the last bracket, oversize and heavy
+surcharges, and a fuel surcharge on the total:
+
+- volumetric weight is ``length * width * height / volumetric_divisor``
+  (cm, kg), and the chargeable weight is the larger of it and the actual
+  weight, rounded up to ``weight_step``;
+- the zone is ``same_city`` or ``same_state`` when the origin and
+  destination stations share them, ``national`` otherwise (or when a
+  station is not given).
+
+``quote`` prices one parcel with plain Python. ``quote_batch`` prices arrays
+of parcels with NumPy and gives the same results; the rate tables are
+turned into arrays once per engine.
+"""
+
+import bisect
+import json
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from flasx.core import config
+
+ZONES = ("same_city", "same_state", "national")
+
+
+@dataclass
+class RateCard:
+    # upper bounds of the weight brackets, kg
+    brackets: list[float] = field(default_factory=lambda: [1, 3, 5, 10, 20, 30])
+    # price of each bracket by zone
+    rates: dict[str, list[float]] = field(
+        default_factory=lambda: {
+            "same_city": [30, 40, 55, 80, 120, 160],
+            "same_state": [40, 55, 70, 100, 150, 200],
+            "national": [50, 65, 85, 120, 180, 240],
+        }
+    )
+    # per kg above the last bracket, by zone
+    extra_per_kg: dict[str, float] = field(
+        default_factory=lambda: {"same_city": 5, "same_state": 7, "national": 10}
+    )
+    volumetric_divisor: float = 5000
+    weight_step: float = 0.5
+    oversize_length: float = 120  # cm, any side
+    oversize_fee: float = 50
+    heavy_weight: float = 30  # kg, actual weight
+    heavy_fee: float = 80
+    fuel_percent: float = 5.0
+
+    @classmethod
+    def from_file(cls, path: str) -> "RateCard":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def zone_of(origin: tuple[str, str] | None, destination: tuple[str, str] | None):
+    """Zone index between two (city, state) pairs."""
+    if origin is None or destination is None:
+        return 2
+    if origin == destination:
+        return 0
+    if origin[1] == destination[1]:
+        return 1
+    return 2
+
+
+class QuoteEngine:
+    def __init__(self, rate_card: RateCard):
+        self.rate_card = rate_card
+        self.brackets = np.asarray(rate_card.brackets, dtype=np.float64)
+        self.rates = np.asarray(
+            [rate_card.rates[zone] for zone in ZONES], dtype=np.float64
+        )
+        self.extra_per_kg = np.asarray(
+            [rate_card.extra_per_kg[zone] for zone in ZONES], dtype=np.float64
+        )
+        self.fuel_factor = 1 + rate_card.fuel_percent / 100
+
+    def quote(
+        self, weight: float, length: float, width: float, height: float, zone: int
+    ) -> dict:
+        """Price one parcel."""
+        card = self.rate_card
+        volumetric = length * width * height / card.volumetric_divisor
+        chargeable = (
+            math.ceil(max(weight, volumetric) / card.weight_step) * card.weight_step
+        )
+
+        last = len(card.brackets) - 1
+        bracket = bisect.bisect_left(card.brackets, chargeable)
+        base = card.rates[ZONES[zone]][min(bracket, last)]
+        if bracket > last:
+            base += (chargeable - card.brackets[last]) * card.extra_per_kg[ZONES[zone]]
+
+        surcharge = 0.0
+        if max(length, width, height) > card.oversize_length:
+            surcharge += card.oversize_fee
+        if weight > card.heavy_weight:
+            surcharge += card.heavy_fee
+
+        price = round((base + surcharge) * self.fuel_factor * 100) / 100
+        return dict(
+            volumetric_weight=volumetric,
+            chargeable_weight=chargeable,
+            zone=ZONES[zone],
+            base_price=base,
+            surcharge=surcharge,
+            price=price,
+        )
+
+    def quote_batch(
+        self,
+        weight: np.ndarray,
+        length: np.ndarray,
+        width: np.ndarray,
+        height: np.ndarray,
+        zone: np.ndarray,
+    ) -> dict[str, np.ndarray]:
+        """Price arrays of parcels, element-wise the same as ``quote``."""
+        card = self.rate_card
+        volumetric = length * width * height / card.volumetric_divisor
+        chargeable = (
+            np.ceil(np.maximum(weight, volumetric) / card.weight_step)
+            * card.weight_step
+        )
+
+        last = len(self.brackets) - 1
+        bracket = np.searchsorted(self.brackets, chargeable, side="left")
+        base = self.rates[zone, np.minimum(bracket, last)]
+        base = base + np.where(
+            bracket > last,
+            (chargeable - self.brackets[last]) * self.extra_per_kg[zone],
+            0.0,
+        )
+
+        longest = np.maximum(np.maximum(length, width), height)
+        surcharge = np.where(longest > card.oversize_length, card.oversize_fee, 0.0)
+        surcharge = surcharge + np.where(
+            weight > card.heavy_weight, card.heavy_fee, 0.0
+        )
+
+        price = np.rint((base + surcharge) * self.fuel_factor * 100) / 100
+        return dict(
+            volumetric_weight=volumetric,
+            chargeable_weight=chargeable,
+            zone=zone,
+            base_price=base,
+            surcharge=surcharge,
+            price=price,
+        )
+
+    @staticmethod
+    def zones(
+        origin_ids: np.ndarray,
+        destination_ids: np.ndarray,
+        stations: dict[int, tuple[str, str]],
+    ) -> np.ndarray:
+        """Zone indexes of station id arrays, 0 standing for no station."""
+        # number the cities and states, index 0 is "no station"
+        places = {}
+        city = np.zeros(max(stations, default=0) + 1, dtype=np.int64)
+        state = np.zeros_like(city)
+        for id, (station_city, station_state) in stations.items():
+            city[id] = places.setdefault((station_city, station_state), len(places) + 1)
+            state[id] = places.setdefault(station_state, len(places) + 1)
+
+        origin_city, destination_city = city[origin_ids], city[destination_ids]
+        origin_state, destination_state = state[origin_ids], state[destination_ids]
+        known = (origin_city != 0) & (destination_city != 0)
+        return np.where(
+            known & (origin_city == destination_city),
+            0,
+            np.where(known & (origin_state == destination_state), 1, 2),
+        )
+
+
+quote_engine: QuoteEngine = None
+
+
+def get_quote_engine() -> QuoteEngine:
+    """Get the process-wide quote engine, its rate card is read once."""
+    global quote_engine
+    if quote_engine is None:
+        settings = config.get_settings()
+        rate_card = RateCard()
+        if settings.RATE_CARD_PATH:
+            rate_card = RateCard.from_file(settings.RATE_CARD_PATH)
+        quote_engine = QuoteEngine(rate_card)
+
+    return quote_engine
@@ -0,0 +1,165 @@
+"""Minimal asyncio client for the Redis serialization protocol (RESP).
+
+Enough for the cache and the pub/sub broker to talk to Redis, or to any
+server speaking the same protocol, without an extra dependency.
+"""
+
+import asyncio
+from typing import AsyncIterator
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    pass
+
+
+def encode_command(*args) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(f"${len(arg)}\r\n".encode())
+        parts.append(arg)
+        parts.append(b"\r\n")
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by the server")
+
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RespError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise RespError(f"Unknown reply type {kind!r}")
+
+
+class RespConnection:
+    """One connection issuing commands one at a time or pipelined."""
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", self.db)
+
+    async def _send(self, *args):
+        self._writer.write(encode_command(*args))
+        await self._writer.drain()
+        return await asyncio.wait_for(read_reply(self._reader), self.timeout)
+
+    async def execute(self, *args):
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+
+            try:
+                return await self._send(*args)
+            except (ConnectionError, OSError, asyncio.TimeoutError):
+                # drop the connection, the next command reconnects
+                await self._close()
+                raise
+
+    async def execute_many(self, commands: list[tuple]) -> list:
+        """Send ``commands`` in one pipeline and return their replies.
+
+        The commands are written at once and the replies read after, one
+        round trip for the lot. An error reply is raised once every reply is
+        read, so the connection stays in step.
+        """
+        if not commands:
+            return []
+
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+
+            try:
+                self._writer.write(b"".join(encode_command(*args) for args in commands))
+                await self._writer.drain()
+                replies = []
+                for _ in commands:
+                    try:
+                        replies.append(
+                            await asyncio.wait_for(
+                                read_reply(self._reader), self.timeout
+                            )
+                        )
+                    except RespError as e:
+                        replies.append(e)
+            except (ConnectionError, OSError, asyncio.TimeoutError):
+                await self._close()
+                raise
+
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def listen(self, *patterns: str) -> AsyncIterator[tuple[str, bytes]]:
+        """Subscribe to channel ``patterns`` and yield (channel, data) pairs.
+
+        The connection is dedicated to the subscription from then on; replies
+        are read without a timeout since messages arrive at any time.
+        """
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+            self._writer.write(encode_command("PSUBSCRIBE", *patterns))
+            await self._writer.drain()
+
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                if reply[0] == b"pmessage":
+                    _, _, channel, data = reply
+                    yield channel.decode(), data
+        finally:
+            await self._close()
+
+    async def _close(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def close(self):
+        async with self._lock:
+            await self._close()
@@ -0,0 +1,63 @@
+"""Balanced assignment of parcels to delivery staff.
+
+Least-loaded scheduling: a heap holds every courier keyed by workload, and
+each parcel goes to the top of the heap. The workload is the parcel count,
+or their total weight when weighted, in which case the parcels are handed
+out heaviest first (longest processing time first) so that the last, light
+parcels even out the loads.
+"""
+
+import heapq
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.models import Parcel, ParcelStatus
+
+
+def assign_least_loaded(
+    weights: list[float], loads: list[float], weighted: bool = False
+) -> list[int]:
+    """Return the staff index of each parcel given the current ``loads``."""
+    if not loads:
+        return []
+
+    # ties go to the courier with fewer parcels, then to the first listed
+    heap = [(load, 0, index) for index, load in enumerate(loads)]
+    heapq.heapify(heap)
+
+    order = range(len(weights))
+    if weighted:
+        order = sorted(order, key=weights.__getitem__, reverse=True)
+
+    assignment = [0] * len(weights)
+    for parcel in order:
+        load, count, index = heap[0]
+        assignment[parcel] = index
+        heapq.heapreplace(
+            heap, (load + (weights[parcel] if weighted else 1), count + 1, index)
+        )
+    return assignment
+
+
+async def get_staff_workloads(
+    session: AsyncSession,
+    staff_ids: list[int] | None = None,
+    status: ParcelStatus = ParcelStatus.OUT_FOR_DELIVERY,
+) -> dict[int, tuple[int, float]]:
+    """Return the (parcel count, total weight) of ``status`` parcels per staff.
+
+    Served by the (delivery_staff_id, status) index.
+    """
+    query = (
+        select(Parcel.delivery_staff_id, func.count(), func.sum(Parcel.weight))
+        .where(Parcel.delivery_staff_id.is_not(None), Parcel.status == status)
+        .group_by(Parcel.delivery_staff_id)
+    )
+    if staff_ids is not None:
+        query = query.where(Parcel.delivery_staff_id.in_(staff_ids))
+
+    result = await session.exec(query)
+    return {
+        staff_id: (count, weight or 0.0) for staff_id, count, weight in result.all()
+    }
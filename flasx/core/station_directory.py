@@ -0,0 +1,153 @@
+"""Process-local directory of the stations.
+
+Stations are few and rarely change, so every worker keeps all of them in
+memory: by id, by code, and in sorted prefix indexes on code, city and
+state. Listing, filtering and getting stations then cost no query.
+
+Every station write bumps the ``station`` row of ``cache_version`` in its
+own transaction. The worker that made the change drops its directory at
+once; the others read the version, one primary key lookup, at most every
+``STATION_DIRECTORY_REFRESH_INTERVAL`` seconds and reload the directory when
+it moved.
+"""
+
+import bisect
+import time
+
+from fastapi import Depends
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+
+from flasx.core import config
+from flasx.models import CacheVersion, Station, get_read_session_factory
+from flasx.schemas import station_schema
+
+VERSION_NAME = "station"
+
+
+async def bump_version(session):
+    """Mark the stations as changed, in the transaction of the change."""
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    table = CacheVersion.__table__
+    statement = dialect.insert(table).values(name=VERSION_NAME, version=1)
+    await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=["name"], set_={"version": table.c.version + 1}
+        )
+    )
+
+
+async def get_version(session) -> int:
+    result = await session.exec(
+        select(CacheVersion.version).where(CacheVersion.name == VERSION_NAME)
+    )
+    return result.first() or 0
+
+
+class PrefixIndex:
+    """Case-insensitive prefix search over one text field."""
+
+    def __init__(self, values: dict[int, str]):
+        pairs = sorted((value.casefold(), id) for id, value in values.items())
+        self.keys = [key for key, _ in pairs]
+        self.ids = [id for _, id in pairs]
+
+    def match(self, prefix: str) -> list[int]:
+        prefix = prefix.casefold()
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return self.ids[lo:hi]
+
+
+class StationDirectory:
+    def __init__(self, stations: list[station_schema.Station], version: int = 0):
+        self.version = version
+        self.stations = {station.id: station for station in stations}
+        self.by_code = {station.code: station for station in stations}
+        self.codes = PrefixIndex({s.id: s.code for s in stations})
+        self.cities = PrefixIndex({s.id: s.city for s in stations})
+        self.states = PrefixIndex({s.id: s.state for s in stations})
+        self.checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def get(self, station_id: int) -> station_schema.Station | None:
+        return self.stations.get(station_id)
+
+    def get_by_code(self, code: str) -> station_schema.Station | None:
+        return self.by_code.get(code)
+
+    def filter(
+        self,
+        code: str | None = None,
+        city: str | None = None,
+        state: str | None = None,
+        is_active: bool | None = None,
+    ) -> list[station_schema.Station]:
+        """Stations matching every given prefix and ``is_active``, by id."""
+        ids = None
+        for index, prefix in (
+            (self.codes, code),
+            (self.cities, city),
+            (self.states, state),
+        ):
+            if prefix:
+                matches = set(index.match(prefix))
+                ids = matches if ids is None else ids & matches
+
+        stations = (
+            self.stations.values() if ids is None else (self.stations[id] for id in ids)
+        )
+        if is_active is not None:
+            stations = (s for s in stations if s.is_active == is_active)
+        return sorted(stations, key=lambda station: station.id)
+
+
+async def load_station_directory(session) -> StationDirectory:
+    version = await get_version(session)
+    result = await session.exec(select(Station))
+    return StationDirectory(
+        [station_schema.Station.model_validate(station) for station in result.all()],
+        version,
+    )
+
+
+station_directory: StationDirectory = None
+
+
+async def start_station_directory(session_factory) -> StationDirectory:
+    """Load the directory at startup, so that no request waits for it."""
+    global station_directory
+    async with session_factory() as session:
+        station_directory = await load_station_directory(session)
+    return station_directory
+
+
+async def get_station_directory(
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+) -> StationDirectory:
+    """Get the process-wide station directory, loaded on first use.
+
+    The version is checked at most every ``STATION_DIRECTORY_REFRESH_INTERVAL``
+    seconds, lookups in between cost no query.
+    """
+    global station_directory
+    if station_directory is None:
+        return await start_station_directory(session_factory)
+
+    interval = config.get_settings().STATION_DIRECTORY_REFRESH_INTERVAL
+    if time.monotonic() - station_directory.checked_at >= interval:
+        station_directory.checked_at = time.monotonic()
+        async with session_factory() as session:
+            if await get_version(session) != station_directory.version:
+                station_directory = await load_station_directory(session)
+
+    return station_directory
+
+
+def reset_station_directory():
+    """Drop the directory after a committed station write, reloaded on next use."""
+    global station_directory
+    station_directory = None
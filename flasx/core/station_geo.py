@@ -0,0 +1,195 @@
+"""Nearest-station lookup for drop-off selection.
+
+``KdTree`` indexes the stations by their position as unit vectors on the
+sphere: the straight-line distance between two unit vectors grows with the
+great-circle distance, so the k nearest in 3D are the k nearest on the
+earth, without trigonometry in the search. The tree is built once with NumPy
+into flat lists and searched in plain Python, a query visits about
+``log2(n) + k`` buckets of ``LEAF_SIZE`` stations.
+
+Stations without coordinates, or queries without them, are served by a
+``PostalCodeTrie``: the stations sharing the longest prefix with the postal
+code come first.
+
+``StationIndex`` holds both with the active stations of the station
+directory, and is rebuilt whenever the directory is reloaded.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from flasx.core.station_directory import StationDirectory
+from flasx.schemas import station_schema
+
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 8
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """Positions in degrees as (n, 3) unit vectors."""
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.stack(
+        [
+            np.cos(latitudes) * np.cos(longitudes),
+            np.cos(latitudes) * np.sin(longitudes),
+            np.sin(latitudes),
+        ],
+        axis=-1,
+    )
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KdTree:
+    """Static k-d tree over 3D points, laid out in place in one array."""
+
+    def __init__(self, points: np.ndarray):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        order = np.arange(len(points))
+        axes = np.zeros(len(points), dtype=np.int64)
+
+        # split every range at its median on its widest axis
+        ranges = [(0, len(points))]
+        while ranges:
+            lo, hi = ranges.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+
+            part = order[lo:hi]
+            axis = int(np.ptp(points[part], axis=0).argmax())
+            mid = (lo + hi) // 2
+            order[lo:hi] = part[np.argpartition(points[part, axis], mid - lo)]
+            axes[mid] = axis
+            ranges += [(lo, mid), (mid + 1, hi)]
+
+        # position in the tree -> index in ``points``
+        self.order = order.tolist()
+        self.points = points[order].tolist()
+        self.axes = axes.tolist()
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def query(self, point, k: int) -> list[tuple[float, int]]:
+        """The (distance, index) of the ``k`` points nearest to ``point``."""
+        x, y, z = point
+        points, axes = self.points, self.axes
+        # max-heap of the best so far as (-squared distance, position)
+        best: list[tuple[float, int]] = []
+
+        def consider(position):
+            px, py, pz = points[position]
+            distance = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+            if len(best) < k:
+                heapq.heappush(best, (-distance, position))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, position))
+
+        def search(lo, hi):
+            if hi - lo <= LEAF_SIZE:
+                for position in range(lo, hi):
+                    consider(position)
+                return
+
+            mid = (lo + hi) // 2
+            axis = axes[mid]
+            offset = point[axis] - points[mid][axis]
+            consider(mid)
+            if offset < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+
+            search(*near)
+            if len(best) < k or offset * offset < -best[0][0]:
+                search(*far)
+
+        if k > 0:
+            search(0, len(points))
+        return sorted(
+            (math.sqrt(-distance), self.order[position]) for distance, position in best
+        )
+
+
+class PostalCodeTrie:
+    """Stations by postal code prefix."""
+
+    def __init__(self, postal_codes: list[tuple[str, int]]):
+        # every node is [children, station ids under it]
+        self.root = [{}, []]
+        for postal_code, id in sorted(postal_codes):
+            node = self.root
+            node[1].append(id)
+            for char in postal_code.strip():
+                node = node[0].setdefault(char, [{}, []])
+                node[1].append(id)
+
+    def query(self, postal_code: str, k: int) -> list[int]:
+        """Up to ``k`` station ids, the longest shared prefix first."""
+        path = [self.root]
+        for char in postal_code.strip():
+            node = path[-1][0].get(char)
+            if node is None:
+                break
+            path.append(node)
+
+        ids = {}
+        for node in reversed(path):
+            for id in node[1]:
+                ids.setdefault(id, None)
+                if len(ids) >= k:
+                    return list(ids)
+        return list(ids)
+
+
+class StationIndex:
+    def __init__(self, stations: list[station_schema.Station]):
+        self.stations = {station.id: station for station in stations}
+
+        located = [
+            station
+            for station in stations
+            if station.latitude is not None and station.longitude is not None
+        ]
+        self.located_ids = [station.id for station in located]
+        self.tree = KdTree(
+            unit_vectors(
+                [station.latitude for station in located],
+                [station.longitude for station in located],
+            )
+        )
+        self.postal_codes = PostalCodeTrie(
+            [(station.postal_code, station.id) for station in stations]
+        )
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[tuple[station_schema.Station, float]]:
+        """The ``k`` located stations nearest to a position, with their km."""
+        point = unit_vectors(latitude, longitude).tolist()
+        return [
+            (self.stations[self.located_ids[index]], chord_to_km(chord))
+            for chord, index in self.tree.query(point, k)
+        ]
+
+    def by_postal_code(self, postal_code: str, k: int) -> list[station_schema.Station]:
+        return [self.stations[id] for id in self.postal_codes.query(postal_code, k)]
+
+
+station_index: StationIndex = None
+indexed_directory: StationDirectory = None
+
+
+def get_station_index(directory: StationDirectory) -> StationIndex:
+    """Get the index of the active stations of ``directory``."""
+    global station_index, indexed_directory
+    if directory is not indexed_directory:
+        station_index = StationIndex(directory.filter(is_active=True))
+        indexed_directory = directory
+
+    return station_index
@@ -0,0 +1,261 @@
+"""Next-hop routing between stations over their links.
+
+``RoutingTable`` keeps all-pairs shortest paths in NumPy matrices: the
+total transit minutes, the total cost and the first station after the
+origin. Paths are shortest by transit time, then by cost. A next-hop lookup
+is two dict lookups and one array read.
+
+The matrices are filled by a Dijkstra from every station and then kept up to
+date link by link:
+
+- a new or cheaper link ``u -> v`` can only shorten paths through it, every
+  pair is relaxed against ``i -> u -> v -> j`` in one vectorized step;
+- a dearer or removed link can only lengthen the paths that used it, only
+  the stations whose shortest path tree holds it are searched again.
+
+Each process holds its own table. Changes made by other workers are picked up
+by ``get_routing_table``, which checks the link table at most every
+``ROUTING_REFRESH_INTERVAL`` seconds and reloads it when it changed.
+"""
+
+import heapq
+import time
+from typing import Iterable, NamedTuple
+
+import numpy as np
+from sqlmodel import func, select
+
+from flasx.core import config
+from flasx.models import StationLink
+
+NO_STATION = -1
+
+
+class NextHop(NamedTuple):
+    station_id: int
+    transit_minutes: float
+    cost: float
+
+
+class RoutingTable:
+    def __init__(self, links: Iterable[tuple[int, int, float, float]] = ()):
+        self.index: dict[int, int] = {}
+        self.station_ids: list[int] = []
+        # adjacency by row: {to row: (minutes, cost)}
+        self.links: list[dict[int, tuple[float, float]]] = []
+
+        self.minutes = np.zeros((0, 0))
+        self.cost = np.zeros((0, 0))
+        self.next = np.zeros((0, 0), dtype=np.int64)
+
+        # (link count, last change) of the station_link table when loaded
+        self.fingerprint = None
+        self.checked_at = time.monotonic()
+
+        for from_id, to_id, minutes, cost in links:
+            self._add_station(from_id)
+            self._add_station(to_id)
+            self.links[self.index[from_id]][self.index[to_id]] = (minutes, cost)
+        for source in range(len(self.station_ids)):
+            self._search(source)
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+    def _add_station(self, station_id: int) -> int:
+        row = self.index.get(station_id)
+        if row is not None:
+            return row
+
+        row = len(self.station_ids)
+        self.index[station_id] = row
+        self.station_ids.append(station_id)
+        self.links.append({})
+
+        size = row + 1
+        minutes = np.full((size, size), np.inf)
+        cost = np.full((size, size), np.inf)
+        next = np.full((size, size), NO_STATION, dtype=np.int64)
+        minutes[:row, :row] = self.minutes
+        cost[:row, :row] = self.cost
+        next[:row, :row] = self.next
+        minutes[row, row] = cost[row, row] = 0
+        next[row, row] = station_id
+        self.minutes, self.cost, self.next = minutes, cost, next
+        return row
+
+    def _search(self, source: int):
+        """Dijkstra from ``source``, rewriting its row of the matrices."""
+        size = len(self.station_ids)
+        minutes = np.full(size, np.inf)
+        cost = np.full(size, np.inf)
+        next = np.full(size, NO_STATION, dtype=np.int64)
+        minutes[source] = cost[source] = 0
+        next[source] = self.station_ids[source]
+
+        heap = [(0.0, 0.0, source)]
+        done = set()
+        while heap:
+            path_minutes, path_cost, row = heapq.heappop(heap)
+            if row in done:
+                continue
+            done.add(row)
+
+            for to, (link_minutes, link_cost) in self.links[row].items():
+                candidate = (path_minutes + link_minutes, path_cost + link_cost)
+                if candidate < (minutes[to], cost[to]):
+                    minutes[to], cost[to] = candidate
+                    # leaving the source the next hop is the station itself
+                    next[to] = self.station_ids[to] if row == source else next[row]
+                    heapq.heappush(heap, (*candidate, to))
+
+        self.minutes[source] = minutes
+        self.cost[source] = cost
+        self.next[source] = next
+
+    def _relax(self, u: int, v: int, minutes: float, cost: float):
+        """Shorten every path that is shorter through the link ``u -> v``."""
+        via_minutes = self.minutes[:, u, None] + minutes + self.minutes[None, v, :]
+        via_cost = self.cost[:, u, None] + cost + self.cost[None, v, :]
+        better = (via_minutes < self.minutes) | (
+            (via_minutes == self.minutes) & (via_cost < self.cost)
+        )
+        if not better.any():
+            return
+
+        first_hop = self.next[:, u].copy()
+        first_hop[u] = self.station_ids[v]
+        self.minutes = np.where(better, via_minutes, self.minutes)
+        self.cost = np.where(better, via_cost, self.cost)
+        self.next = np.where(better, first_hop[:, None], self.next)
+
+    def _unrelax(self, u: int, v: int, minutes: float, cost: float):
+        """Search again from the stations whose shortest paths used ``u -> v``."""
+        reached = np.isfinite(self.minutes[:, v])
+        uses = (
+            reached
+            & np.isclose(self.minutes[:, u] + minutes, self.minutes[:, v])
+            & np.isclose(self.cost[:, u] + cost, self.cost[:, v])
+        )
+        for source in np.flatnonzero(uses):
+            self._search(int(source))
+
+    def set_link(self, from_id: int, to_id: int, minutes: float, cost: float = 0.0):
+        """Add or change the link ``from_id -> to_id``."""
+        u = self._add_station(from_id)
+        v = self._add_station(to_id)
+        old = self.links[u].get(v)
+        self.links[u][v] = (minutes, cost)
+
+        if old is None or (minutes, cost) <= old:
+            self._relax(u, v, minutes, cost)
+        else:
+            self._unrelax(u, v, *old)
+
+    def remove_link(self, from_id: int, to_id: int):
+        u = self.index.get(from_id)
+        v = self.index.get(to_id)
+        if u is None or v is None or v not in self.links[u]:
+            return
+
+        old = self.links[u].pop(v)
+        self._unrelax(u, v, *old)
+
+    def remove_station(self, station_id: int):
+        """Remove the links from and to ``station_id``."""
+        row = self.index.get(station_id)
+        if row is None:
+            return
+
+        for to in list(self.links[row]):
+            self.remove_link(station_id, self.station_ids[to])
+        for source, links in enumerate(self.links):
+            if row in links:
+                self.remove_link(self.station_ids[source], station_id)
+
+    def next_hop(self, from_id: int, to_id: int) -> NextHop | None:
+        """The next station from ``from_id`` towards ``to_id``, ``None`` if unreachable."""
+        u = self.index.get(from_id)
+        v = self.index.get(to_id)
+        if u is None or v is None:
+            return None
+
+        next = int(self.next[u, v])
+        if next == NO_STATION:
+            return None
+        return NextHop(next, float(self.minutes[u, v]), float(self.cost[u, v]))
+
+
+async def get_fingerprint(session) -> tuple:
+    """(link count, last change) of the station_link table."""
+    result = await session.exec(
+        select(func.count(), func.max(StationLink.updated_at)).select_from(StationLink)
+    )
+    return tuple(result.one())
+
+
+async def load_routing_table(session) -> RoutingTable:
+    """Build a routing table from the active links."""
+    fingerprint = await get_fingerprint(session)
+    result = await session.exec(
+        select(
+            StationLink.from_station_id,
+            StationLink.to_station_id,
+            StationLink.transit_minutes,
+            StationLink.cost,
+        ).where(StationLink.is_active == True)
+    )
+    table = RoutingTable(result.all())
+    table.fingerprint = fingerprint
+    return table
+
+
+routing_table: RoutingTable = None
+
+
+async def get_routing_table(session_factory) -> RoutingTable:
+    """Get the process-wide routing table, loaded on first use.
+
+    The link table is checked for changes at most every
+    ``ROUTING_REFRESH_INTERVAL`` seconds, lookups in between cost no query.
+    """
+    global routing_table
+    if routing_table is None:
+        async with session_factory() as session:
+            routing_table = await load_routing_table(session)
+        return routing_table
+
+    interval = config.get_settings().ROUTING_REFRESH_INTERVAL
+    if time.monotonic() - routing_table.checked_at >= interval:
+        routing_table.checked_at = time.monotonic()
+        async with session_factory() as session:
+            if await get_fingerprint(session) != routing_table.fingerprint:
+                routing_table = await load_routing_table(session)
+
+    return routing_table
+
+
+def reset_routing_table():
+    global routing_table
+    routing_table = None
+
+
+async def apply_link(session, from_id: int, to_id: int, link: StationLink | None):
+    """Apply a committed link change to the loaded table, ``link`` is None once deleted."""
+    if routing_table is None:
+        return
+
+    if link is None or not link.is_active:
+        routing_table.remove_link(from_id, to_id)
+    else:
+        routing_table.set_link(from_id, to_id, link.transit_minutes, link.cost)
+    routing_table.fingerprint = await get_fingerprint(session)
+
+
+async def apply_station_deleted(session, station_id: int):
+    """Apply the committed deletion of a station and its links."""
+    if routing_table is None:
+        return
+
+    routing_table.remove_station(station_id)
+    routing_table.fingerprint = await get_fingerprint(session)
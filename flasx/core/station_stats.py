@@ -0,0 +1,111 @@
+"""Parcel counts per station, direction, status and day of creation.
+
+``station_status_count`` is kept up to date in the transaction of every
+parcel change: single parcels add and remove their own keys, set-based
+changes subtract the counts of the affected parcels before the UPDATE and
+add them back after it. The parcels are locked before their old keys are
+read (``SELECT ... FOR UPDATE``), so concurrent changes of the same parcel
+cannot both remove the same key. Reading the counts of every station is then a scan
+of the rollup, whatever the size of the parcel table.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from flasx.models import Parcel, StationStatusCount
+
+DIRECTIONS = {
+    "origin": Parcel.origin_station_id,
+    "destination": Parcel.destination_station_id,
+}
+
+KEY_COLUMNS = ["station_id", "direction", "status", "day"]
+
+
+def upsert(dialect_name: str):
+    """INSERT into the rollup adding ``count`` to existing rows."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    table = StationStatusCount.__table__
+    statement = dialect.insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={"count": table.c.count + statement.excluded.count},
+    )
+
+
+def parcel_keys(parcel, status=None) -> list[tuple]:
+    """Rollup keys counting ``parcel``, a model, a row or a dict of values."""
+    get = parcel.get if isinstance(parcel, dict) else parcel.__getattribute__
+    status = status or get("status")
+    day = get("created_at").date()
+
+    keys = []
+    for direction, column in DIRECTIONS.items():
+        station_id = get(column.key)
+        if station_id is not None:
+            keys.append((station_id, direction, status, day))
+    return keys
+
+
+async def update_counts(
+    session, removed: Iterable[tuple] = (), added: Iterable[tuple] = ()
+):
+    """Apply the difference between ``removed`` and ``added`` keys."""
+    deltas = Counter(added)
+    deltas.subtract(removed)
+
+    values = [
+        dict(zip(KEY_COLUMNS, key), count=delta)
+        for key, delta in deltas.items()
+        if delta
+    ]
+    if values:
+        await session.exec(upsert(session.bind.dialect.name), params=values)
+
+
+def select_counts(direction: str, where=None, sign: int = 1):
+    """Count the parcels matching ``where`` by the rollup key of ``direction``."""
+    column = DIRECTIONS[direction]
+    day = func.date(Parcel.created_at)
+    query = select(
+        column, literal(direction), Parcel.status, day, func.count() * sign
+    ).where(column.is_not(None))
+    if where is not None:
+        query = query.where(where)
+    return query.group_by(column, Parcel.status, day)
+
+
+def add_counts_statements(dialect_name: str, where=None, sign: int = 1) -> list:
+    """Statements adding (or subtracting) the counts of matching parcels."""
+    return [
+        upsert(dialect_name).from_select(
+            KEY_COLUMNS + ["count"], select_counts(direction, where, sign)
+        )
+        for direction in DIRECTIONS
+    ]
+
+
+async def lock_parcels(session, where):
+    """Lock the parcels matching ``where`` until the end of the transaction.
+
+    Rows are locked in ID order so concurrent batches cannot deadlock.
+    SQLite has no row locks, its writers are serialized anyway.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.exec(
+            select(Parcel.id).where(where).order_by(Parcel.id).with_for_update()
+        )
+
+
+async def add_counts(session, where, sign: int = 1):
+    """Set-based ``update_counts`` for the parcels matching ``where``."""
+    for statement in add_counts_statements(session.bind.dialect.name, where, sign):
+        await session.exec(statement)
+
+
+def rebuild_statements(dialect_name: str) -> list:
+    """Statements recounting the whole rollup from the parcel table."""
+    return [delete(StationStatusCount)] + add_counts_statements(dialect_name)
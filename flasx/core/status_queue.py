@@ -0,0 +1,289 @@
+"""Write-behind queue for single parcel status updates.
+
+With ``STATUS_WRITE_BEHIND`` enabled, ``PATCH /v1/parcels/{id}/status`` hands
+the update to this queue and answers ``202``. Updates of the same parcel are
+coalesced (last write wins) and flushed together in one transaction every
+``STATUS_FLUSH_INTERVAL_MS`` or once ``STATUS_FLUSH_MAX_ITEMS`` parcels are
+pending, so thousands of scans share one commit.
+
+``STATUS_WRITE_BEHIND_DURABILITY`` decides when the caller is answered:
+``accepted`` as soon as the update is queued (updates still pending are lost
+if the process dies), ``committed`` once the batch holding it is committed.
+A batch rejected by a constraint is written again parcel by parcel, so only
+the offending updates fail. Failed updates are counted in ``failed``; with
+``accepted`` nobody waits for them, they are logged and dropped.
+"""
+
+import asyncio
+import datetime
+import functools
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import update
+
+from flasx.core import config
+from flasx.core import live
+from flasx.core import parcel_events
+from flasx.core import station_stats
+from flasx.core.cache import get_tracking_cache
+from flasx.core.live import get_live_hub
+from flasx.core.mutations import IN_CHUNK_SIZE
+from flasx.models import Parcel, ParcelStatus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingStatus:
+    status: ParcelStatus
+    station_id: int | None
+    occurred_at: datetime.datetime
+
+
+class StatusWriteQueue:
+    """Coalesces status updates per parcel and commits them in batches."""
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float,
+        max_items: int,
+        durability: str = "committed",
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_items = max_items
+        self.durability = durability
+
+        self.pending: dict[int, PendingStatus] = {}
+        self.events: list[dict] = []
+        self.waiters: list[tuple[int, asyncio.Future]] = []
+
+        self.flushes = 0
+        self.flushed = 0
+        self.coalesced = 0
+        self.failed = 0
+
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flush loop and write whatever is still pending."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+    def submit(
+        self, parcel_id: int, status: ParcelStatus, station_id: int | None = None
+    ) -> asyncio.Future:
+        """Queue a status update.
+
+        The returned future resolves once the batch is committed, to ``True``
+        or to ``False`` when the parcel does not exist.
+        """
+        occurred_at = datetime.datetime.now()
+        if parcel_id in self.pending:
+            self.coalesced += 1
+        self.pending[parcel_id] = PendingStatus(status, station_id, occurred_at)
+        self.events.append(
+            parcel_events.make_event(
+                parcel_id, status, station_id=station_id, occurred_at=occurred_at
+            )
+        )
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(functools.partial(self._on_done, parcel_id))
+        self.waiters.append((parcel_id, future))
+
+        if len(self.pending) >= self.max_items:
+            self._wakeup.set()
+        return future
+
+    def _on_done(self, parcel_id: int, future: asyncio.Future):
+        # retrieving the exception keeps asyncio from reporting it as unhandled
+        if future.cancelled() or future.exception() is None:
+            return
+
+        self.failed += 1
+        if self.durability == "accepted":
+            logger.warning(
+                "Lost the status update of parcel %s: %s",
+                parcel_id,
+                future.exception(),
+            )
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                # the waiters of the batch got the error, keep flushing
+                logger.exception("Failed to flush parcel status updates")
+
+    async def flush(self):
+        """Commit every pending update in one transaction."""
+        async with self._lock:
+            if not self.pending:
+                return
+
+            pending, self.pending = self.pending, {}
+            events, self.events = self.events, []
+            waiters, self.waiters = self.waiters, []
+
+            errors = {}
+            try:
+                updated = await self._write(pending, events)
+            except IntegrityError:
+                # e.g. a station deleted since the update was queued: write
+                # the updates one by one so only the bad ones fail
+                logger.warning("Retrying parcel status updates one by one")
+                updated, errors = await self._write_each(pending, events)
+            except Exception as e:
+                for _, future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+
+            self.flushes += 1
+            self.flushed += len(updated)
+            for parcel_id, future in waiters:
+                if future.done():
+                    continue
+                if parcel_id in errors:
+                    future.set_exception(errors[parcel_id])
+                else:
+                    future.set_result(parcel_id in updated)
+
+        # outside the lock, the next batch is written meanwhile
+        await get_tracking_cache().invalidate(
+            *(row.tracking_number for row in updated.values())
+        )
+        await get_live_hub().publish_many(
+            [
+                message
+                for parcel_id, row in updated.items()
+                for message in live.status_messages(
+                    row.tracking_number,
+                    pending[parcel_id].status,
+                    pending[parcel_id].occurred_at,
+                    station_id=pending[parcel_id].station_id,
+                    destination_station_id=row.destination_station_id,
+                )
+            ]
+        )
+
+    async def _write_each(
+        self, pending: dict[int, PendingStatus], events: list[dict]
+    ) -> tuple[dict[int, Row], dict[int, Exception]]:
+        """Write the updates of each parcel in its own transaction."""
+        events_by_parcel: dict[int, list[dict]] = {}
+        for event in events:
+            events_by_parcel.setdefault(event["parcel_id"], []).append(event)
+
+        updated = {}
+        errors = {}
+        for parcel_id, item in pending.items():
+            try:
+                updated.update(
+                    await self._write(
+                        {parcel_id: item}, events_by_parcel.get(parcel_id, [])
+                    )
+                )
+            except IntegrityError as e:
+                errors[parcel_id] = e
+        return updated, errors
+
+    async def _write(
+        self, pending: dict[int, PendingStatus], events: list[dict]
+    ) -> dict[int, Row]:
+        # one UPDATE per target status and chunk rather than one per parcel
+        by_status: dict[ParcelStatus, list[int]] = {}
+        for parcel_id, item in pending.items():
+            by_status.setdefault(item.status, []).append(parcel_id)
+
+        now = datetime.datetime.now()
+        updated = {}
+        async with self.session_factory() as session:
+            for status, ids in by_status.items():
+                for start in range(0, len(ids), IN_CHUNK_SIZE):
+                    condition = Parcel.id.in_(ids[start : start + IN_CHUNK_SIZE])
+                    await station_stats.lock_parcels(session, condition)
+                    await station_stats.add_counts(session, condition, sign=-1)
+                    result = await session.exec(
+                        update(Parcel)
+                        .where(condition)
+                        .values(status=status, updated_at=now)
+                        .returning(
+                            Parcel.id,
+                            Parcel.tracking_number,
+                            Parcel.destination_station_id,
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    updated.update((row.id, row) for row in result.all())
+                    await station_stats.add_counts(session, condition)
+
+            await parcel_events.record_events(
+                session, [event for event in events if event["parcel_id"] in updated]
+            )
+            await session.commit()
+
+        return updated
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "flushes": self.flushes,
+            "flushed": self.flushed,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+
+status_queue: StatusWriteQueue = None
+
+
+def get_status_queue() -> StatusWriteQueue | None:
+    """Get the running status queue, ``None`` when write-behind is disabled."""
+    return status_queue
+
+
+def start_status_queue(session_factory) -> StatusWriteQueue | None:
+    global status_queue
+    settings = config.get_settings()
+    if settings.STATUS_WRITE_BEHIND and status_queue is None:
+        status_queue = StatusWriteQueue(
+            session_factory,
+            settings.STATUS_FLUSH_INTERVAL_MS / 1000,
+            settings.STATUS_FLUSH_MAX_ITEMS,
+            settings.STATUS_WRITE_BEHIND_DURABILITY,
+        )
+        status_queue.start()
+
+    return status_queue
+
+
+async def close_status_queue():
+    global status_queue
+    if status_queue is not None:
+        await status_queue.close()
+        status_queue = None
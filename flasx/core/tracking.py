@@ -0,0 +1,316 @@
+"""Tracking numbers that are unique by construction.
+
+A tracking number is ``PKG`` + date (``YYYYMMDD``) + node (3 base-36 chars) +
+sequence (7 base-36 chars) + check character, for example
+``PKG20250101001K3Z9QX0B``. Every process owns a node id, and the sequence
+is built from the millisecond of the day and a counter. That gives up to 512
+numbers per millisecond per node without asking the database.
+
+Node ids are leased from ``tracking_node_lease``, one row per node id, so two
+running processes never share one: a process takes an expired row or adds
+the next node id, and fails to start once all ``NODE_COUNT`` are held. The
+lease is renewed every third of ``TRACKING_NODE_LEASE_SECONDS`` together
+with the highest sequence issued, and the next holder of the node id goes on
+from that sequence.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+import re
+import socket
+import threading
+import zlib
+
+from sqlalchemy import exists, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import select, update
+
+from flasx.core import config
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "PKG"
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BASE = len(ALPHABET)
+
+NODE_LENGTH = 3
+SEQUENCE_LENGTH = 7
+NODE_COUNT = BASE**NODE_LENGTH
+SEQUENCE_COUNT = BASE**SEQUENCE_LENGTH
+COUNTER_BITS = 9  # 512 numbers per millisecond before borrowing ahead
+
+TRACKING_NUMBER_PATTERN = re.compile(r"^PKG\d{8}[0-9A-Z]{11}$")
+# numbers issued before the node-aware format, random suffix and no check char
+LEGACY_TRACKING_NUMBER_PATTERN = re.compile(r"^PKG\d{8}[0-9A-Z]{6}$")
+
+
+def encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, BASE)
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def check_character(payload: str) -> str:
+    """Luhn mod 36 check character of ``payload``."""
+    factor = 2
+    total = 0
+    for char in reversed(payload):
+        addend = factor * ALPHABET.index(char)
+        total += addend // BASE + addend % BASE
+        factor = 1 if factor == 2 else 2
+
+    return ALPHABET[(BASE - total % BASE) % BASE]
+
+
+def is_valid_tracking_number(tracking_number: str) -> bool:
+    """Check the shape and check character of a tracking number."""
+    if TRACKING_NUMBER_PATTERN.match(tracking_number):
+        return check_character(tracking_number[:-1]) == tracking_number[-1]
+
+    return LEGACY_TRACKING_NUMBER_PATTERN.match(tracking_number) is not None
+
+
+class TrackingNumberGenerator:
+    def __init__(self, node_id: int, day: str | None = None, last_sequence: int = -1):
+        """``day`` and ``last_sequence`` are the last number issued on the node."""
+        if not 0 <= node_id < NODE_COUNT:
+            raise ValueError(f"node_id must be between 0 and {NODE_COUNT - 1}")
+
+        self.node_id = node_id
+        self._lock = threading.Lock()
+        self._day = day
+        self._last_sequence = last_sequence if day is not None else -1
+
+    def high_water(self) -> tuple[str | None, int]:
+        """The day and sequence of the last number issued."""
+        with self._lock:
+            return self._day, self._last_sequence
+
+    def next(self) -> str:
+        now = datetime.datetime.now()
+        day = now.strftime("%Y%m%d")
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        millisecond = (now - midnight) // datetime.timedelta(milliseconds=1)
+
+        with self._lock:
+            if day != self._day:
+                self._day = day
+                self._last_sequence = -1
+
+            # never go backwards, even when the clock does
+            sequence = max(self._last_sequence + 1, millisecond << COUNTER_BITS)
+            if sequence >= SEQUENCE_COUNT:
+                raise RuntimeError("Tracking number sequence exhausted for today")
+            self._last_sequence = sequence
+
+        payload = (
+            f"{PREFIX}{day}"
+            f"{encode(self.node_id, NODE_LENGTH)}"
+            f"{encode(sequence, SEQUENCE_LENGTH)}"
+        )
+        return payload + check_character(payload)
+
+
+def get_default_node_id() -> int:
+    """Node id from the settings, or derived from the host and process."""
+    settings = config.get_settings()
+    if settings.TRACKING_NODE_ID is not None:
+        return settings.TRACKING_NODE_ID
+
+    return zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode()) % NODE_COUNT
+
+
+generator: TrackingNumberGenerator = None
+
+
+def set_node_id(node_id: int, day: str | None = None, last_sequence: int = -1):
+    global generator
+    generator = TrackingNumberGenerator(node_id, day, last_sequence)
+
+
+def generate_tracking_number() -> str:
+    """Generate a unique tracking number."""
+    if generator is None:
+        set_node_id(get_default_node_id())
+
+    return generator.next()
+
+
+def get_owner() -> dict:
+    return {"hostname": socket.gethostname(), "pid": os.getpid()}
+
+
+async def take_node(session, ttl: float):
+    """Lease a free node id, the lowest expired one or the next new one.
+
+    Returns the ``node_id``, ``day`` and ``sequence`` of the lease row, or
+    ``None`` when another process took the same node id first.
+    """
+    from flasx.models import TrackingNodeLease
+
+    now = datetime.datetime.now()
+    values = dict(
+        get_owner(), started_at=now, expires_at=now + datetime.timedelta(seconds=ttl)
+    )
+    expired = (
+        select(func.min(TrackingNodeLease.node_id))
+        .where(TrackingNodeLease.expires_at < now)
+        .scalar_subquery()
+    )
+    result = await session.exec(
+        update(TrackingNodeLease)
+        .where(
+            TrackingNodeLease.node_id == expired,
+            TrackingNodeLease.expires_at < now,
+        )
+        .values(**values)
+        .returning(
+            TrackingNodeLease.node_id,
+            TrackingNodeLease.day,
+            TrackingNodeLease.sequence,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    lease = result.first()
+    if lease is not None:
+        await session.commit()
+        return lease
+
+    # the lowest node id after a taken one that is not taken, 0 on an empty table
+    next_lease = aliased(TrackingNodeLease)
+    result = await session.exec(
+        select(func.min(TrackingNodeLease.node_id + 1)).where(
+            ~exists().where(next_lease.node_id == TrackingNodeLease.node_id + 1)
+        )
+    )
+    node_id = result.one() or 0
+    if node_id >= NODE_COUNT:
+        raise RuntimeError(f"All {NODE_COUNT} tracking node ids are leased")
+
+    session.add(TrackingNodeLease(node_id=node_id, **values))
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return None
+    return node_id, None, -1
+
+
+async def take_configured_node(session, node_id: int, ttl: float):
+    """Take the row of ``TRACKING_NODE_ID`` whoever holds it."""
+    from flasx.models import TrackingNodeLease
+
+    now = datetime.datetime.now()
+    values = dict(
+        get_owner(), started_at=now, expires_at=now + datetime.timedelta(seconds=ttl)
+    )
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(TrackingNodeLease).values(node_id=node_id, **values)
+    result = await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=["node_id"], set_=values
+        ).returning(
+            TrackingNodeLease.node_id,
+            TrackingNodeLease.day,
+            TrackingNodeLease.sequence,
+        )
+    )
+    lease = result.one()
+    await session.commit()
+    return lease
+
+
+async def lease_node_id(session_factory) -> int:
+    """Give this process a node id no other running process holds.
+
+    ``TRACKING_NODE_ID`` wins when set. Otherwise the node id is leased from
+    ``tracking_node_lease``, so workers on the same or on different hosts get
+    different node ids. The lease is renewed in the background until
+    ``release_node_id``.
+    """
+    settings = config.get_settings()
+    ttl = settings.TRACKING_NODE_LEASE_SECONDS
+
+    async with session_factory() as session:
+        if settings.TRACKING_NODE_ID is not None:
+            lease = await take_configured_node(session, settings.TRACKING_NODE_ID, ttl)
+        else:
+            # another process may take the same row or node id, try the next one
+            for _ in range(10):
+                lease = await take_node(session, ttl)
+                if lease is not None:
+                    break
+            else:
+                raise RuntimeError("Could not lease a tracking node id")
+
+    node_id, day, sequence = lease
+    set_node_id(node_id, day, sequence)
+    start_lease_renewal(session_factory)
+    return node_id
+
+
+async def store_node_lease(session_factory, expires_at: datetime.datetime) -> bool:
+    """Set the expiry of the lease and store the highest sequence issued.
+
+    Returns ``False`` when the lease was lost to another process.
+    """
+    from flasx.models import TrackingNodeLease
+
+    owner = get_owner()
+    day, sequence = generator.high_water()
+    async with session_factory() as session:
+        result = await session.exec(
+            update(TrackingNodeLease)
+            .where(
+                TrackingNodeLease.node_id == generator.node_id,
+                TrackingNodeLease.hostname == owner["hostname"],
+                TrackingNodeLease.pid == owner["pid"],
+            )
+            .values(expires_at=expires_at, day=day, sequence=sequence)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return result.rowcount > 0
+
+
+renewal_task: asyncio.Task = None
+
+
+def start_lease_renewal(session_factory):
+    global renewal_task
+    if renewal_task is None:
+        renewal_task = asyncio.create_task(_renew_lease(session_factory))
+
+
+async def _renew_lease(session_factory):
+    ttl = config.get_settings().TRACKING_NODE_LEASE_SECONDS
+    while True:
+        await asyncio.sleep(ttl / 3)
+        expires_at = datetime.datetime.now() + datetime.timedelta(seconds=ttl)
+        try:
+            if not await store_node_lease(session_factory, expires_at):
+                logger.error(
+                    "Lost the lease of tracking node %s, leasing another",
+                    generator.node_id,
+                )
+                await lease_node_id(session_factory)
+        except Exception:
+            logger.exception("Failed to renew the tracking node lease")
+
+
+async def release_node_id(session_factory):
+    """Store the highest sequence and free the node id for the next process."""
+    global renewal_task
+    if renewal_task is None:
+        return
+
+    renewal_task.cancel()
+    await asyncio.gather(renewal_task, return_exceptions=True)
+    renewal_task = None
+    await store_node_lease(session_factory, datetime.datetime.now())
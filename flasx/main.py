@@ -3,6 +3,12 @@ from fastapi import FastAPI
 
 from . import models
 from . import routers
+from .core import cache
+from .core import export_jobs
+from .core import live
+from .core import station_directory
+from .core import status_queue
+from .core import tracking
 
 
 @asynccontextmanager
@@ -10,8 +16,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     await models.init_db()
+    await tracking.lease_node_id(models.async_session)
+    await station_directory.start_station_directory(models.read_async_session)
+    await live.start_live_hub()
+    status_queue.start_status_queue(models.async_session)
+    await export_jobs.start_export_workers(
+        models.async_session, models.read_async_session
+    )
     yield
     # Shutdown
+    await export_jobs.close_export_workers()
+    await status_queue.close_status_queue()
+    await tracking.release_node_id(models.async_session)
+    await live.close_live_hub()
+    await cache.close_tracking_cache()
     await models.close_db()
 
 
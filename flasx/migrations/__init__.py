@@ -0,0 +1,144 @@
+"""Versioned schema migrations.
+
+The applied version is stored in the ``schema_version`` table. Migrations are
+registered in ``versions.py`` with the ``migration`` decorator and run in
+order, each one receiving a synchronous SQLAlchemy connection.
+"""
+
+import datetime
+from typing import Callable
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# arbitrary key for pg_advisory_xact_lock so only one process migrates at a time
+ADVISORY_LOCK_KEY = 6_840_001
+
+schema_version_metadata = MetaData()
+schema_version = Table(
+    SCHEMA_VERSION_TABLE,
+    schema_version_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration:
+    def __init__(self, version: int, description: str, upgrade: Callable):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+    def __repr__(self) -> str:
+        return f"<Migration {self.version:04d} {self.description}>"
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register ``upgrade(connection)`` as the migration to ``version``."""
+
+    def decorator(upgrade: Callable) -> Callable:
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Duplicated migration version {version}")
+
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return upgrade
+
+    return decorator
+
+
+def head_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def _read_version(connection) -> int:
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def _has_version_table(connection) -> bool:
+    return inspect(connection).has_table(SCHEMA_VERSION_TABLE)
+
+
+async def _is_missing_version_table(conn) -> bool:
+    """Whether a failed version lookup failed for want of the table.
+
+    Only then is the database unmigrated; any other error, e.g. a
+    permission error, must not be taken for version 0.
+    """
+    await conn.rollback()
+    return not await conn.run_sync(_has_version_table)
+
+
+async def get_current_version(engine: AsyncEngine) -> int:
+    """Read the applied schema version in a single query, 0 if never migrated."""
+    async with engine.connect() as conn:
+        try:
+            return await conn.run_sync(_read_version)
+        except (OperationalError, ProgrammingError):
+            if await _is_missing_version_table(conn):
+                return 0
+            raise
+
+
+def _upgrade(connection, target: int) -> list[Migration]:
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+        )
+
+    schema_version_metadata.create_all(connection, checkfirst=True)
+
+    # read again under the lock, another process may have migrated meanwhile
+    current = _read_version(connection)
+    applied = []
+    for m in MIGRATIONS:
+        if m.version <= current or m.version > target:
+            continue
+
+        m.upgrade(connection)
+        connection.execute(
+            schema_version.insert().values(
+                version=m.version,
+                description=m.description,
+                applied_at=datetime.datetime.now(),
+            )
+        )
+        applied.append(m)
+
+    return applied
+
+
+async def upgrade(engine: AsyncEngine, target: int | None = None) -> list[Migration]:
+    """Apply pending migrations up to ``target`` (head by default)."""
+    if target is None:
+        target = head_version()
+
+    async with engine.begin() as conn:
+        return await conn.run_sync(_upgrade, target)
+
+
+async def get_history(engine: AsyncEngine) -> list[dict]:
+    """List the applied migrations."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(
+                select(schema_version).order_by(schema_version.c.version)
+            )
+        except (OperationalError, ProgrammingError):
+            if await _is_missing_version_table(conn):
+                return []
+            raise
+
+        return [dict(row._mapping) for row in result]
+
+
+# register the migrations
+from . import versions
@@ -0,0 +1,169 @@
+"""Schema migrations, in version order.
+
+Migrations must be idempotent against a database created from the current
+models: version 1 creates the original tables from the current models, so
+later migrations only add what an older database is missing
+(``checkfirst=True`` or ``IF NOT EXISTS``). Tables introduced after version 1
+are created by their own migration.
+"""
+
+from sqlalchemy import inspect, insert, select, text
+from sqlmodel import SQLModel
+
+from flasx import models  # noqa: F401 populate SQLModel.metadata
+from flasx.core import config
+from flasx.core import customer_search
+from flasx.core import parcel_events
+from flasx.core import station_stats
+
+from . import migration
+
+
+def create_indexes(connection, table, names: list[str]):
+    """Create the named indexes declared on ``table`` when they are missing."""
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+
+def add_columns(connection, table, names: list[str]):
+    """Add the named columns declared on ``table`` when they are missing."""
+    existing = {
+        column["name"] for column in inspect(connection).get_columns(table.name)
+    }
+    for name in names:
+        if name in existing:
+            continue
+
+        column = table.c[name]
+        ddl = f"{name} {column.type.compile(dialect=connection.dialect)}"
+        for foreign_key in column.foreign_keys:
+            referred = foreign_key.column
+            ddl += f" REFERENCES {referred.table.name} ({referred.name})"
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+@migration(1, "Initial schema")
+def initial_schema(connection):
+    SQLModel.metadata.create_all(
+        connection,
+        tables=[
+            models.Customer.__table__,
+            models.Station.__table__,
+            models.Vehicle.__table__,
+            models.DeliveryStaff.__table__,
+            models.Parcel.__table__,
+            models.DBUser.__table__,
+        ],
+        checkfirst=True,
+    )
+
+
+@migration(2, "Parcel listing and foreign key indexes")
+def parcel_indexes(connection):
+    create_indexes(
+        connection,
+        models.Parcel.__table__,
+        [
+            "ix_parcel_status_created_at",
+            "ix_parcel_sender_id_created_at",
+            "ix_parcel_receiver_id_created_at",
+            "ix_parcel_created_at",
+            "ix_parcel_origin_station_id",
+            "ix_parcel_destination_station_id",
+            "ix_parcel_vehicle_id",
+            "ix_parcel_delivery_staff_id",
+        ],
+    )
+
+
+@migration(3, "Tracking number node leases")
+def tracking_node_lease(connection):
+    models.TrackingNodeLease.__table__.create(connection, checkfirst=True)
+
+
+@migration(4, "Parcel status event log")
+def parcel_event_log(connection):
+    settings = config.get_settings()
+    table = models.ParcelEvent.__table__
+    if settings.PARCEL_EVENT_PARTITIONING and connection.dialect.name == "postgresql":
+        parcel_events.create_partitioned_table(connection)
+    else:
+        table.create(connection, checkfirst=True)
+
+    # start every existing parcel's timeline with its current status
+    connection.execute(
+        insert(table).from_select(
+            ["parcel_id", "status", "occurred_at"],
+            select(models.Parcel.id, models.Parcel.status, models.Parcel.updated_at),
+        )
+    )
+
+
+@migration(5, "Export jobs")
+def export_jobs(connection):
+    models.ExportJob.__table__.create(connection, checkfirst=True)
+
+
+@migration(6, "Station parcel count rollup")
+def station_status_count(connection):
+    models.StationStatusCount.__table__.create(connection, checkfirst=True)
+    for statement in station_stats.rebuild_statements(connection.dialect.name):
+        connection.execute(statement)
+
+
+@migration(7, "Vehicle volume capacity and home station")
+def vehicle_load_planning(connection):
+    table = models.Vehicle.__table__
+    add_columns(connection, table, ["volume_capacity", "station_id"])
+    create_indexes(connection, table, ["ix_vehicle_station_id"])
+
+
+@migration(8, "Delivery staff workload index")
+def delivery_staff_workload_index(connection):
+    create_indexes(
+        connection, models.Parcel.__table__, ["ix_parcel_delivery_staff_id_status"]
+    )
+
+
+@migration(9, "Station links")
+def station_links(connection):
+    models.StationLink.__table__.create(connection, checkfirst=True)
+
+
+@migration(10, "Station coordinates")
+def station_coordinates(connection):
+    add_columns(connection, models.Station.__table__, ["latitude", "longitude"])
+
+
+@migration(11, "Cache versions")
+def cache_versions(connection):
+    models.CacheVersion.__table__.create(connection, checkfirst=True)
+
+
+@migration(12, "Customer search indexes")
+def customer_search_indexes(connection):
+    # expression indexes are not reflected, create_indexes cannot check them
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_customer_lower_name "
+            "ON customer (lower(name))"
+        )
+    )
+    for statement in customer_search.setup_statements(connection.dialect.name):
+        connection.execute(text(statement))
+
+
+@migration(13, "Export job heartbeat")
+def export_job_heartbeat(connection):
+    add_columns(connection, models.ExportJob.__table__, ["heartbeat_at"])
+
+
+@migration(14, "Bounded tracking node leases")
+def bounded_tracking_node_lease(connection):
+    # leases only live as long as their process, the old rows can go
+    table = models.TrackingNodeLease.__table__
+    columns = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    if "node_id" not in columns:
+        table.drop(connection)
+    table.create(connection, checkfirst=True)
@@ -2,12 +2,13 @@
 # Import order matters to avoid circular imports
 
 import asyncio
+import logging
 from typing import AsyncIterator
 
+from fastapi import Request
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, async_sessionmaker
 
 from flasx.core import config
 
@@ -17,49 +18,205 @@ from .station_model import *
 from .vehicle_model import *
 from .delivery_staff_model import *
 from .parcel_model import *
+from .parcel_event_model import *
+from .station_stats_model import *
+from .station_link_model import *
 from .user_model import *
+from .tracking_node_model import *
+from .export_job_model import *
+from .cache_version_model import *
+
+from . import pool
+from . import routing
+from . import sqlite
+
+logger = logging.getLogger(__name__)
 
 connect_args = {"check_same_thread": False}
 
 engine: AsyncEngine = None
+async_session: async_sessionmaker[AsyncSession] = None
+
+# read-only engine, the same objects as the primary when no replica is configured
+read_engine: AsyncEngine = None
+read_async_session: async_sessionmaker[AsyncSession] = None
+recent_writes: routing.RecentWrites = None
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def get_engine_options(
+    settings: config.Settings,
+    url: str,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+) -> dict:
+    """Build ``create_async_engine`` keyword arguments for ``url``."""
+    options = dict(echo=settings.SQLDB_ECHO, future=True)
+
+    if sqlite.is_memory_database(url):
+        # in-memory SQLite lives in a single connection, keep the default pool
+        return options
+
+    options.update(
+        poolclass=pool.InstrumentedAsyncQueuePool,
+        pool_size=settings.SQLDB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=(
+            settings.SQLDB_MAX_OVERFLOW if max_overflow is None else max_overflow
+        ),
+        pool_timeout=settings.SQLDB_POOL_TIMEOUT,
+        pool_recycle=settings.SQLDB_POOL_RECYCLE,
+        pool_pre_ping=settings.SQLDB_POOL_PRE_PING,
+    )
+    return options
 
 
 async def init_db():
-    """Initialize the database engine and create tables."""
-    global engine
+    """Initialize the database engines and check the schema version."""
+    await init_engines()
+    await check_schema_version()
+
+
+async def init_engines():
+    """Initialize the database engines and session factories."""
+    global engine, async_session, read_engine, read_async_session, recent_writes
 
     settings = config.get_settings()
     print("SQLDB_URL:", settings.SQLDB_URL)
-    engine = create_async_engine(
-        settings.SQLDB_URL,
-        echo=True,
-        future=True,
-        # connect_args=connect_args,
+    read_after_write_window = settings.SQLDB_READ_AFTER_WRITE_WINDOW
+
+    if sqlite.is_performance_mode(settings):
+        if settings.SQLDB_READ_URL:
+            logger.warning(
+                "SQLDB_READ_URL is ignored with SQLITE_PERFORMANCE_MODE, "
+                "reads use the reader pool on SQLDB_URL"
+            )
+
+        # every write waits in the pool queue for the single writer connection
+        engine = create_async_engine(
+            settings.SQLDB_URL,
+            **get_engine_options(
+                settings, settings.SQLDB_URL, pool_size=1, max_overflow=0
+            ),
+        )
+        sqlite.configure_engine(engine, settings, writer=True)
+
+        read_engine = create_async_engine(
+            settings.SQLDB_URL,
+            **get_engine_options(
+                settings,
+                settings.SQLDB_URL,
+                pool_size=settings.SQLITE_READ_POOL_SIZE,
+                max_overflow=0,
+            ),
+        )
+        sqlite.configure_engine(read_engine, settings, writer=False)
+
+        # readers share the database file and see every committed write
+        read_after_write_window = 0
+    else:
+        engine = create_async_engine(
+            settings.SQLDB_URL,
+            **get_engine_options(settings, settings.SQLDB_URL),
+        )
+        read_engine = engine
+        if settings.SQLDB_READ_URL:
+            read_engine = create_async_engine(
+                settings.SQLDB_READ_URL,
+                **get_engine_options(settings, settings.SQLDB_READ_URL),
+            )
+
+    async_session = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
     )
+    read_async_session = async_session
+    if read_engine is not engine:
+        read_async_session = async_sessionmaker(
+            read_engine, class_=AsyncSession, expire_on_commit=False
+        )
 
-    await create_db_and_tables()
+    recent_writes = routing.RecentWrites(read_after_write_window)
 
 
-async def create_db_and_tables():
-    """Create database tables."""
-    async with engine.begin() as conn:
-        # await conn.run_sync(SQLModel.metadata.drop_all)
-        await conn.run_sync(SQLModel.metadata.create_all)
+async def check_schema_version():
+    """Make sure the schema is at the latest migration before serving.
 
+    A database already at head costs a single query. Older databases are
+    migrated when ``SQLDB_AUTO_MIGRATE`` is enabled, otherwise startup fails.
+    """
+    from flasx import migrations
 
-async def get_session() -> AsyncIterator[AsyncSession]:
-    """Get async database session."""
-    if engine is None:
+    settings = config.get_settings()
+    version = await migrations.get_current_version(engine)
+    head = migrations.head_version()
+    if version >= head:
+        return
+
+    if not settings.SQLDB_AUTO_MIGRATE:
+        raise Exception(
+            f"Database schema is at version {version}, expected {head}. "
+            "Run `flasx migrate upgrade` first."
+        )
+
+    for m in await migrations.upgrade(engine):
+        logger.info("Applied migration %04d: %s", m.version, m.description)
+
+
+async def get_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Get async database session on the primary."""
+    if async_session is None:
         raise Exception("Database engine is not initialized. Call init_db() first.")
 
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+    # pin the client's following reads to the primary while it writes
+    is_write = request.method not in SAFE_METHODS
+    if is_write:
+        recent_writes.mark(routing.get_client_key(request))
+
+    try:
+        async with async_session() as session:
+            yield session
+    finally:
+        if is_write:
+            recent_writes.mark(routing.get_client_key(request))
+
+
+def get_read_session_factory(request: Request) -> async_sessionmaker[AsyncSession]:
+    """Get the session factory for reads, the replica's unless the client wrote recently.
+
+    Streaming responses open their own session with it, a session dependency
+    is closed before the response body is sent.
+    """
+    if read_async_session is None:
+        raise Exception("Database engine is not initialized. Call init_db() first.")
+
+    if recent_writes.is_recent(routing.get_client_key(request)):
+        return async_session
+    return read_async_session
+
+
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Get async database session for reads, served by the replica if any."""
+    async with get_read_session_factory(request)() as session:
         yield session
 
 
+def get_pool_stats(replica: bool = False) -> dict:
+    """Get connection pool statistics of the primary or read engine."""
+    if engine is None:
+        raise Exception("Database engine is not initialized. Call init_db() first.")
+
+    return pool.get_pool_stats(read_engine if replica else engine)
+
+
 async def close_db():
-    """Close database connection."""
-    global engine
+    """Close database connections."""
+    global engine, async_session, read_engine, read_async_session
+    if read_engine is not None and read_engine is not engine:
+        await read_engine.dispose()
+    read_engine = None
+    read_async_session = None
+
     if engine is not None:
         await engine.dispose()
         engine = None
+        async_session = None
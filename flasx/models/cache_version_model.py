@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+
+class CacheVersion(SQLModel, table=True):
+    """Change counter of data cached in every worker, see station_directory"""
+
+    __tablename__ = "cache_version"
+
+    name: str = Field(primary_key=True)
+    version: int = 0
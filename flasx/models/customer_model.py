@@ -1,5 +1,6 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
+from sqlalchemy import Index, func
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -28,3 +29,7 @@ class Customer(CustomerBase, table=True):
         back_populates="receiver",
         sa_relationship_kwargs={"foreign_keys": "Parcel.receiver_id"},
     )
+
+
+# name prefix lookups of the customer autocomplete
+Index("ix_customer_lower_name", func.lower(Customer.name))
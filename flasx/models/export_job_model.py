@@ -0,0 +1,34 @@
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import JSON, Column
+from sqlmodel import SQLModel, Field
+
+
+class ExportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJob(SQLModel, table=True):
+    """Export of a table to a file, written by the export workers"""
+
+    __tablename__ = "export_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str
+    format: str
+    filters: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    status: ExportStatus = Field(default=ExportStatus.PENDING, index=True)
+    total_rows: Optional[int] = None
+    rows_written: int = 0
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    # last progress of the worker running the job
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
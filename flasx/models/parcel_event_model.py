@@ -0,0 +1,25 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+from .parcel_model import ParcelStatus
+
+
+class ParcelEvent(SQLModel, table=True):
+    """Append-only history of parcel status changes"""
+
+    __tablename__ = "parcel_event"
+    # A parcel timeline is one range scan of this index
+    __table_args__ = (
+        Index(
+            "ix_parcel_event_parcel_id_occurred_at", "parcel_id", "occurred_at", "id"
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    parcel_id: int = Field(foreign_key="parcel.id")
+    status: ParcelStatus
+    station_id: Optional[int] = Field(default=None, foreign_key="station.id")
+    occurred_at: datetime = Field(default_factory=datetime.now, index=True)
+    note: Optional[str] = None
@@ -2,6 +2,7 @@ from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -35,6 +36,18 @@ class ParcelBase(SQLModel):
 
 
 class Parcel(ParcelBase, table=True):
+    # Listing filters on status, sender or receiver and pages in creation
+    # order, the id makes the order unique. The leading columns also serve
+    # the sender/receiver foreign key lookups.
+    __table_args__ = (
+        Index("ix_parcel_status_created_at", "status", "created_at", "id"),
+        Index("ix_parcel_sender_id_created_at", "sender_id", "created_at", "id"),
+        Index("ix_parcel_receiver_id_created_at", "receiver_id", "created_at", "id"),
+        Index("ix_parcel_created_at", "created_at", "id"),
+        # courier workloads count their parcels by status
+        Index("ix_parcel_delivery_staff_id_status", "delivery_staff_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -42,13 +55,17 @@ class Parcel(ParcelBase, table=True):
     # Foreign keys
     sender_id: int = Field(foreign_key="customer.id")
     receiver_id: int = Field(foreign_key="customer.id")
-    origin_station_id: Optional[int] = Field(default=None, foreign_key="station.id")
+    origin_station_id: Optional[int] = Field(
+        default=None, foreign_key="station.id", index=True
+    )
     destination_station_id: Optional[int] = Field(
-        default=None, foreign_key="station.id"
+        default=None, foreign_key="station.id", index=True
+    )
+    vehicle_id: Optional[int] = Field(
+        default=None, foreign_key="vehicle.id", index=True
     )
-    vehicle_id: Optional[int] = Field(default=None, foreign_key="vehicle.id")
     delivery_staff_id: Optional[int] = Field(
-        default=None, foreign_key="deliverystaff.id"
+        default=None, foreign_key="deliverystaff.id", index=True
     )
 
     # Relationships
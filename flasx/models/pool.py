@@ -0,0 +1,87 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class CheckoutStats:
+    """Running counters for connection checkouts of a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.last_wait = wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": (self.total_wait / attempts * 1000) if attempts else 0.0,
+                "wait_max_ms": self.max_wait * 1000,
+                "wait_last_ms": self.last_wait * 1000,
+            }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def get_pool_stats(engine) -> dict:
+    """Return a snapshot of the connection pool used by ``engine``."""
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "checked_out": None,
+        "idle": None,
+        "overflow": None,
+        "max_overflow": None,
+        "timeout": None,
+    }
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+
+    checkout_stats = getattr(pool, "checkout_stats", None)
+    if checkout_stats is not None:
+        stats.update(checkout_stats.as_dict())
+
+    return stats
@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+
+CLIENT_ID_HEADER = "X-Client-ID"
+
+
+def get_client_key(request: Request) -> str:
+    """Identify the client of a request for read-your-writes routing."""
+    client_id = request.headers.get(CLIENT_ID_HEADER)
+    if client_id:
+        return client_id
+
+    if request.client:
+        return request.client.host
+
+    return "anonymous"
+
+
+class RecentWrites:
+    """Remember which clients wrote recently so their reads stay on the primary."""
+
+    def __init__(self, window: float, max_clients: int = 100_000):
+        self.window = window
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._expires: OrderedDict[str, float] = OrderedDict()
+
+    def mark(self, client: str):
+        now = time.monotonic()
+        with self._lock:
+            self._expires[client] = now + self.window
+            self._expires.move_to_end(client)
+
+            # entries are kept in expiry order, drop the stale and oldest ones
+            while self._expires:
+                oldest, expires = next(iter(self._expires.items()))
+                if expires > now and len(self._expires) <= self.max_clients:
+                    break
+                del self._expires[oldest]
+
+    def is_recent(self, client: str) -> bool:
+        with self._lock:
+            expires = self._expires.get(client)
+
+        return expires is not None and expires > time.monotonic()
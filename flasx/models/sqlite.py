@@ -0,0 +1,50 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from flasx.core import config
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_memory_database(url: str) -> bool:
+    """In-memory SQLite lives in a single connection and cannot be pooled."""
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def is_performance_mode(settings: config.Settings) -> bool:
+    """Whether the SQLite performance profile applies to the primary database."""
+    return settings.SQLITE_PERFORMANCE_MODE and not is_memory_database(
+        settings.SQLDB_URL
+    )
+
+
+def configure_engine(engine: AsyncEngine, settings: config.Settings, writer: bool):
+    """Apply the performance PRAGMAs on every new connection of ``engine``.
+
+    The writer starts its transactions with ``BEGIN IMMEDIATE`` so it takes the
+    write lock up front instead of failing to upgrade a read lock. Readers are
+    switched to ``query_only`` and never block the writer in WAL mode.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # let the "begin" event below emit BEGIN instead of the driver
+        dbapi_connection.isolation_level = None
+
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if not writer:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
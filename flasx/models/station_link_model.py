@@ -0,0 +1,23 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from sqlmodel import SQLModel, Field
+
+
+class StationLinkBase(SQLModel):
+    transit_minutes: float  # time to carry a parcel along the link
+    cost: float = 0.0
+    is_active: bool = Field(default=True)
+
+
+class StationLink(StationLinkBase, table=True):
+    """Line haul from one station to another, one direction"""
+
+    __tablename__ = "station_link"
+    __table_args__ = (UniqueConstraint("from_station_id", "to_station_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    from_station_id: int = Field(foreign_key="station.id", index=True)
+    to_station_id: int = Field(foreign_key="station.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -14,6 +14,9 @@ class StationBase(SQLModel):
     state: str = Field(index=True)
     postal_code: str
     phone: Optional[str] = None
+    # WGS84 degrees, used to find the nearest stations
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     is_active: bool = Field(default=True)
 
 
@@ -0,0 +1,21 @@
+from datetime import date
+from sqlmodel import SQLModel, Field
+
+from .parcel_model import ParcelStatus
+
+
+class StationStatusCount(SQLModel, table=True):
+    """Parcels per station, direction and status by day of creation
+
+    Maintained in the same transaction as the parcel changes, rebuilt from
+    the parcel table by ``flasx stats rebuild``.
+    """
+
+    __tablename__ = "station_status_count"
+
+    station_id: int = Field(primary_key=True)
+    # "origin" or "destination"
+    direction: str = Field(primary_key=True)
+    status: ParcelStatus = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    count: int = 0
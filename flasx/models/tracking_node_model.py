@@ -0,0 +1,22 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import BigInteger, Column
+from sqlmodel import SQLModel, Field
+
+
+class TrackingNodeLease(SQLModel, table=True):
+    """One row per tracking number node id, held by one process at a time"""
+
+    __tablename__ = "tracking_node_lease"
+
+    node_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    hostname: str
+    pid: int
+    started_at: datetime = Field(default_factory=datetime.now)
+    # renewed by the holder, the node id is free again once passed
+    expires_at: datetime = Field(index=True)
+    # highest sequence issued on ``day`` (YYYYMMDD), the next holder goes on from it
+    day: Optional[str] = None
+    sequence: int = Field(
+        default=-1, sa_column=Column(BigInteger, nullable=False, default=-1)
+    )
@@ -10,6 +10,10 @@ class VehicleBase(SQLModel):
     license_plate: str = Field(unique=True, index=True)
     type: str = Field(index=True)  # truck, van, motorcycle, etc.
     capacity: float  # in kg
+    volume_capacity: Optional[float] = None  # in m3, unlimited when unset
+    station_id: Optional[int] = Field(
+        default=None, foreign_key="station.id", index=True
+    )
     is_active: bool = Field(default=True)
 
 
@@ -8,6 +8,12 @@ from . import (
     authentication_router,
     user_router,
     hello_router,
+    admin_router,
+    export_router,
+    live_router,
+    stats_router,
+    quote_router,
+    dispatch_router,
 )
 
 router = APIRouter(prefix="/v1")
@@ -18,6 +24,12 @@ router.include_router(delivery_staff_router.router)
 router.include_router(parcel_router.router)
 router.include_router(authentication_router.router)
 router.include_router(user_router.router)
+router.include_router(admin_router.router)
+router.include_router(export_router.router)
+router.include_router(live_router.router)
+router.include_router(stats_router.router)
+router.include_router(quote_router.router)
+router.include_router(dispatch_router.router)
 
 # add test router to v1
 from . import hello_router
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException, Depends
+
+from flasx.schemas import admin_schema
+from flasx import models
+from flasx.core import deps
+from flasx.core.cache import TrackingCache, get_tracking_cache
+from flasx.core.live import LiveHub, get_live_hub
+from flasx.core.status_queue import StatusWriteQueue, get_status_queue
+
+# process internals, for signed-in users only
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(deps.get_current_user)]
+)
+
+
+@router.get(
+    "/pool",
+    summary="Get connection pool statistics",
+    description="Report checked-out, idle and overflow connections and checkout wait times.",
+    response_model=admin_schema.PoolStats,
+)
+async def get_pool_stats(replica: bool = False) -> admin_schema.PoolStats:
+    """Get connection pool statistics of the primary or read replica engine."""
+    if models.engine is None:
+        raise HTTPException(
+            status_code=503, detail="Database engine is not initialized"
+        )
+
+    return admin_schema.PoolStats(**models.get_pool_stats(replica=replica))
+
+
+@router.get(
+    "/cache",
+    summary="Get tracking cache statistics",
+    description="Report hits, misses and invalidations of the tracking cache.",
+    response_model=admin_schema.CacheStats,
+)
+async def get_cache_stats(
+    cache: TrackingCache = Depends(get_tracking_cache),
+) -> admin_schema.CacheStats:
+    """Get tracking cache statistics of this process."""
+    return admin_schema.CacheStats(**cache.stats())
+
+
+@router.get(
+    "/live",
+    summary="Get live tracking statistics",
+    description="Report subscriptions and published, delivered and dropped messages of the live tracking hub.",
+    response_model=admin_schema.LiveStats,
+)
+async def get_live_stats(
+    hub: LiveHub = Depends(get_live_hub),
+) -> admin_schema.LiveStats:
+    """Get live tracking hub statistics of this process."""
+    return admin_schema.LiveStats(**hub.stats())
+
+
+@router.get(
+    "/status-queue",
+    summary="Get status write-behind statistics",
+    description="Report pending, flushed, coalesced and failed status updates of the write-behind queue.",
+    response_model=admin_schema.StatusQueueStats,
+)
+async def get_status_queue_stats(
+    status_queue: StatusWriteQueue | None = Depends(get_status_queue),
+) -> admin_schema.StatusQueueStats:
+    """Get status write-behind queue statistics of this process."""
+    if status_queue is None:
+        raise HTTPException(status_code=404, detail="Status write-behind is disabled")
+
+    return admin_schema.StatusQueueStats(**status_queue.stats())
@@ -1,11 +1,13 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime
-from sqlmodel import select
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlmodel import or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from flasx.core import customer_search
+from flasx.core import mutations
+from flasx.core import pagination
 from flasx.schemas import customer_schema
-from flasx.models import get_session, Customer
+from flasx.models import get_session, get_read_session, Customer, Parcel
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
@@ -17,11 +19,14 @@ router = APIRouter(prefix="/customers", tags=["customers"])
     response_model=list[customer_schema.Customer],
 )
 async def get_customers(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: pagination.SortKey = "id",
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[customer_schema.Customer]:
     """Get all customers with optional pagination and filtering."""
     query = select(Customer)
@@ -30,19 +35,59 @@ async def get_customers(
     if is_active is not None:
         query = query.where(Customer.is_active == is_active)
     if search:
-        query = query.where(
-            (Customer.name.ilike(f"%{search}%")) | (Customer.email.ilike(f"%{search}%"))
-        )
+        backend = customer_search.get_search_backend(session.bind.dialect.name)
+        query = query.where(backend.match(search))
 
     # Apply pagination
-    query = query.offset(skip).limit(limit)
+    query = pagination.paginate(query, Customer, sort, limit, skip=skip, cursor=cursor)
 
     result = await session.exec(query)
     customers = result.all()
+    pagination.set_next_cursor(response, customers, sort, limit)
 
     return [customer_schema.Customer.model_validate(customer) for customer in customers]
 
 
+@router.get(
+    "/search",
+    summary="Search customers",
+    description="Find customers whose name or email contains the text, best matches first.",
+    response_model=list[customer_schema.Customer],
+)
+async def search_customers(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    is_active: Optional[bool] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> list[customer_schema.Customer]:
+    """Search customers with the search index of the database."""
+    backend = customer_search.get_search_backend(session.bind.dialect.name)
+    result = await session.exec(backend.search(q, limit, is_active=is_active))
+    return [
+        customer_schema.Customer.model_validate(customer) for customer in result.all()
+    ]
+
+
+@router.get(
+    "/autocomplete",
+    summary="Autocomplete customers",
+    description="Suggest active customers for a typeahead, names starting with the text first.",
+    response_model=list[customer_schema.CustomerSuggestion],
+)
+async def autocomplete_customers(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=10, ge=1, le=50),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[customer_schema.CustomerSuggestion]:
+    """Suggest customers for the text typed so far."""
+    backend = customer_search.get_search_backend(session.bind.dialect.name)
+    customers = await backend.autocomplete(session, q, limit)
+    return [
+        customer_schema.CustomerSuggestion.model_validate(customer)
+        for customer in customers
+    ]
+
+
 @router.get(
     "/{customer_id}",
     summary="Get a customer by ID",
@@ -50,7 +95,7 @@ async def get_customers(
     response_model=customer_schema.Customer,
 )
 async def get_customer(
-    customer_id: int, session: AsyncSession = Depends(get_session)
+    customer_id: int, session: AsyncSession = Depends(get_read_session)
 ) -> customer_schema.Customer:
     """Get a single customer by ID."""
     customer = await session.get(Customer, customer_id)
@@ -67,7 +112,7 @@ async def get_customer(
     response_model=customer_schema.Customer,
 )
 async def get_customer_by_email(
-    email: str, session: AsyncSession = Depends(get_session)
+    email: str, session: AsyncSession = Depends(get_read_session)
 ) -> customer_schema.Customer:
     """Get a single customer by email."""
     query = select(Customer).where(Customer.email == email)
@@ -121,34 +166,19 @@ async def update_customer(
     customer_update: customer_schema.CustomerUpdate,
     session: AsyncSession = Depends(get_session),
 ) -> customer_schema.Customer:
-    """Update an existing customer."""
-    db_customer = await session.get(Customer, customer_id)
-    if not db_customer:
+    """Update an existing customer in one UPDATE ... RETURNING."""
+    customer = await mutations.update_returning(
+        session,
+        Customer,
+        customer_id,
+        customer_update.model_dump(exclude_unset=True),
+        conflicts={"email": "Email already registered"},
+    )
+    if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    # Check if email is being updated and already exists
-    if customer_update.email:
-        query = select(Customer).where(
-            Customer.email == customer_update.email, Customer.id != customer_id
-        )
-        result = await session.exec(query)
-        existing_customer = result.first()
-
-        if existing_customer:
-            raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Update only provided fields
-    update_data = customer_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_customer, field, value)
-
-    # Update timestamp
-    db_customer.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_customer)
-
-    return customer_schema.Customer.model_validate(db_customer)
+    return customer_schema.Customer.model_validate(customer)
 
 
 @router.patch(
@@ -161,17 +191,14 @@ async def activate_customer(
     customer_id: int, session: AsyncSession = Depends(get_session)
 ) -> customer_schema.Customer:
     """Activate a customer."""
-    db_customer = await session.get(Customer, customer_id)
-    if not db_customer:
+    customer = await mutations.update_returning(
+        session, Customer, customer_id, {"is_active": True}
+    )
+    if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    db_customer.is_active = True
-    db_customer.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_customer)
-
-    return customer_schema.Customer.model_validate(db_customer)
+    return customer_schema.Customer.model_validate(customer)
 
 
 @router.patch(
@@ -184,17 +211,14 @@ async def deactivate_customer(
     customer_id: int, session: AsyncSession = Depends(get_session)
 ) -> customer_schema.Customer:
     """Deactivate a customer."""
-    db_customer = await session.get(Customer, customer_id)
-    if not db_customer:
+    customer = await mutations.update_returning(
+        session, Customer, customer_id, {"is_active": False}
+    )
+    if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    db_customer.is_active = False
-    db_customer.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_customer)
-
-    return customer_schema.Customer.model_validate(db_customer)
+    return customer_schema.Customer.model_validate(customer)
 
 
 @router.delete(
@@ -206,11 +230,17 @@ async def deactivate_customer(
 async def delete_customer(
     customer_id: int, session: AsyncSession = Depends(get_session)
 ):
-    """Delete a customer."""
-    db_customer = await session.get(Customer, customer_id)
-    if not db_customer:
+    """Delete a customer, refused while parcels are sent to or by them."""
+    result = await session.exec(
+        select(Parcel.id)
+        .where(or_(Parcel.sender_id == customer_id, Parcel.receiver_id == customer_id))
+        .limit(1)
+    )
+    if result.first() is not None:
+        raise HTTPException(status_code=409, detail="Customer has parcels")
+
+    if not await mutations.delete_returning(session, Customer, customer_id):
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    await session.delete(db_customer)
     await session.commit()
     return None
@@ -1,11 +1,12 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from flasx.core import mutations
+from flasx.core import pagination
 from flasx.schemas import delivery_staff_schema
-from flasx.models import get_session, DeliveryStaff
+from flasx.models import get_session, get_read_session, DeliveryStaff, Parcel
 
 router = APIRouter(prefix="/delivery-staff", tags=["delivery-staff"])
 
@@ -17,10 +18,13 @@ router = APIRouter(prefix="/delivery-staff", tags=["delivery-staff"])
     response_model=list[delivery_staff_schema.DeliveryStaff],
 )
 async def get_delivery_staff(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: pagination.SortKey = "id",
     is_active: Optional[bool] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[delivery_staff_schema.DeliveryStaff]:
     """Get all delivery staff with optional pagination and filtering."""
     query = select(DeliveryStaff)
@@ -30,10 +34,13 @@ async def get_delivery_staff(
         query = query.where(DeliveryStaff.is_active == is_active)
 
     # Apply pagination
-    query = query.offset(skip).limit(limit)
+    query = pagination.paginate(
+        query, DeliveryStaff, sort, limit, skip=skip, cursor=cursor
+    )
 
     result = await session.exec(query)
     staff = result.all()
+    pagination.set_next_cursor(response, staff, sort, limit)
 
     return [delivery_staff_schema.DeliveryStaff.model_validate(s) for s in staff]
 
@@ -45,7 +52,7 @@ async def get_delivery_staff(
     response_model=delivery_staff_schema.DeliveryStaff,
 )
 async def get_delivery_staff_by_id(
-    staff_id: int, session: AsyncSession = Depends(get_session)
+    staff_id: int, session: AsyncSession = Depends(get_read_session)
 ) -> delivery_staff_schema.DeliveryStaff:
     """Get a single delivery staff member by ID."""
     staff = await session.get(DeliveryStaff, staff_id)
@@ -62,7 +69,7 @@ async def get_delivery_staff_by_id(
     response_model=delivery_staff_schema.DeliveryStaff,
 )
 async def get_delivery_staff_by_employee_id(
-    employee_id: str, session: AsyncSession = Depends(get_session)
+    employee_id: str, session: AsyncSession = Depends(get_read_session)
 ) -> delivery_staff_schema.DeliveryStaff:
     """Get a single delivery staff member by employee ID."""
     query = select(DeliveryStaff).where(DeliveryStaff.employee_id == employee_id)
@@ -123,46 +130,22 @@ async def update_delivery_staff(
     staff_update: delivery_staff_schema.DeliveryStaffUpdate,
     session: AsyncSession = Depends(get_session),
 ) -> delivery_staff_schema.DeliveryStaff:
-    """Update an existing delivery staff member."""
-    db_staff = await session.get(DeliveryStaff, staff_id)
-    if not db_staff:
+    """Update an existing delivery staff member in one UPDATE ... RETURNING."""
+    staff = await mutations.update_returning(
+        session,
+        DeliveryStaff,
+        staff_id,
+        staff_update.model_dump(exclude_unset=True),
+        conflicts={
+            "employee_id": "Employee ID already exists",
+            "email": "Email already registered",
+        },
+    )
+    if not staff:
         raise HTTPException(status_code=404, detail="Delivery staff not found")
 
-    # Check if email is being updated and already exists
-    if staff_update.email:
-        query = select(DeliveryStaff).where(
-            DeliveryStaff.email == staff_update.email, DeliveryStaff.id != staff_id
-        )
-        result = await session.exec(query)
-        existing_staff = result.first()
-
-        if existing_staff:
-            raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Check if employee_id is being updated and already exists
-    if staff_update.employee_id:
-        query = select(DeliveryStaff).where(
-            DeliveryStaff.employee_id == staff_update.employee_id,
-            DeliveryStaff.id != staff_id,
-        )
-        result = await session.exec(query)
-        existing_staff = result.first()
-
-        if existing_staff:
-            raise HTTPException(status_code=400, detail="Employee ID already exists")
-
-    # Update only provided fields
-    update_data = staff_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_staff, field, value)
-
-    # Update timestamp
-    db_staff.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_staff)
-
-    return delivery_staff_schema.DeliveryStaff.model_validate(db_staff)
+    return delivery_staff_schema.DeliveryStaff.model_validate(staff)
 
 
 @router.delete(
@@ -174,11 +157,10 @@ async def update_delivery_staff(
 async def delete_delivery_staff(
     staff_id: int, session: AsyncSession = Depends(get_session)
 ):
-    """Delete a delivery staff member."""
-    db_staff = await session.get(DeliveryStaff, staff_id)
-    if not db_staff:
+    """Delete a delivery staff member, unassigning them from their parcels."""
+    await mutations.clear_references(session, staff_id, Parcel.delivery_staff_id)
+    if not await mutations.delete_returning(session, DeliveryStaff, staff_id):
         raise HTTPException(status_code=404, detail="Delivery staff not found")
 
-    await session.delete(db_staff)
     await session.commit()
     return None
@@ -0,0 +1,273 @@
+from datetime import datetime
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.core import load_planner
+from flasx.core import staff_assignment
+from flasx.core.cache import TrackingCache, get_tracking_cache
+from flasx.core.mutations import IN_CHUNK_SIZE
+from flasx.schemas import dispatch_schema
+from flasx.models import (
+    get_session,
+    get_read_session,
+    DeliveryStaff,
+    Parcel,
+    ParcelStatus,
+    Station,
+    Vehicle,
+)
+
+router = APIRouter(prefix="/dispatch", tags=["dispatch"])
+
+WAITING_STATUSES = (ParcelStatus.CREATED, ParcelStatus.PICKED_UP)
+
+
+async def select_parcels(
+    session: AsyncSession, query, parcel_ids: list[int] | None
+) -> list:
+    """Run ``query`` by parcel ID, restricted to ``parcel_ids`` when given.
+
+    The IDs are queried in chunks of ``IN_CHUNK_SIZE``.
+    """
+    if parcel_ids is None:
+        return (await session.exec(query.order_by(Parcel.id))).all()
+
+    ids = sorted(set(parcel_ids))
+    parcels = []
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start : start + IN_CHUNK_SIZE]
+        result = await session.exec(
+            query.where(Parcel.id.in_(chunk)).order_by(Parcel.id)
+        )
+        parcels += result.all()
+    return parcels
+
+
+async def assign_parcels(
+    session: AsyncSession, column, assignments: dict[int, list[int]], *where
+) -> dict[int, str]:
+    """Set ``column`` of the parcels to the key of their ID list.
+
+    One UPDATE per key and chunk of ``IN_CHUNK_SIZE`` IDs. The UPDATEs repeat
+    the selection filters ``where``, so parcels taken by a concurrent run
+    since they were read are left alone. Returns the tracking numbers of the
+    updated parcels by ID.
+    """
+    now = datetime.now()
+    updated = {}
+    for value, ids in assignments.items():
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            result = await session.exec(
+                update(Parcel)
+                .where(Parcel.id.in_(ids[start : start + IN_CHUNK_SIZE]), *where)
+                .values({column.key: value, "updated_at": now})
+                .returning(Parcel.id, Parcel.tracking_number)
+                .execution_options(synchronize_session=False)
+            )
+            updated.update(result.all())
+    return updated
+
+
+@router.post(
+    "/load-plan",
+    summary="Plan vehicle loads",
+    description="Pack the parcels waiting at a station into its vehicles by weight and volume, and assign them in one bulk update.",
+    response_model=dispatch_schema.LoadPlan,
+)
+async def plan_vehicle_loads(
+    plan_request: dispatch_schema.LoadPlanRequest,
+    session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+) -> dispatch_schema.LoadPlan:
+    """Assign parcels to vehicles with first-fit decreasing."""
+    if not await session.get(Station, plan_request.station_id):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    # parcels already loaded are counted in the vehicle loads, never planned again
+    parcel_query = select(
+        Parcel.id,
+        Parcel.weight,
+        Parcel.length,
+        Parcel.width,
+        Parcel.height,
+    ).where(
+        Parcel.origin_station_id == plan_request.station_id,
+        Parcel.vehicle_id.is_(None),
+        Parcel.status.in_(WAITING_STATUSES),
+    )
+    parcels = await select_parcels(session, parcel_query, plan_request.parcel_ids)
+
+    vehicle_query = select(Vehicle).where(Vehicle.is_active == True)
+    if plan_request.vehicle_ids is not None:
+        vehicle_query = vehicle_query.where(Vehicle.id.in_(plan_request.vehicle_ids))
+    else:
+        vehicle_query = vehicle_query.where(
+            Vehicle.station_id == plan_request.station_id
+        )
+    vehicles = (await session.exec(vehicle_query.order_by(Vehicle.id))).all()
+
+    loads = await load_planner.get_vehicle_loads(
+        session, [vehicle.id for vehicle in vehicles]
+    )
+    loaded_weight, loaded_volume = (
+        np.array(
+            [loads.get(vehicle.id, (0.0, 0.0)) for vehicle in vehicles], dtype=float
+        )
+        .reshape(-1, 2)
+        .T
+    )
+    capacity = np.array([vehicle.capacity for vehicle in vehicles], dtype=float)
+    volume_capacity = np.array(
+        [
+            np.inf if vehicle.volume_capacity is None else vehicle.volume_capacity
+            for vehicle in vehicles
+        ],
+        dtype=float,
+    )
+
+    columns = list(zip(*parcels)) if parcels else [()] * 5
+    ids, weights = columns[0], np.array(columns[1])
+    volumes = load_planner.parcel_volumes(*(np.array(c) for c in columns[2:]))
+    assignment = load_planner.plan_loads(
+        weights,
+        volumes,
+        capacity - loaded_weight,
+        volume_capacity - loaded_volume,
+    )
+
+    assigned = np.flatnonzero(assignment != load_planner.UNASSIGNED)
+    if len(assigned) and not plan_request.dry_run:
+        by_vehicle = {}
+        for i in assigned.tolist():
+            by_vehicle.setdefault(vehicles[assignment[i]].id, []).append(ids[i])
+        updated = await assign_parcels(
+            session,
+            Parcel.vehicle_id,
+            by_vehicle,
+            Parcel.vehicle_id.is_(None),
+            Parcel.status.in_(WAITING_STATUSES),
+        )
+        await session.commit()
+        await cache.invalidate(*updated.values())
+
+        # parcels loaded by a concurrent plan in the meantime stay unassigned
+        for i in assigned.tolist():
+            if ids[i] not in updated:
+                assignment[i] = load_planner.UNASSIGNED
+        assigned = np.flatnonzero(assignment != load_planner.UNASSIGNED)
+
+    vehicle_loads = []
+    for index, vehicle in enumerate(vehicles):
+        mask = assignment == index
+        vehicle_loads.append(
+            dispatch_schema.VehicleLoad(
+                vehicle_id=vehicle.id,
+                parcel_ids=[ids[i] for i in np.flatnonzero(mask).tolist()],
+                weight=float(loaded_weight[index] + weights[mask].sum()),
+                volume=float(loaded_volume[index] + volumes[mask].sum()),
+                capacity=vehicle.capacity,
+                volume_capacity=vehicle.volume_capacity,
+            )
+        )
+
+    return dispatch_schema.LoadPlan(
+        vehicles=vehicle_loads,
+        assigned=len(assigned),
+        unassigned_parcel_ids=[
+            ids[i]
+            for i in np.flatnonzero(assignment == load_planner.UNASSIGNED).tolist()
+        ],
+        applied=bool(len(assigned)) and not plan_request.dry_run,
+    )
+
+
+@router.get(
+    "/workloads",
+    summary="Get delivery staff workloads",
+    description="Count the parcels and their weight per delivery staff for a status.",
+    response_model=list[dispatch_schema.StaffWorkload],
+)
+async def get_staff_workloads(
+    status: ParcelStatus = ParcelStatus.OUT_FOR_DELIVERY,
+    session: AsyncSession = Depends(get_read_session),
+) -> list[dispatch_schema.StaffWorkload]:
+    """Get the workload of every delivery staff with parcels in ``status``."""
+    workloads = await staff_assignment.get_staff_workloads(session, status=status)
+    return [
+        dispatch_schema.StaffWorkload(
+            delivery_staff_id=staff_id, parcels=count, weight=weight
+        )
+        for staff_id, (count, weight) in sorted(workloads.items())
+    ]
+
+
+@router.post(
+    "/assign-staff",
+    summary="Auto-assign delivery staff",
+    description="Spread out for delivery parcels across active delivery staff, least loaded first, in one transaction.",
+    response_model=dispatch_schema.StaffAssignment,
+)
+async def assign_delivery_staff(
+    assign_request: dispatch_schema.StaffAssignRequest,
+    session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+) -> dispatch_schema.StaffAssignment:
+    """Assign parcels to the least loaded delivery staff."""
+    staff_query = select(DeliveryStaff.id).where(DeliveryStaff.is_active == True)
+    if assign_request.staff_ids is not None:
+        staff_query = staff_query.where(DeliveryStaff.id.in_(assign_request.staff_ids))
+    staff_ids = (await session.exec(staff_query.order_by(DeliveryStaff.id))).all()
+    if not staff_ids:
+        raise HTTPException(status_code=404, detail="No active delivery staff")
+
+    # parcels already assigned are counted in the workloads, never assigned again
+    parcel_query = select(Parcel.id, Parcel.weight).where(
+        Parcel.status == ParcelStatus.OUT_FOR_DELIVERY,
+        Parcel.delivery_staff_id.is_(None),
+    )
+    parcels = await select_parcels(session, parcel_query, assign_request.parcel_ids)
+
+    workloads = await staff_assignment.get_staff_workloads(session, staff_ids)
+    current = [workloads.get(staff_id, (0, 0.0)) for staff_id in staff_ids]
+    assignment = staff_assignment.assign_least_loaded(
+        [parcel.weight for parcel in parcels],
+        [weight if assign_request.weighted else count for count, weight in current],
+        weighted=assign_request.weighted,
+    )
+
+    updated = {}
+    if parcels:
+        by_staff = {}
+        for parcel, index in zip(parcels, assignment):
+            by_staff.setdefault(staff_ids[index], []).append(parcel.id)
+        updated = await assign_parcels(
+            session,
+            Parcel.delivery_staff_id,
+            by_staff,
+            Parcel.status == ParcelStatus.OUT_FOR_DELIVERY,
+            Parcel.delivery_staff_id.is_(None),
+        )
+        await session.commit()
+        await cache.invalidate(*updated.values())
+
+    # parcels assigned by a concurrent run in the meantime are not counted
+    counts = [list(load) for load in current]
+    for parcel, index in zip(parcels, assignment):
+        if parcel.id in updated:
+            counts[index][0] += 1
+            counts[index][1] += parcel.weight
+
+    return dispatch_schema.StaffAssignment(
+        assigned=len(updated),
+        unassigned_parcel_ids=[
+            parcel.id for parcel in parcels if parcel.id not in updated
+        ],
+        workloads=[
+            dispatch_schema.StaffWorkload(
+                delivery_staff_id=staff_id, parcels=count, weight=weight
+            )
+            for staff_id, (count, weight) in zip(staff_ids, counts)
+        ],
+    )
@@ -0,0 +1,100 @@
+import os
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.core import config
+from flasx.core import export_jobs
+from flasx.core.export_jobs import ExportWorkers, get_export_workers
+from flasx.schemas import export_schema
+from flasx.models import get_session, ExportJob, ExportStatus
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@router.post(
+    "",
+    summary="Create an export job",
+    description="Queue an export of parcels, customers or stations to a compressed CSV or Parquet file.",
+    response_model=export_schema.ExportJob,
+    status_code=201,
+)
+async def create_export(
+    export_job: export_schema.ExportJobCreate,
+    session: AsyncSession = Depends(get_session),
+    workers: Optional[ExportWorkers] = Depends(get_export_workers),
+) -> export_schema.ExportJob:
+    """Create an export job, run by the export workers."""
+    if export_job.format == "parquet" and not export_jobs.has_parquet():
+        raise HTTPException(
+            status_code=400, detail="Parquet export requires the pyarrow package"
+        )
+
+    unknown = export_jobs.get_unknown_filters(export_job.entity, export_job.filters)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown filters: {', '.join(unknown)}"
+        )
+    try:
+        export_jobs.build_query(export_job.entity, export_job.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter value: {e}")
+
+    db_export_job = ExportJob(**export_job.model_dump())
+    session.add(db_export_job)
+    await session.commit()
+    await session.refresh(db_export_job)
+
+    # without running workers the job is picked up on the next start
+    if workers is not None:
+        workers.submit(db_export_job.id)
+
+    return export_schema.ExportJob.model_validate(db_export_job)
+
+
+@router.get(
+    "/{export_id}",
+    summary="Get an export job",
+    description="Get the status, row counts and progress of an export job.",
+    response_model=export_schema.ExportJob,
+)
+async def get_export(
+    export_id: int, session: AsyncSession = Depends(get_session)
+) -> export_schema.ExportJob:
+    """Get an export job by ID, from the primary to see the latest progress."""
+    db_export_job = await session.get(ExportJob, export_id)
+    if not db_export_job:
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    return export_schema.ExportJob.model_validate(db_export_job)
+
+
+@router.get(
+    "/{export_id}/download",
+    summary="Download an export",
+    description="Download the file of a completed export job.",
+    response_class=FileResponse,
+)
+async def download_export(
+    export_id: int,
+    session: AsyncSession = Depends(get_session),
+    workers: Optional[ExportWorkers] = Depends(get_export_workers),
+) -> FileResponse:
+    """Send the export file, no database connection is held while it downloads."""
+    db_export_job = await session.get(ExportJob, export_id)
+    if not db_export_job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if db_export_job.status != ExportStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Export is not completed")
+
+    directory = workers.directory if workers else config.get_settings().EXPORT_DIR
+    path = os.path.join(directory, db_export_job.file_name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Export file was removed")
+
+    return FileResponse(
+        path,
+        media_type=export_jobs.MEDIA_TYPES[db_export_job.format],
+        filename=db_export_job.file_name,
+    )
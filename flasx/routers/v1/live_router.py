@@ -0,0 +1,105 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, WebSocket
+from fastapi.responses import StreamingResponse
+
+from flasx.core import config
+from flasx.core import live
+from flasx.core.live import LiveHub, get_live_hub
+from flasx.core.tracking import is_valid_tracking_number
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+
+async def event_stream(hub: LiveHub, topic: str, keepalive: float):
+    """Server-Sent Events of ``topic``, with comments to keep proxies open."""
+    with hub.subscribe(topic) as subscription:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: status\ndata: {message}\n\n"
+
+
+def event_stream_response(hub: LiveHub, topic: str) -> StreamingResponse:
+    keepalive = config.get_settings().LIVE_KEEPALIVE
+    return StreamingResponse(
+        event_stream(hub, topic, keepalive),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def forward(websocket: WebSocket, hub: LiveHub, topic: str):
+    """Send the messages of ``topic`` until the client disconnects."""
+    await websocket.accept()
+    with hub.subscribe(topic) as subscription:
+        receive = asyncio.create_task(websocket.receive())
+        try:
+            while True:
+                get = asyncio.create_task(subscription.get())
+                done, _ = await asyncio.wait(
+                    {get, receive}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if receive in done:
+                    get.cancel()
+                    if receive.result()["type"] == "websocket.disconnect":
+                        return
+                    # messages from the client are ignored
+                    receive = asyncio.create_task(websocket.receive())
+                    continue
+
+                await websocket.send_text(get.result())
+        finally:
+            receive.cancel()
+
+
+@router.get(
+    "/parcels/{tracking_number}",
+    summary="Stream parcel status changes",
+    description="Server-Sent Events of the status changes of a parcel (public endpoint).",
+    response_class=StreamingResponse,
+)
+async def stream_parcel(
+    tracking_number: str, hub: LiveHub = Depends(get_live_hub)
+) -> StreamingResponse:
+    """Stream the status changes of a parcel."""
+    if not is_valid_tracking_number(tracking_number):
+        raise HTTPException(status_code=400, detail="Malformed tracking number")
+
+    return event_stream_response(hub, live.parcel_topic(tracking_number))
+
+
+@router.get(
+    "/stations/{station_id}",
+    summary="Stream station status changes",
+    description="Server-Sent Events of the status changes of parcels bound for or scanned at a station.",
+    response_class=StreamingResponse,
+)
+async def stream_station(
+    station_id: int, hub: LiveHub = Depends(get_live_hub)
+) -> StreamingResponse:
+    """Stream the status changes of the parcels of a station."""
+    return event_stream_response(hub, live.station_topic(station_id))
+
+
+@router.websocket("/parcels/{tracking_number}/ws")
+async def websocket_parcel(
+    websocket: WebSocket, tracking_number: str, hub: LiveHub = Depends(get_live_hub)
+):
+    """Send the status changes of a parcel over a WebSocket."""
+    if not is_valid_tracking_number(tracking_number):
+        await websocket.close(code=1008, reason="Malformed tracking number")
+        return
+
+    await forward(websocket, hub, live.parcel_topic(tracking_number))
+
+
+@router.websocket("/stations/{station_id}/ws")
+async def websocket_station(
+    websocket: WebSocket, station_id: int, hub: LiveHub = Depends(get_live_hub)
+):
+    """Send the status changes of the parcels of a station over a WebSocket."""
+    await forward(websocket, hub, live.station_topic(station_id))
@@ -1,23 +1,102 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-import random
-import string
-from sqlmodel import select
+from sqlmodel import select, insert, update, delete
 from sqlmodel.ext.asyncio.session import AsyncSession
-
+from sqlalchemy.orm import aliased
+
+from flasx.core import export
+from flasx.core import live
+from flasx.core import load_planner
+from flasx.core import mutations
+from flasx.core import pagination
+from flasx.core import parcel_events
+from flasx.core import station_stats
+from flasx.core.cache import TrackingCache, get_tracking_cache
+from flasx.core.live import LiveHub, get_live_hub
+from flasx.core.mutations import IN_CHUNK_SIZE
+from flasx.core.station_directory import StationDirectory, get_station_directory
+from flasx.core.status_queue import StatusWriteQueue, get_status_queue
+from flasx.core.tracking import generate_tracking_number, is_valid_tracking_number
 from flasx.schemas import parcel_schema
-from flasx.models import get_session, Parcel, Station
+from flasx.models import (
+    get_session,
+    get_read_session,
+    get_read_session_factory,
+    Parcel,
+    ParcelEvent,
+    Station,
+    Customer,
+    Vehicle,
+)
 
 router = APIRouter(prefix="/parcels", tags=["parcels"])
 
 
-def generate_tracking_number() -> str:
-    """Generate a unique tracking number."""
-    prefix = "PKG"
-    timestamp = datetime.now().strftime("%Y%m%d")
-    random_suffix = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"{prefix}{timestamp}{random_suffix}"
+async def get_existing_ids(session: AsyncSession, model, ids: set[int]) -> set[int]:
+    """Return which of ``ids`` exist in the table of ``model``."""
+    ids = list(ids)
+    existing = set()
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start : start + IN_CHUNK_SIZE]
+        result = await session.exec(select(model.id).where(model.id.in_(chunk)))
+        existing.update(result.all())
+
+    return existing
+
+
+# the fields of a parcel its station rollup keys are made of
+COUNTED_FIELDS = (
+    Parcel.status,
+    Parcel.origin_station_id,
+    Parcel.destination_station_id,
+    Parcel.created_at,
+)
+
+
+async def get_counted_fields(session: AsyncSession, parcel_id: int):
+    """Read and lock the rollup fields of a parcel, ``None`` if it does not exist.
+
+    The row stays locked until the commit, so a concurrent change of the
+    parcel cannot remove the same old rollup key twice.
+    """
+    result = await session.exec(
+        select(*COUNTED_FIELDS).where(Parcel.id == parcel_id).with_for_update()
+    )
+    return result.first()
+
+
+def select_trackings():
+    """Select the tracking fields with both station names in one statement."""
+    origin_station = aliased(Station)
+    destination_station = aliased(Station)
+    return (
+        select(
+            Parcel.tracking_number,
+            Parcel.status,
+            Parcel.created_at,
+            Parcel.updated_at,
+            origin_station.name.label("origin_station_name"),
+            destination_station.name.label("destination_station_name"),
+        )
+        .outerjoin(origin_station, Parcel.origin_station_id == origin_station.id)
+        .outerjoin(
+            destination_station,
+            Parcel.destination_station_id == destination_station.id,
+        )
+    )
+
+
+def filter_parcels(query, status, sender_id, receiver_id):
+    """Apply the parcel list filters to ``query``."""
+    if status:
+        query = query.where(Parcel.status == status)
+    if sender_id:
+        query = query.where(Parcel.sender_id == sender_id)
+    if receiver_id:
+        query = query.where(Parcel.receiver_id == receiver_id)
+    return query
 
 
 @router.get(
@@ -27,33 +106,64 @@ def generate_tracking_number() -> str:
     response_model=list[parcel_schema.Parcel],
 )
 async def get_parcels(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: pagination.SortKey = "id",
     status: Optional[parcel_schema.ParcelStatus] = None,
     sender_id: Optional[int] = None,
     receiver_id: Optional[int] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[parcel_schema.Parcel]:
     """Get all parcels with optional pagination and filtering."""
-    query = select(Parcel)
-
-    # Apply filters
-    if status:
-        query = query.where(Parcel.status == status)
-    if sender_id:
-        query = query.where(Parcel.sender_id == sender_id)
-    if receiver_id:
-        query = query.where(Parcel.receiver_id == receiver_id)
+    query = filter_parcels(select(Parcel), status, sender_id, receiver_id)
 
     # Apply pagination
-    query = query.offset(skip).limit(limit)
+    query = pagination.paginate(query, Parcel, sort, limit, skip=skip, cursor=cursor)
 
     result = await session.exec(query)
     parcels = result.all()
+    pagination.set_next_cursor(response, parcels, sort, limit)
 
     return [parcel_schema.Parcel.model_validate(parcel) for parcel in parcels]
 
 
+@router.get(
+    "/export",
+    summary="Export parcels",
+    description="Stream all parcels matching the list filters as NDJSON or CSV, gzip compressed when accepted by the client.",
+    response_class=StreamingResponse,
+)
+async def export_parcels(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[parcel_schema.ParcelStatus] = None,
+    sender_id: Optional[int] = None,
+    receiver_id: Optional[int] = None,
+    session_factory=Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """Stream parcels from a server-side cursor, ordered by ID."""
+    table = Parcel.__table__
+    query = filter_parcels(
+        select(*table.columns), status, sender_id, receiver_id
+    ).order_by(Parcel.id)
+    columns = [column.name for column in table.columns]
+
+    media_type, extension = export.FORMATS[format]
+    headers = {
+        "Content-Disposition": f'attachment; filename="parcels.{extension}"',
+        # shared caches must not serve the gzip body to other clients
+        "Vary": "Accept-Encoding",
+    }
+    body = export.serialize(export.stream_rows(session_factory, query), columns, format)
+    if export.accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        body = export.gzip_chunks(body)
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
 @router.get(
     "/{parcel_id}",
     summary="Get a parcel by ID",
@@ -61,7 +171,7 @@ async def get_parcels(
     response_model=parcel_schema.Parcel,
 )
 async def get_parcel(
-    parcel_id: int, session: AsyncSession = Depends(get_session)
+    parcel_id: int, session: AsyncSession = Depends(get_read_session)
 ) -> parcel_schema.Parcel:
     """Get a single parcel by ID."""
     parcel = await session.get(Parcel, parcel_id)
@@ -78,47 +188,107 @@ async def get_parcel(
     response_model=parcel_schema.ParcelTracking,
 )
 async def track_parcel(
-    tracking_number: str, session: AsyncSession = Depends(get_session)
+    tracking_number: str,
+    session: AsyncSession = Depends(get_read_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
 ) -> parcel_schema.ParcelTracking:
     """Track a parcel by tracking number."""
+    if not is_valid_tracking_number(tracking_number):
+        raise HTTPException(status_code=400, detail="Malformed tracking number")
+
+    tracking = await cache.get(tracking_number)
+    if tracking:
+        return tracking
+
+    query = select_trackings().where(Parcel.tracking_number == tracking_number)
+    result = await session.exec(query)
+    row = result.first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Parcel not found")
+
+    tracking = parcel_schema.ParcelTracking.model_validate(row._mapping)
+    await cache.set(tracking)
+
+    return tracking
+
+
+@router.get(
+    "/track/{tracking_number}/timeline",
+    summary="Get a parcel timeline",
+    description="Get the full status history of a parcel (public endpoint).",
+    response_model=parcel_schema.ParcelTimeline,
+)
+async def get_parcel_timeline(
+    tracking_number: str, session: AsyncSession = Depends(get_read_session)
+) -> parcel_schema.ParcelTimeline:
+    """Get the status events of a parcel in the order they happened."""
+    if not is_valid_tracking_number(tracking_number):
+        raise HTTPException(status_code=400, detail="Malformed tracking number")
+
     query = (
         select(
-            Parcel,
-            Station.name.label("origin_station_name"),
-            Station.name.label("destination_station_name"),
+            ParcelEvent.status,
+            ParcelEvent.occurred_at,
+            ParcelEvent.note,
+            Station.name.label("station_name"),
         )
-        .outerjoin(Station, Parcel.origin_station_id == Station.id)
+        .select_from(Parcel)
+        .outerjoin(ParcelEvent, ParcelEvent.parcel_id == Parcel.id)
+        .outerjoin(Station, ParcelEvent.station_id == Station.id)
         .where(Parcel.tracking_number == tracking_number)
+        .order_by(ParcelEvent.occurred_at, ParcelEvent.id)
     )
     result = await session.exec(query)
-    parcel_data = result.first()
+    rows = result.all()
 
-    if not parcel_data:
+    if not rows:
         raise HTTPException(status_code=404, detail="Parcel not found")
 
-    parcel = parcel_data[0]
-
-    # Get station names separately for better handling
-    origin_station_name = None
-    destination_station_name = None
-
-    if parcel.origin_station_id:
-        origin_station = await session.get(Station, parcel.origin_station_id)
-        origin_station_name = origin_station.name if origin_station else None
+    return parcel_schema.ParcelTimeline(
+        tracking_number=tracking_number,
+        events=[
+            parcel_schema.ParcelTimelineEvent.model_validate(row._mapping)
+            for row in rows
+            # a parcel without events is joined to a single empty row
+            if row.status is not None
+        ],
+    )
 
-    if parcel.destination_station_id:
-        destination_station = await session.get(Station, parcel.destination_station_id)
-        destination_station_name = (
-            destination_station.name if destination_station else None
-        )
 
-    return parcel_schema.ParcelTracking(
-        tracking_number=parcel.tracking_number,
-        status=parcel.status,
-        created_at=parcel.created_at,
-        updated_at=parcel.updated_at,
-        origin_station_name=origin_station_name,
-        destination_station_name=destination_station_name,
+@router.post(
+    "/track/batch",
+    summary="Track parcels in batch",
+    description="Track up to 500 parcels by tracking number in one request (public endpoint).",
+    response_model=parcel_schema.ParcelTrackingBatch,
+)
+async def track_parcels_batch(
+    batch: parcel_schema.ParcelTrackingBatchRequest,
+    session: AsyncSession = Depends(get_read_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+) -> parcel_schema.ParcelTrackingBatch:
+    """Track many parcels, the cache misses are resolved with one query."""
+    tracking_numbers = list(dict.fromkeys(batch.tracking_numbers))
+    malformed = [n for n in tracking_numbers if not is_valid_tracking_number(n)]
+    tracking_numbers = [n for n in tracking_numbers if is_valid_tracking_number(n)]
+
+    trackings = await cache.get_many(tracking_numbers)
+
+    missing = [n for n in tracking_numbers if n not in trackings]
+    if missing:
+        query = select_trackings().where(Parcel.tracking_number.in_(missing))
+        result = await session.exec(query)
+        found = [
+            parcel_schema.ParcelTracking.model_validate(row._mapping)
+            for row in result.all()
+        ]
+        await cache.set_many(found)
+        trackings.update((tracking.tracking_number, tracking) for tracking in found)
+
+    return parcel_schema.ParcelTrackingBatch(
+        parcels=[trackings[n] for n in tracking_numbers if n in trackings],
+        not_found=[n for n in tracking_numbers if n not in trackings],
+        malformed=malformed,
     )
 
 
@@ -134,31 +304,128 @@ async def create_parcel(
     session: AsyncSession = Depends(get_session),
 ) -> parcel_schema.Parcel:
     """Create a new parcel."""
-    # Generate unique tracking number
-    tracking_number = generate_tracking_number()
-
-    # Ensure tracking number is unique
-    while True:
-        query = select(Parcel).where(Parcel.tracking_number == tracking_number)
-        result = await session.exec(query)
-        existing_parcel = result.first()
-
-        if not existing_parcel:
-            break
-        tracking_number = generate_tracking_number()
-
-    # Create new parcel
+    # Create new parcel with a tracking number unique by construction
     parcel_data = parcel.model_dump()
-    parcel_data["tracking_number"] = tracking_number
+    parcel_data["tracking_number"] = generate_tracking_number()
 
     db_parcel = Parcel(**parcel_data)
     session.add(db_parcel)
+    await session.flush()
+
+    await parcel_events.record_events(
+        session,
+        [
+            parcel_events.make_event(
+                db_parcel.id,
+                db_parcel.status,
+                station_id=db_parcel.origin_station_id,
+                occurred_at=db_parcel.created_at,
+            )
+        ],
+    )
+    await station_stats.update_counts(
+        session, added=station_stats.parcel_keys(db_parcel)
+    )
     await session.commit()
     await session.refresh(db_parcel)
 
     return parcel_schema.Parcel.model_validate(db_parcel)
 
 
+@router.post(
+    "/bulk",
+    summary="Create parcels in bulk",
+    description="Create many parcels in one transaction, reporting errors per item.",
+    response_model=parcel_schema.ParcelBulkResult,
+    status_code=201,
+)
+async def create_parcels_bulk(
+    bulk: parcel_schema.ParcelBulkCreate,
+    session: AsyncSession = Depends(get_session),
+) -> parcel_schema.ParcelBulkResult:
+    """Create many parcels with a single multi-row INSERT ... RETURNING."""
+    parcels = bulk.parcels
+
+    # Check every referenced customer and station in one pass
+    customer_ids = {p.sender_id for p in parcels} | {p.receiver_id for p in parcels}
+    station_ids = {
+        station_id
+        for p in parcels
+        for station_id in (p.origin_station_id, p.destination_station_id)
+        if station_id is not None
+    }
+    existing_customers = await get_existing_ids(session, Customer, customer_ids)
+    existing_stations = await get_existing_ids(session, Station, station_ids)
+
+    errors = []
+    valid = []
+    for index, parcel in enumerate(parcels):
+        if parcel.sender_id not in existing_customers:
+            detail = "Sender not found"
+        elif parcel.receiver_id not in existing_customers:
+            detail = "Receiver not found"
+        elif (
+            parcel.origin_station_id is not None
+            and parcel.origin_station_id not in existing_stations
+        ):
+            detail = "Origin station not found"
+        elif (
+            parcel.destination_station_id is not None
+            and parcel.destination_station_id not in existing_stations
+        ):
+            detail = "Destination station not found"
+        else:
+            valid.append((index, parcel))
+            continue
+
+        errors.append(parcel_schema.ParcelBulkError(index=index, detail=detail))
+
+    created = []
+    if valid:
+        tracking_numbers = [generate_tracking_number() for _ in valid]
+
+        now = datetime.now()
+        rows = []
+        for (index, parcel), tracking_number in zip(valid, tracking_numbers):
+            parcel_data = parcel.model_dump()
+            parcel_data.update(
+                tracking_number=tracking_number, created_at=now, updated_at=now
+            )
+            rows.append(parcel_data)
+
+        result = await session.exec(
+            insert(Parcel).returning(Parcel.id, Parcel.tracking_number), params=rows
+        )
+        ids = {tracking_number: id for id, tracking_number in result.all()}
+
+        await parcel_events.record_events(
+            session,
+            [
+                parcel_events.make_event(
+                    ids[row["tracking_number"]],
+                    row["status"],
+                    station_id=row["origin_station_id"],
+                    occurred_at=now,
+                )
+                for row in rows
+            ],
+        )
+        await station_stats.update_counts(
+            session,
+            added=[key for row in rows for key in station_stats.parcel_keys(row)],
+        )
+        await session.commit()
+
+        created = [
+            parcel_schema.ParcelBulkCreated(
+                index=index, id=ids[tracking_number], tracking_number=tracking_number
+            )
+            for (index, _), tracking_number in zip(valid, tracking_numbers)
+        ]
+
+    return parcel_schema.ParcelBulkResult(created=created, errors=errors)
+
+
 @router.put(
     "/{parcel_id}",
     summary="Update an existing parcel",
@@ -169,49 +436,213 @@ async def update_parcel(
     parcel_id: int,
     parcel_update: parcel_schema.ParcelUpdate,
     session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+    hub: LiveHub = Depends(get_live_hub),
 ) -> parcel_schema.Parcel:
-    """Update an existing parcel."""
-    db_parcel = await session.get(Parcel, parcel_id)
-    if not db_parcel:
+    """Update an existing parcel with UPDATE ... RETURNING.
+
+    The old status and stations are read first, the event log and the
+    station rollups need them.
+    """
+    old = await get_counted_fields(session, parcel_id)
+    if not old:
         raise HTTPException(status_code=404, detail="Parcel not found")
 
-    # Update only provided fields
-    update_data = parcel_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_parcel, field, value)
+    parcel = await mutations.update_returning(
+        session, Parcel, parcel_id, parcel_update.model_dump(exclude_unset=True)
+    )
+    if not parcel:
+        raise HTTPException(status_code=404, detail="Parcel not found")
 
-    # Update timestamp
-    db_parcel.updated_at = datetime.now()
+    status_changed = parcel["status"] != old.status
+    if status_changed:
+        await parcel_events.record_events(
+            session,
+            [
+                parcel_events.make_event(
+                    parcel_id, parcel["status"], occurred_at=parcel["updated_at"]
+                )
+            ],
+        )
+    await station_stats.update_counts(
+        session,
+        removed=station_stats.parcel_keys(old),
+        added=station_stats.parcel_keys(parcel),
+    )
 
     await session.commit()
-    await session.refresh(db_parcel)
+    await cache.invalidate(parcel["tracking_number"])
+    if status_changed:
+        await hub.publish_status(
+            parcel["tracking_number"],
+            parcel["status"],
+            parcel["updated_at"],
+            destination_station_id=parcel["destination_station_id"],
+        )
 
-    return parcel_schema.Parcel.model_validate(db_parcel)
+    return parcel_schema.Parcel.model_validate(parcel)
 
 
 @router.patch(
     "/{parcel_id}/status",
     summary="Update parcel status",
-    description="Update the status of a parcel.",
-    response_model=parcel_schema.Parcel,
+    description="Update the status of a parcel. With write-behind enabled the update is queued and answered with 202.",
+    response_model=parcel_schema.Parcel | parcel_schema.ParcelStatusAccepted,
+    responses={202: {"model": parcel_schema.ParcelStatusAccepted}},
 )
 async def update_parcel_status(
     parcel_id: int,
     status: parcel_schema.ParcelStatus,
+    response: Response,
+    station_id: Optional[int] = None,
     session: AsyncSession = Depends(get_session),
-) -> parcel_schema.Parcel:
-    """Update parcel status."""
-    db_parcel = await session.get(Parcel, parcel_id)
-    if not db_parcel:
+    cache: TrackingCache = Depends(get_tracking_cache),
+    hub: LiveHub = Depends(get_live_hub),
+    status_queue: Optional[StatusWriteQueue] = Depends(get_status_queue),
+    directory: StationDirectory = Depends(get_station_directory),
+) -> parcel_schema.Parcel | parcel_schema.ParcelStatusAccepted:
+    """Update parcel status and record it in the parcel timeline."""
+    if station_id is not None and not directory.get(station_id):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    if status_queue is not None:
+        committed = status_queue.submit(parcel_id, status, station_id)
+        if status_queue.durability == "committed" and not await committed:
+            raise HTTPException(status_code=404, detail="Parcel not found")
+
+        response.status_code = 202
+        return parcel_schema.ParcelStatusAccepted(
+            id=parcel_id,
+            status=status,
+            committed=status_queue.durability == "committed",
+        )
+
+    old = await get_counted_fields(session, parcel_id)
+    if not old:
         raise HTTPException(status_code=404, detail="Parcel not found")
 
-    db_parcel.status = status
-    db_parcel.updated_at = datetime.now()
+    parcel = await mutations.update_returning(
+        session, Parcel, parcel_id, {"status": status}
+    )
+    if not parcel:
+        raise HTTPException(status_code=404, detail="Parcel not found")
 
+    await parcel_events.record_events(
+        session,
+        [
+            parcel_events.make_event(
+                parcel_id,
+                status,
+                station_id=station_id,
+                occurred_at=parcel["updated_at"],
+            )
+        ],
+    )
+    await station_stats.update_counts(
+        session,
+        removed=station_stats.parcel_keys(old),
+        added=station_stats.parcel_keys(parcel),
+    )
     await session.commit()
-    await session.refresh(db_parcel)
+    await cache.invalidate(parcel["tracking_number"])
+    await hub.publish_status(
+        parcel["tracking_number"],
+        status,
+        parcel["updated_at"],
+        station_id=station_id,
+        destination_station_id=parcel["destination_station_id"],
+    )
 
-    return parcel_schema.Parcel.model_validate(db_parcel)
+    return parcel_schema.Parcel.model_validate(parcel)
+
+
+@router.post(
+    "/status/bulk",
+    summary="Update parcel statuses in bulk",
+    description="Move many parcels to one status, e.g. a hub scan batch, in one transaction.",
+    response_model=parcel_schema.ParcelStatusBulkResult,
+)
+async def update_parcel_status_bulk(
+    batch: parcel_schema.ParcelStatusBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+    hub: LiveHub = Depends(get_live_hub),
+) -> parcel_schema.ParcelStatusBulkResult:
+    """Update the status of many parcels with set-based UPDATE ... RETURNING."""
+    tracking_numbers = list(dict.fromkeys(batch.tracking_numbers))
+    malformed = [n for n in tracking_numbers if not is_valid_tracking_number(n)]
+    tracking_numbers = [n for n in tracking_numbers if is_valid_tracking_number(n)]
+    ids = list(dict.fromkeys(batch.ids))
+
+    if batch.station_id is not None and not await session.get(
+        Station, batch.station_id
+    ):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    now = datetime.now()
+    conditions = [
+        Parcel.tracking_number.in_(tracking_numbers[start : start + IN_CHUNK_SIZE])
+        for start in range(0, len(tracking_numbers), IN_CHUNK_SIZE)
+    ] + [
+        Parcel.id.in_(ids[start : start + IN_CHUNK_SIZE])
+        for start in range(0, len(ids), IN_CHUNK_SIZE)
+    ]
+
+    updated = {}
+    for condition in conditions:
+        # move the counts of the matched parcels from their old status
+        await station_stats.lock_parcels(session, condition)
+        await station_stats.add_counts(session, condition, sign=-1)
+        result = await session.exec(
+            update(Parcel)
+            .where(condition)
+            .values(status=batch.status, updated_at=now)
+            .returning(Parcel.id, Parcel.tracking_number, Parcel.destination_station_id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update((row.id, row) for row in result.all())
+        await station_stats.add_counts(session, condition)
+
+    await parcel_events.record_events(
+        session,
+        [
+            parcel_events.make_event(
+                parcel_id, batch.status, station_id=batch.station_id, occurred_at=now
+            )
+            for parcel_id in updated
+        ],
+    )
+    await session.commit()
+
+    updated_tracking_numbers = {row.tracking_number for row in updated.values()}
+    await cache.invalidate(*updated_tracking_numbers)
+    await hub.publish_many(
+        [
+            message
+            for row in updated.values()
+            for message in live.status_messages(
+                row.tracking_number,
+                batch.status,
+                now,
+                station_id=batch.station_id,
+                destination_station_id=row.destination_station_id,
+            )
+        ]
+    )
+
+    return parcel_schema.ParcelStatusBulkResult(
+        updated=[
+            parcel_schema.ParcelStatusBulkUpdated(
+                id=row.id, tracking_number=row.tracking_number
+            )
+            for row in updated.values()
+        ],
+        not_found_tracking_numbers=[
+            n for n in tracking_numbers if n not in updated_tracking_numbers
+        ],
+        not_found_ids=[id for id in ids if id not in updated],
+        malformed=malformed,
+    )
 
 
 @router.patch(
@@ -224,19 +655,49 @@ async def assign_vehicle_to_parcel(
     parcel_id: int,
     vehicle_id: int,
     session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
 ) -> parcel_schema.Parcel:
-    """Assign a vehicle to a parcel."""
-    db_parcel = await session.get(Parcel, parcel_id)
-    if not db_parcel:
+    """Assign a vehicle to a parcel if it has room for it."""
+    # the parcel size and the vehicle capacity in one query
+    result = await session.exec(
+        select(
+            Parcel.weight,
+            Parcel.length,
+            Parcel.width,
+            Parcel.height,
+            Vehicle.id.label("vehicle_id"),
+            Vehicle.capacity,
+            Vehicle.volume_capacity,
+        )
+        .outerjoin(Vehicle, Vehicle.id == vehicle_id)
+        .where(Parcel.id == parcel_id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Parcel not found")
+    if row.vehicle_id is None:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
 
-    db_parcel.vehicle_id = vehicle_id
-    db_parcel.updated_at = datetime.now()
+    loads = await load_planner.get_vehicle_loads(
+        session, [vehicle_id], exclude_parcel_id=parcel_id
+    )
+    weight, volume = loads.get(vehicle_id, (0.0, 0.0))
+    parcel_volume = load_planner.parcel_volumes(row.length, row.width, row.height)
+    if weight + row.weight > row.capacity or (
+        row.volume_capacity is not None and volume + parcel_volume > row.volume_capacity
+    ):
+        raise HTTPException(status_code=409, detail="Vehicle capacity exceeded")
+
+    parcel = await mutations.update_returning(
+        session, Parcel, parcel_id, {"vehicle_id": vehicle_id}
+    )
+    if not parcel:
+        raise HTTPException(status_code=404, detail="Parcel not found")
 
     await session.commit()
-    await session.refresh(db_parcel)
+    await cache.invalidate(parcel["tracking_number"])
 
-    return parcel_schema.Parcel.model_validate(db_parcel)
+    return parcel_schema.Parcel.model_validate(parcel)
 
 
 @router.patch(
@@ -249,19 +710,19 @@ async def assign_delivery_staff_to_parcel(
     parcel_id: int,
     delivery_staff_id: int,
     session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
 ) -> parcel_schema.Parcel:
     """Assign delivery staff to a parcel."""
-    db_parcel = await session.get(Parcel, parcel_id)
-    if not db_parcel:
+    parcel = await mutations.update_returning(
+        session, Parcel, parcel_id, {"delivery_staff_id": delivery_staff_id}
+    )
+    if not parcel:
         raise HTTPException(status_code=404, detail="Parcel not found")
 
-    db_parcel.delivery_staff_id = delivery_staff_id
-    db_parcel.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_parcel)
+    await cache.invalidate(parcel["tracking_number"])
 
-    return parcel_schema.Parcel.model_validate(db_parcel)
+    return parcel_schema.Parcel.model_validate(parcel)
 
 
 @router.delete(
@@ -270,12 +731,22 @@ async def assign_delivery_staff_to_parcel(
     description="Delete a parcel by ID.",
     status_code=204,
 )
-async def delete_parcel(parcel_id: int, session: AsyncSession = Depends(get_session)):
-    """Delete a parcel."""
-    db_parcel = await session.get(Parcel, parcel_id)
-    if not db_parcel:
+async def delete_parcel(
+    parcel_id: int,
+    session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+):
+    """Delete a parcel and its events, uncounting it from the station rollups."""
+    await session.exec(delete(ParcelEvent).where(ParcelEvent.parcel_id == parcel_id))
+    parcel = await mutations.delete_returning(
+        session, Parcel, parcel_id, Parcel.tracking_number, *COUNTED_FIELDS
+    )
+    if not parcel:
         raise HTTPException(status_code=404, detail="Parcel not found")
 
-    await session.delete(db_parcel)
+    await station_stats.update_counts(
+        session, removed=station_stats.parcel_keys(parcel)
+    )
     await session.commit()
+    await cache.invalidate(parcel["tracking_number"])
     return None
@@ -0,0 +1,121 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends
+
+from flasx.core import pricing
+from flasx.core.pricing import QuoteEngine, get_quote_engine
+from flasx.core.station_directory import StationDirectory, get_station_directory
+from flasx.schemas import quote_schema
+
+router = APIRouter(prefix="/quotes", tags=["quotes"])
+
+
+def get_station_places(
+    directory: StationDirectory, ids: set[int]
+) -> dict[int, tuple[str, str]]:
+    """Return the (city, state) of the stations among ``ids`` that exist."""
+    stations = (directory.get(id) for id in ids if id is not None)
+    return {s.id: (s.city, s.state) for s in stations if s is not None}
+
+
+@router.post(
+    "",
+    summary="Quote a parcel",
+    description="Price one parcel from the rate card.",
+    response_model=quote_schema.Quote,
+)
+async def create_quote(
+    parcel: quote_schema.QuoteRequest,
+    directory: StationDirectory = Depends(get_station_directory),
+    engine: QuoteEngine = Depends(get_quote_engine),
+) -> quote_schema.Quote:
+    """Price a parcel with the scalar path."""
+    station_ids = {parcel.origin_station_id, parcel.destination_station_id}
+    places = get_station_places(directory, set(station_ids))
+    if any(id is not None and id not in places for id in station_ids):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    zone = pricing.zone_of(
+        places.get(parcel.origin_station_id),
+        places.get(parcel.destination_station_id),
+    )
+    return quote_schema.Quote(
+        **engine.quote(parcel.weight, parcel.length, parcel.width, parcel.height, zone)
+    )
+
+
+@router.post(
+    "/batch",
+    summary="Quote parcels in batch",
+    description="Price up to 100,000 parcels in one request, errors are reported per item index.",
+    response_model=quote_schema.QuoteBatch,
+)
+async def create_quotes_batch(
+    batch: quote_schema.QuoteBatchRequest,
+    directory: StationDirectory = Depends(get_station_directory),
+    engine: QuoteEngine = Depends(get_quote_engine),
+) -> quote_schema.QuoteBatch:
+    """Price the parcels of a batch with vectorized computation."""
+    parcels = batch.parcels
+    places = get_station_places(
+        directory,
+        {p.origin_station_id for p in parcels}
+        | {p.destination_station_id for p in parcels},
+    )
+
+    errors = []
+    valid = []
+    for index, parcel in enumerate(parcels):
+        if (
+            parcel.origin_station_id is not None
+            and parcel.origin_station_id not in places
+        ):
+            errors.append(
+                quote_schema.QuoteBatchError(
+                    index=index, detail="Origin station not found"
+                )
+            )
+        elif (
+            parcel.destination_station_id is not None
+            and parcel.destination_station_id not in places
+        ):
+            errors.append(
+                quote_schema.QuoteBatchError(
+                    index=index, detail="Destination station not found"
+                )
+            )
+        else:
+            valid.append(index)
+
+    quotes = []
+    if valid:
+        columns = {
+            name: np.fromiter(
+                (getattr(parcels[i], name) for i in valid),
+                dtype=np.float64,
+                count=len(valid),
+            )
+            for name in ("weight", "length", "width", "height")
+        }
+        station_ids = {
+            name: np.fromiter(
+                (getattr(parcels[i], name) or 0 for i in valid),
+                dtype=np.int64,
+                count=len(valid),
+            )
+            for name in ("origin_station_id", "destination_station_id")
+        }
+        zones = engine.zones(
+            station_ids["origin_station_id"],
+            station_ids["destination_station_id"],
+            places,
+        )
+        result = engine.quote_batch(**columns, zone=zones)
+
+        result["zone"] = np.asarray(pricing.ZONES)[result["zone"]]
+        values = zip(*(result[name].tolist() for name in result))
+        quotes = [
+            quote_schema.QuoteBatchItem(index=index, **dict(zip(result, row)))
+            for index, row in zip(valid, values)
+        ]
+
+    return quote_schema.QuoteBatch(quotes=quotes, errors=errors)
@@ -1,11 +1,30 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from datetime import datetime
-from sqlmodel import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import delete, func, or_, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from flasx.core import mutations
+from flasx.core import pagination
+from flasx.core import station_directory
+from flasx.core import station_geo
+from flasx.core import station_routing
+from flasx.core.cache import TrackingCache, get_tracking_cache
+from flasx.core.station_directory import StationDirectory, get_station_directory
 from flasx.schemas import station_schema
-from flasx.models import get_session, Station
+from flasx.models import (
+    get_session,
+    get_read_session,
+    get_read_session_factory,
+    Parcel,
+    ParcelEvent,
+    Station,
+    StationLink,
+    StationStatusCount,
+    Vehicle,
+)
 
 router = APIRouter(prefix="/stations", tags=["stations"])
 
@@ -17,31 +36,62 @@ router = APIRouter(prefix="/stations", tags=["stations"])
     response_model=list[station_schema.Station],
 )
 async def get_stations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: pagination.SortKey = "id",
+    code: Optional[str] = None,
     city: Optional[str] = None,
     state: Optional[str] = None,
     is_active: Optional[bool] = None,
-    session: AsyncSession = Depends(get_session),
+    directory: StationDirectory = Depends(get_station_directory),
 ) -> list[station_schema.Station]:
-    """Get all stations with optional pagination and filtering."""
-    query = select(Station)
+    """Get all stations with optional pagination and filtering.
 
-    # Apply filters
-    if city:
-        query = query.where(Station.city.ilike(f"%{city}%"))
-    if state:
-        query = query.where(Station.state.ilike(f"%{state}%"))
-    if is_active is not None:
-        query = query.where(Station.is_active == is_active)
+    Served from the station directory, ``code``, ``city`` and ``state``
+    match prefixes.
+    """
+    stations = directory.filter(code=code, city=city, state=state, is_active=is_active)
+    stations = pagination.paginate_items(
+        stations, sort, limit, skip=skip, cursor=cursor
+    )
+    pagination.set_next_cursor(response, stations, sort, limit)
 
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    return stations
 
-    result = await session.exec(query)
-    stations = result.all()
 
-    return [station_schema.Station.model_validate(station) for station in stations]
+@router.get(
+    "/nearest",
+    summary="Get the nearest stations",
+    description="Find the active stations nearest to a position, or sharing the longest postal code prefix when no position is given.",
+    response_model=list[station_schema.NearestStation],
+)
+async def get_nearest_stations(
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    postal_code: Optional[str] = None,
+    k: int = Query(default=5, ge=1, le=100),
+    directory: StationDirectory = Depends(get_station_directory),
+) -> list[station_schema.NearestStation]:
+    """Get the k nearest stations from the in-memory station index."""
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="Give both lat and lon")
+    if lat is None and not postal_code:
+        raise HTTPException(
+            status_code=400, detail="Give lat and lon, or a postal_code"
+        )
+
+    index = station_geo.get_station_index(directory)
+    if lat is not None:
+        matches = index.nearest(lat, lon, k)
+    else:
+        matches = [(station, None) for station in index.by_postal_code(postal_code, k)]
+
+    return [
+        station_schema.NearestStation(**station.model_dump(), distance_km=distance)
+        for station, distance in matches
+    ]
 
 
 @router.get(
@@ -51,14 +101,14 @@ async def get_stations(
     response_model=station_schema.Station,
 )
 async def get_station(
-    station_id: int, session: AsyncSession = Depends(get_session)
+    station_id: int, directory: StationDirectory = Depends(get_station_directory)
 ) -> station_schema.Station:
     """Get a single station by ID."""
-    station = await session.get(Station, station_id)
+    station = directory.get(station_id)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
 
-    return station_schema.Station.model_validate(station)
+    return station
 
 
 @router.get(
@@ -68,17 +118,14 @@ async def get_station(
     response_model=station_schema.Station,
 )
 async def get_station_by_code(
-    station_code: str, session: AsyncSession = Depends(get_session)
+    station_code: str, directory: StationDirectory = Depends(get_station_directory)
 ) -> station_schema.Station:
     """Get a single station by code."""
-    query = select(Station).where(Station.code == station_code)
-    result = await session.exec(query)
-    station = result.first()
-
+    station = directory.get_by_code(station_code)
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
 
-    return station_schema.Station.model_validate(station)
+    return station
 
 
 @router.post(
@@ -104,8 +151,10 @@ async def create_station(
     # Create new station
     db_station = Station(**station.model_dump())
     session.add(db_station)
+    await station_directory.bump_version(session)
     await session.commit()
     await session.refresh(db_station)
+    station_directory.reset_station_directory()
 
     return station_schema.Station.model_validate(db_station)
 
@@ -120,35 +169,39 @@ async def update_station(
     station_id: int,
     station_update: station_schema.StationUpdate,
     session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
 ) -> station_schema.Station:
-    """Update an existing station."""
-    db_station = await session.get(Station, station_id)
-    if not db_station:
+    """Update an existing station in one UPDATE ... RETURNING."""
+    values = station_update.model_dump(exclude_unset=True)
+    station = await mutations.update_returning(
+        session,
+        Station,
+        station_id,
+        values,
+        conflicts={"code": "Station code already exists"},
+    )
+    if not station:
         raise HTTPException(status_code=404, detail="Station not found")
 
-    # Check if code is being updated and already exists
-    if station_update.code:
-        query = select(Station).where(
-            Station.code == station_update.code, Station.id != station_id
+    tracking_numbers = []
+    if "name" in values:
+        # the tracking responses show the station name
+        result = await session.exec(
+            select(Parcel.tracking_number).where(
+                or_(
+                    Parcel.origin_station_id == station_id,
+                    Parcel.destination_station_id == station_id,
+                )
+            )
         )
-        result = await session.exec(query)
-        existing_station = result.first()
-
-        if existing_station:
-            raise HTTPException(status_code=400, detail="Station code already exists")
-
-    # Update only provided fields
-    update_data = station_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_station, field, value)
-
-    # Update timestamp
-    db_station.updated_at = datetime.now()
+        tracking_numbers = result.all()
 
+    await station_directory.bump_version(session)
     await session.commit()
-    await session.refresh(db_station)
+    station_directory.reset_station_directory()
+    await cache.invalidate(*tracking_numbers)
 
-    return station_schema.Station.model_validate(db_station)
+    return station_schema.Station.model_validate(station)
 
 
 @router.delete(
@@ -157,12 +210,162 @@ async def update_station(
     description="Delete a station by ID.",
     status_code=204,
 )
-async def delete_station(station_id: int, session: AsyncSession = Depends(get_session)):
-    """Delete a station."""
-    db_station = await session.get(Station, station_id)
-    if not db_station:
+async def delete_station(
+    station_id: int,
+    session: AsyncSession = Depends(get_session),
+    cache: TrackingCache = Depends(get_tracking_cache),
+):
+    """Delete a station and its links and rollups.
+
+    Its parcels, vehicles and parcel events are detached from it.
+    """
+    parcels = await mutations.clear_references(
+        session,
+        station_id,
+        Parcel.origin_station_id,
+        Parcel.destination_station_id,
+        returning=[Parcel.tracking_number],
+    )
+    await mutations.clear_references(session, station_id, Vehicle.station_id)
+    await mutations.clear_references(session, station_id, ParcelEvent.station_id)
+    await session.exec(
+        delete(StationStatusCount).where(StationStatusCount.station_id == station_id)
+    )
+    await session.exec(
+        delete(StationLink).where(
+            or_(
+                StationLink.from_station_id == station_id,
+                StationLink.to_station_id == station_id,
+            )
+        )
+    )
+    if not await mutations.delete_returning(session, Station, station_id):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    await station_directory.bump_version(session)
+    await session.commit()
+    station_directory.reset_station_directory()
+    # the tracking responses show the station name
+    await cache.invalidate(*(parcel.tracking_number for parcel in parcels))
+    await station_routing.apply_station_deleted(session, station_id)
+    return None
+
+
+@router.get(
+    "/{station_id}/next-hop",
+    summary="Get the next station towards a destination",
+    description="Look up the next station on the fastest route to the destination station, from the in-memory routing table.",
+    response_model=station_schema.NextHop,
+)
+async def get_next_hop(
+    station_id: int,
+    destination: int,
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+    directory: StationDirectory = Depends(get_station_directory),
+) -> station_schema.NextHop:
+    """Get the next hop from a station to a destination station."""
+    table = await station_routing.get_routing_table(session_factory)
+    next_hop = table.next_hop(station_id, destination)
+    if next_hop is None:
+        if station_id == destination:
+            next_hop = station_routing.NextHop(destination, 0.0, 0.0)
+        elif not directory.get(station_id) or not directory.get(destination):
+            raise HTTPException(status_code=404, detail="Station not found")
+        else:
+            raise HTTPException(status_code=404, detail="No route to destination")
+
+    return station_schema.NextHop(
+        station_id=station_id,
+        destination_station_id=destination,
+        next_station_id=next_hop.station_id,
+        transit_minutes=next_hop.transit_minutes,
+        cost=next_hop.cost,
+    )
+
+
+@router.get(
+    "/{station_id}/links",
+    summary="Get the links of a station",
+    description="Retrieve the links leaving a station.",
+    response_model=list[station_schema.StationLink],
+)
+async def get_station_links(
+    station_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    directory: StationDirectory = Depends(get_station_directory),
+) -> list[station_schema.StationLink]:
+    """Get the outgoing links of a station."""
+    if not directory.get(station_id):
+        raise HTTPException(status_code=404, detail="Station not found")
+
+    query = (
+        select(StationLink)
+        .where(StationLink.from_station_id == station_id)
+        .order_by(StationLink.to_station_id)
+    )
+    result = await session.exec(query)
+    return [station_schema.StationLink.model_validate(link) for link in result.all()]
+
+
+@router.put(
+    "/{station_id}/links/{to_station_id}",
+    summary="Create or update a station link",
+    description="Set the transit time and cost from a station to another, the routing table is updated incrementally.",
+    response_model=station_schema.StationLink,
+)
+async def set_station_link(
+    station_id: int,
+    to_station_id: int,
+    link_update: station_schema.StationLinkUpdate,
+    session: AsyncSession = Depends(get_session),
+) -> station_schema.StationLink:
+    """Create or update the link from a station to another."""
+    if station_id == to_station_id:
+        raise HTTPException(status_code=400, detail="A station cannot link to itself")
+    result = await session.exec(
+        select(func.count()).where(Station.id.in_([station_id, to_station_id]))
+    )
+    if result.one() < 2:
         raise HTTPException(status_code=404, detail="Station not found")
 
-    await session.delete(db_station)
+    # create or update in one INSERT ... ON CONFLICT ... RETURNING
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    values = link_update.model_dump()
+    statement = dialect.insert(StationLink).values(
+        from_station_id=station_id, to_station_id=to_station_id, **values
+    )
+    result = await session.exec(
+        statement.on_conflict_do_update(
+            index_elements=["from_station_id", "to_station_id"],
+            set_=dict(values, updated_at=datetime.now()),
+        ).returning(*StationLink.__table__.c)
+    )
+    link = station_schema.StationLink.model_validate(result.one()._mapping)
+    await session.commit()
+    await station_routing.apply_link(session, station_id, to_station_id, link)
+
+    return link
+
+
+@router.delete(
+    "/{station_id}/links/{to_station_id}",
+    summary="Delete a station link",
+    description="Delete the link from a station to another.",
+    status_code=204,
+)
+async def delete_station_link(
+    station_id: int, to_station_id: int, session: AsyncSession = Depends(get_session)
+):
+    """Delete the link from a station to another."""
+    result = await session.exec(
+        delete(StationLink).where(
+            StationLink.from_station_id == station_id,
+            StationLink.to_station_id == to_station_id,
+        )
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Station link not found")
+
     await session.commit()
+    await station_routing.apply_link(session, station_id, to_station_id, None)
     return None
@@ -0,0 +1,59 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.schemas import stats_schema
+from flasx.models import get_read_session, StationStatusCount
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get(
+    "/stations",
+    summary="Get parcel counts per station",
+    description="Count parcels by status for every origin or destination station, from the station rollup.",
+    response_model=list[stats_schema.StationStatusCounts],
+)
+async def get_station_stats(
+    direction: stats_schema.Direction = "origin",
+    station_id: Optional[int] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> list[stats_schema.StationStatusCounts]:
+    """Sum the rollup rows, optionally only for parcels created in a date range."""
+    query = (
+        select(
+            StationStatusCount.station_id,
+            StationStatusCount.status,
+            func.sum(StationStatusCount.count),
+        )
+        .where(StationStatusCount.direction == direction)
+        .group_by(StationStatusCount.station_id, StationStatusCount.status)
+        .order_by(StationStatusCount.station_id)
+    )
+    if station_id is not None:
+        query = query.where(StationStatusCount.station_id == station_id)
+    if created_from is not None:
+        query = query.where(StationStatusCount.day >= created_from)
+    if created_to is not None:
+        query = query.where(StationStatusCount.day <= created_to)
+
+    result = await session.exec(query)
+
+    stations: dict[int, stats_schema.StationStatusCounts] = {}
+    for station, status, count in result.all():
+        if not count:
+            continue
+        stats = stations.setdefault(
+            station,
+            stats_schema.StationStatusCounts(
+                station_id=station, direction=direction, counts={}, total=0
+            ),
+        )
+        stats.counts[stats_schema.ParcelStatus(status)] = count
+        stats.total += count
+
+    return list(stations.values())
@@ -1,11 +1,12 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from flasx.core import mutations
+from flasx.core import pagination
 from flasx.schemas import vehicle_schema
-from flasx.models import get_session, Vehicle
+from flasx.models import get_session, get_read_session, Parcel, Vehicle
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
@@ -17,11 +18,15 @@ router = APIRouter(prefix="/vehicles", tags=["vehicles"])
     response_model=list[vehicle_schema.Vehicle],
 )
 async def get_vehicles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: pagination.SortKey = "id",
     type: Optional[str] = None,
     is_active: Optional[bool] = None,
-    session: AsyncSession = Depends(get_session),
+    station_id: Optional[int] = None,
+    session: AsyncSession = Depends(get_read_session),
 ) -> list[vehicle_schema.Vehicle]:
     """Get all vehicles with optional pagination and filtering."""
     query = select(Vehicle)
@@ -31,12 +36,15 @@ async def get_vehicles(
         query = query.where(Vehicle.type.ilike(f"%{type}%"))
     if is_active is not None:
         query = query.where(Vehicle.is_active == is_active)
+    if station_id is not None:
+        query = query.where(Vehicle.station_id == station_id)
 
     # Apply pagination
-    query = query.offset(skip).limit(limit)
+    query = pagination.paginate(query, Vehicle, sort, limit, skip=skip, cursor=cursor)
 
     result = await session.exec(query)
     vehicles = result.all()
+    pagination.set_next_cursor(response, vehicles, sort, limit)
 
     return [vehicle_schema.Vehicle.model_validate(vehicle) for vehicle in vehicles]
 
@@ -48,7 +56,7 @@ async def get_vehicles(
     response_model=vehicle_schema.Vehicle,
 )
 async def get_vehicle(
-    vehicle_id: int, session: AsyncSession = Depends(get_session)
+    vehicle_id: int, session: AsyncSession = Depends(get_read_session)
 ) -> vehicle_schema.Vehicle:
     """Get a single vehicle by ID."""
     vehicle = await session.get(Vehicle, vehicle_id)
@@ -65,7 +73,7 @@ async def get_vehicle(
     response_model=vehicle_schema.Vehicle,
 )
 async def get_vehicle_by_license(
-    license_plate: str, session: AsyncSession = Depends(get_session)
+    license_plate: str, session: AsyncSession = Depends(get_read_session)
 ) -> vehicle_schema.Vehicle:
     """Get a single vehicle by license plate."""
     query = select(Vehicle).where(Vehicle.license_plate == license_plate)
@@ -118,35 +126,19 @@ async def update_vehicle(
     vehicle_update: vehicle_schema.VehicleUpdate,
     session: AsyncSession = Depends(get_session),
 ) -> vehicle_schema.Vehicle:
-    """Update an existing vehicle."""
-    db_vehicle = await session.get(Vehicle, vehicle_id)
-    if not db_vehicle:
+    """Update an existing vehicle in one UPDATE ... RETURNING."""
+    vehicle = await mutations.update_returning(
+        session,
+        Vehicle,
+        vehicle_id,
+        vehicle_update.model_dump(exclude_unset=True),
+        conflicts={"license_plate": "License plate already exists"},
+    )
+    if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
-    # Check if license plate is being updated and already exists
-    if vehicle_update.license_plate:
-        query = select(Vehicle).where(
-            Vehicle.license_plate == vehicle_update.license_plate,
-            Vehicle.id != vehicle_id,
-        )
-        result = await session.exec(query)
-        existing_vehicle = result.first()
-
-        if existing_vehicle:
-            raise HTTPException(status_code=400, detail="License plate already exists")
-
-    # Update only provided fields
-    update_data = vehicle_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_vehicle, field, value)
-
-    # Update timestamp
-    db_vehicle.updated_at = datetime.now()
-
     await session.commit()
-    await session.refresh(db_vehicle)
-
-    return vehicle_schema.Vehicle.model_validate(db_vehicle)
+    return vehicle_schema.Vehicle.model_validate(vehicle)
 
 
 @router.delete(
@@ -156,11 +148,10 @@ async def update_vehicle(
     status_code=204,
 )
 async def delete_vehicle(vehicle_id: int, session: AsyncSession = Depends(get_session)):
-    """Delete a vehicle."""
-    db_vehicle = await session.get(Vehicle, vehicle_id)
-    if not db_vehicle:
+    """Delete a vehicle, unassigning it from its parcels."""
+    await mutations.clear_references(session, vehicle_id, Parcel.vehicle_id)
+    if not await mutations.delete_returning(session, Vehicle, vehicle_id):
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
-    await session.delete(db_vehicle)
     await session.commit()
     return None
@@ -0,0 +1,53 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    """Connection pool usage of the database engine"""
+
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    idle: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_avg_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    wait_last_ms: float = 0.0
+
+
+class CacheStats(BaseModel):
+    """Hit and miss counters of the tracking cache"""
+
+    backend: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    invalidations: int
+    errors: int
+    entries: Optional[int] = None
+
+
+class StatusQueueStats(BaseModel):
+    """Counters of the status write-behind queue"""
+
+    pending: int
+    flushes: int
+    flushed: int
+    coalesced: int
+    failed: int
+
+
+class LiveStats(BaseModel):
+    """Subscriptions and message counters of the live tracking hub"""
+
+    broker: str
+    topics: int
+    subscriptions: int
+    published: int
+    delivered: int
+    dropped: int
+    errors: int
@@ -29,3 +29,11 @@ class Customer(CustomerBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CustomerSuggestion(BaseModel):
+    id: int
+    name: str
+    email: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,53 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class LoadPlanRequest(BaseModel):
+    station_id: int
+    # default: the unassigned created or picked up parcels leaving the station
+    parcel_ids: Optional[list[int]] = Field(default=None, max_length=100_000)
+    # default: the active vehicles of the station
+    vehicle_ids: Optional[list[int]] = None
+    dry_run: bool = False
+
+
+class VehicleLoad(BaseModel):
+    vehicle_id: int
+    parcel_ids: list[int]
+    weight: float  # kg, including parcels already on board
+    volume: float  # m3, including parcels already on board
+    capacity: float
+    volume_capacity: Optional[float] = None
+
+
+class LoadPlan(BaseModel):
+    """Parcels assigned to each vehicle, applied unless it is a dry run"""
+
+    vehicles: list[VehicleLoad]
+    assigned: int
+    unassigned_parcel_ids: list[int]
+    applied: bool
+
+
+class StaffAssignRequest(BaseModel):
+    # default: every out for delivery parcel without delivery staff
+    parcel_ids: Optional[list[int]] = Field(default=None, max_length=100_000)
+    # default: every active delivery staff
+    staff_ids: Optional[list[int]] = None
+    # balance the total weight instead of the number of parcels
+    weighted: bool = False
+
+
+class StaffWorkload(BaseModel):
+    delivery_staff_id: int
+    parcels: int
+    weight: float
+
+
+class StaffAssignment(BaseModel):
+    """Workloads after a balanced assignment of parcels to delivery staff"""
+
+    assigned: int
+    # taken by a concurrent assignment between the read and the update
+    unassigned_parcel_ids: list[int] = []
+    workloads: list[StaffWorkload]
@@ -0,0 +1,45 @@
+from typing import Any, Literal, Optional
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, computed_field
+
+
+class ExportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJobCreate(BaseModel):
+    entity: Literal["parcels", "customers", "stations"]
+    format: Literal["csv", "parquet"] = "csv"
+    # equality filters on columns of the entity, e.g. {"status": "delivered"}
+    filters: dict[str, Any] = {}
+
+
+class ExportJob(BaseModel):
+    id: int
+    entity: str
+    format: str
+    filters: dict[str, Any]
+    status: ExportStatus
+    total_rows: Optional[int] = None
+    rows_written: int
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction of the rows written, known once the job has started"""
+        if self.status == ExportStatus.COMPLETED:
+            return 1.0
+        if not self.total_rows:
+            return None
+        return self.rows_written / self.total_rows
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from enum import Enum
 
 
@@ -35,6 +35,68 @@ class ParcelCreate(ParcelBase):
     destination_station_id: Optional[int] = None
 
 
+class ParcelBulkItem(ParcelCreate):
+    # generated by the server, accepted for symmetry with ParcelCreate
+    tracking_number: Optional[str] = None
+
+
+class ParcelBulkCreate(BaseModel):
+    parcels: list[ParcelBulkItem] = Field(min_length=1, max_length=50_000)
+
+
+class ParcelBulkCreated(BaseModel):
+    index: int
+    id: int
+    tracking_number: str
+
+
+class ParcelBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class ParcelBulkResult(BaseModel):
+    """Outcome of a bulk creation, items are referenced by their index"""
+
+    created: list[ParcelBulkCreated]
+    errors: list[ParcelBulkError]
+
+
+class ParcelStatusAccepted(BaseModel):
+    """Status update taken by the write-behind queue"""
+
+    id: int
+    status: ParcelStatus
+    committed: bool
+
+
+class ParcelStatusBulkUpdate(BaseModel):
+    """Parcels to move to ``status``, referenced by tracking number or ID"""
+
+    tracking_numbers: list[str] = Field(default=[], max_length=10_000)
+    ids: list[int] = Field(default=[], max_length=10_000)
+    status: ParcelStatus
+    station_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_parcels(self):
+        if not self.tracking_numbers and not self.ids:
+            raise ValueError("tracking_numbers or ids is required")
+        return self
+
+
+class ParcelStatusBulkUpdated(BaseModel):
+    id: int
+    tracking_number: str
+
+
+class ParcelStatusBulkResult(BaseModel):
+    updated: list[ParcelStatusBulkUpdated]
+    not_found_tracking_numbers: list[str] = []
+    not_found_ids: list[int] = []
+    malformed: list[str] = []
+
+
 class ParcelUpdate(BaseModel):
     weight: Optional[float] = None
     length: Optional[float] = None
@@ -73,3 +135,29 @@ class ParcelTracking(BaseModel):
     destination_station_name: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ParcelTrackingBatchRequest(BaseModel):
+    tracking_numbers: list[str] = Field(min_length=1, max_length=500)
+
+
+class ParcelTrackingBatch(BaseModel):
+    """Tracking of many parcels, in the order they were requested"""
+
+    parcels: list[ParcelTracking]
+    not_found: list[str] = []
+    malformed: list[str] = []
+
+
+class ParcelTimelineEvent(BaseModel):
+    status: ParcelStatus
+    occurred_at: datetime
+    station_name: Optional[str] = None
+    note: Optional[str] = None
+
+
+class ParcelTimeline(BaseModel):
+    """Status history of a parcel, oldest first"""
+
+    tracking_number: str
+    events: list[ParcelTimelineEvent]
@@ -0,0 +1,42 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+Zone = Literal["same_city", "same_state", "national"]
+
+
+class QuoteRequest(BaseModel):
+    weight: float = Field(gt=0)
+    length: float = Field(gt=0)
+    width: float = Field(gt=0)
+    height: float = Field(gt=0)
+    origin_station_id: Optional[int] = None
+    destination_station_id: Optional[int] = None
+
+
+class Quote(BaseModel):
+    volumetric_weight: float
+    chargeable_weight: float
+    zone: Zone
+    base_price: float
+    surcharge: float
+    price: float
+
+
+class QuoteBatchRequest(BaseModel):
+    parcels: list[QuoteRequest] = Field(min_length=1, max_length=100_000)
+
+
+class QuoteBatchItem(Quote):
+    index: int
+
+
+class QuoteBatchError(BaseModel):
+    index: int
+    detail: str
+
+
+class QuoteBatch(BaseModel):
+    """Quotes of a batch, items are referenced by their index"""
+
+    quotes: list[QuoteBatchItem]
+    errors: list[QuoteBatchError] = []
@@ -1,6 +1,6 @@
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class StationBase(BaseModel):
@@ -11,6 +11,8 @@ class StationBase(BaseModel):
     state: str
     postal_code: str
     phone: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
     is_active: bool = True
 
 
@@ -26,6 +28,8 @@ class StationUpdate(BaseModel):
     state: Optional[str] = None
     postal_code: Optional[str] = None
     phone: Optional[str] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
     is_active: Optional[bool] = None
 
 
@@ -35,3 +39,37 @@ class Station(StationBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class NearestStation(Station):
+    # great-circle distance, none for stations matched by postal code
+    distance_km: Optional[float] = None
+
+
+class StationLinkBase(BaseModel):
+    transit_minutes: float = Field(ge=0)
+    cost: float = Field(default=0.0, ge=0)
+    is_active: bool = True
+
+
+class StationLinkUpdate(StationLinkBase):
+    pass
+
+
+class StationLink(StationLinkBase):
+    id: int
+    from_station_id: int
+    to_station_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NextHop(BaseModel):
+    station_id: int
+    destination_station_id: int
+    next_station_id: int
+    # totals along the shortest path to the destination
+    transit_minutes: float
+    cost: float
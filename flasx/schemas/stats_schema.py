@@ -0,0 +1,16 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+from .parcel_schema import ParcelStatus
+
+Direction = Literal["origin", "destination"]
+
+
+class StationStatusCounts(BaseModel):
+    """Parcel counts of a station by status"""
+
+    station_id: int
+    direction: Direction
+    counts: dict[ParcelStatus, int]
+    total: int
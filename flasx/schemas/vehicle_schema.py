@@ -6,7 +6,9 @@ from pydantic import BaseModel, ConfigDict
 class VehicleBase(BaseModel):
     license_plate: str
     type: str
-    capacity: float
+    capacity: float  # kg
+    volume_capacity: Optional[float] = None  # m3
+    station_id: Optional[int] = None
     is_active: bool = True
 
 
@@ -18,6 +20,8 @@ class VehicleUpdate(BaseModel):
     license_plate: Optional[str] = None
     type: Optional[str] = None
     capacity: Optional[float] = None
+    volume_capacity: Optional[float] = None
+    station_id: Optional[int] = None
     is_active: Optional[bool] = None
 
 
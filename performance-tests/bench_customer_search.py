@@ -0,0 +1,81 @@
+"""Customer search time, indexed against ``ilike`` scans.
+
+Fills a SQLite database file with random customers and times ranked search
+and autocomplete with ``LikeSearch`` and ``Fts5Search``.
+
+    PYTHONPATH=. python performance-tests/bench_customer_search.py
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import string
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from flasx.core import customer_search
+from flasx.models import Customer
+
+SEARCHES = ["mart", "xqzt", "olen", "abcde"]
+PREFIXES = ["ma", "mart", "xq"]
+
+
+async def run(customers: int, path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+    rows = [
+        dict(
+            name=f"{word().title()} {word().title()}",
+            email=f"{word()}{i}@example.com",
+            phone="1",
+            is_active=True,
+        )
+        for i in range(customers)
+    ]
+
+    async with AsyncSession(engine) as session:
+        await session.exec(insert(Customer), params=rows)
+        await session.commit()
+
+        for backend in (customer_search.LikeSearch(), customer_search.Fts5Search()):
+            started = time.perf_counter()
+            for text in SEARCHES:
+                (await session.exec(backend.search(text, 20))).all()
+            search = (time.perf_counter() - started) / len(SEARCHES)
+
+            started = time.perf_counter()
+            for text in PREFIXES:
+                await backend.autocomplete(session, text, 10)
+            autocomplete = (time.perf_counter() - started) / len(PREFIXES)
+
+            print(
+                f"{backend.name}: search {search * 1000:.1f} ms, "
+                f"autocomplete {autocomplete * 1000:.1f} ms"
+            )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--customers", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(args.customers, os.path.join(directory, "customers.db")))
+
+
+if __name__ == "__main__":
+    main()
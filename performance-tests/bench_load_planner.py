@@ -0,0 +1,46 @@
+"""Load planning time for a busy station.
+
+Packs random parcels into random vehicles with ``plan_loads`` and reports
+the median planning time; the target is 50k parcels x 200 vehicles in under
+a second.
+
+    PYTHONPATH=. python performance-tests/bench_load_planner.py
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from flasx.core import load_planner
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parcels", type=int, default=50_000)
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(0.2, 30, args.parcels)
+    volumes = load_planner.parcel_volumes(*rng.uniform(5, 80, (3, args.parcels)))
+    capacity = rng.choice([500.0, 1500.0, 3000.0, 8000.0], args.vehicles)
+    volume_capacity = capacity / 250
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        assignment = load_planner.plan_loads(
+            weights, volumes, capacity, volume_capacity
+        )
+        timings.append(time.perf_counter() - started)
+
+    assigned = (assignment != load_planner.UNASSIGNED).sum()
+    print(f"{args.parcels:,} parcels x {args.vehicles} vehicles")
+    print(f"median {statistics.median(timings) * 1000:.1f} ms, {assigned:,} assigned")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Nearest-station lookup time.
+
+Indexes random stations over Thailand and times ``KdTree.query`` for random
+positions; drop-off selection asks for it on every checkout page view.
+
+    PYTHONPATH=. python performance-tests/bench_nearest_station.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from flasx.core import station_geo
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=20_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    latitudes = rng.uniform(5.6, 20.5, args.stations)
+    longitudes = rng.uniform(97.3, 105.6, args.stations)
+
+    started = time.perf_counter()
+    tree = station_geo.KdTree(station_geo.unit_vectors(latitudes, longitudes))
+    print(f"build {args.stations:,} stations: {time.perf_counter() - started:.2f} s")
+
+    queries = station_geo.unit_vectors(
+        rng.uniform(5.6, 20.5, args.lookups), rng.uniform(97.3, 105.6, args.lookups)
+    ).tolist()
+    started = time.perf_counter()
+    for query in queries:
+        tree.query(query, args.k)
+    elapsed = time.perf_counter() - started
+    print(f"{args.k} nearest: {elapsed / args.lookups * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Parcel listing latency before and after the parcel indexes.
+
+Seeds a SQLite database with parcels, then times the listing query shapes
+of ``get_parcels`` without the indexes added by migration 2 and with them.
+
+    PYTHONPATH=. python performance-tests/bench_parcel_list.py --rows 10000000
+
+The database file is kept between runs and only seeded when it is missing.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlmodel import SQLModel
+
+from flasx.models import Customer, Parcel, ParcelStatus, Station
+
+PARCEL_INDEXES = [
+    "ix_parcel_status_created_at",
+    "ix_parcel_sender_id_created_at",
+    "ix_parcel_receiver_id_created_at",
+    "ix_parcel_created_at",
+    "ix_parcel_origin_station_id",
+    "ix_parcel_destination_station_id",
+    "ix_parcel_vehicle_id",
+    "ix_parcel_delivery_staff_id",
+]
+
+
+def seed(engine, rows: int, customers: int, stations: int, batch: int = 50_000):
+    SQLModel.metadata.create_all(engine)
+    now = datetime.datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Customer),
+            [
+                dict(name=f"Customer {i}", email=f"c{i}@example.com", phone="0")
+                for i in range(customers)
+            ],
+        )
+        conn.execute(
+            insert(Station),
+            [
+                dict(
+                    name=f"Station {i}",
+                    code=f"S{i}",
+                    address="-",
+                    city="-",
+                    state="-",
+                    postal_code="00000",
+                )
+                for i in range(stations)
+            ],
+        )
+
+    statuses = list(ParcelStatus)
+    for start in range(0, rows, batch):
+        values = []
+        for i in range(start, min(start + batch, rows)):
+            created_at = now - datetime.timedelta(seconds=rows - i)
+            values.append(
+                dict(
+                    tracking_number=f"PKG{i:014d}",
+                    weight=1.0,
+                    length=10.0,
+                    width=10.0,
+                    height=10.0,
+                    service_price=50,
+                    status=random.choice(statuses),
+                    sender_id=random.randint(1, customers),
+                    receiver_id=random.randint(1, customers),
+                    origin_station_id=random.randint(1, stations),
+                    destination_station_id=random.randint(1, stations),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+
+        with engine.begin() as conn:
+            conn.execute(insert(Parcel), values)
+        print(f"seeded {min(start + batch, rows):,} parcels", end="\r")
+    print()
+
+
+def query_shapes(customers: int, stations: int) -> dict:
+    sender_id = random.randint(1, customers)
+    receiver_id = random.randint(1, customers)
+    station_id = random.randint(1, stations)
+    status = ParcelStatus.OUT_FOR_DELIVERY
+    page = lambda query: query.order_by(Parcel.created_at, Parcel.id).limit(100)
+
+    return {
+        "status": page(select(Parcel).where(Parcel.status == status)),
+        "sender": page(select(Parcel).where(Parcel.sender_id == sender_id)),
+        "receiver": page(select(Parcel).where(Parcel.receiver_id == receiver_id)),
+        "status+sender": page(
+            select(Parcel).where(Parcel.status == status, Parcel.sender_id == sender_id)
+        ),
+        "origin station": page(
+            select(Parcel).where(Parcel.origin_station_id == station_id)
+        ),
+        "latest": select(Parcel).order_by(Parcel.created_at.desc()).limit(100),
+    }
+
+
+def measure(engine, customers: int, stations: int, repeat: int) -> dict:
+    timings = {}
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            for name, query in query_shapes(customers, stations).items():
+                started = time.perf_counter()
+                conn.execute(query).all()
+                timings.setdefault(name, []).append(time.perf_counter() - started)
+
+    return {name: statistics.median(values) * 1000 for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--stations", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", default="./data/bench_parcel_list.db")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    is_new = not os.path.exists(args.db)
+    engine = create_engine(f"sqlite:///{args.db}")
+    if is_new:
+        seed(engine, args.rows, args.customers, args.stations)
+
+    with engine.begin() as conn:
+        for name in PARCEL_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text("ANALYZE"))
+    before = measure(engine, args.customers, args.stations, args.repeat)
+
+    with engine.begin() as conn:
+        indexes = {index.name: index for index in Parcel.__table__.indexes}
+        for name in PARCEL_INDEXES:
+            indexes[name].create(conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+    after = measure(engine, args.customers, args.stations, args.repeat)
+
+    print(f"{'query':<16}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<16}{before[name]:>14.2f}{after[name]:>14.2f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
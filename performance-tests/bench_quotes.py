@@ -0,0 +1,84 @@
+"""Per-parcel cost of rate-card quotes, scalar against vectorized.
+
+Prices random parcels with ``QuoteEngine.quote`` one at a time and with one
+``QuoteEngine.quote_batch`` call, including the zone lookup, and reports the
+cost per parcel.
+
+    PYTHONPATH=. python performance-tests/bench_quotes.py --parcels 50000
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from flasx.core import pricing
+from flasx.core.pricing import QuoteEngine, RateCard
+
+
+def make_parcels(size: int, stations: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return dict(
+        weight=rng.uniform(0.1, 40, size),
+        length=rng.uniform(5, 150, size),
+        width=rng.uniform(5, 80, size),
+        height=rng.uniform(5, 80, size),
+        origin=rng.integers(1, stations + 1, size),
+        destination=rng.integers(1, stations + 1, size),
+    )
+
+
+def run_scalar(engine: QuoteEngine, parcels: dict, places: dict):
+    columns = {name: values.tolist() for name, values in parcels.items()}
+    for weight, length, width, height, origin, destination in zip(*columns.values()):
+        zone = pricing.zone_of(places[origin], places[destination])
+        engine.quote(weight, length, width, height, zone)
+
+
+def run_vectorized(engine: QuoteEngine, parcels: dict, places: dict):
+    zones = engine.zones(parcels["origin"], parcels["destination"], places)
+    engine.quote_batch(
+        parcels["weight"],
+        parcels["length"],
+        parcels["width"],
+        parcels["height"],
+        zones,
+    )
+
+
+def measure(function, repeat: int, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parcels", type=int, default=50_000)
+    parser.add_argument("--stations", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = QuoteEngine(RateCard())
+    places = {
+        id: (f"City {id % 150}", f"State {id % 77 % 20}")
+        for id in range(1, args.stations + 1)
+    }
+    parcels = make_parcels(args.parcels, args.stations)
+
+    scalar = measure(run_scalar, args.repeat, engine, parcels, places)
+    vectorized = measure(run_vectorized, args.repeat, engine, parcels, places)
+
+    print(f"{'path':<12}{'total (ms)':>12}{'per parcel (us)':>18}")
+    for name, seconds in [("scalar", scalar), ("vectorized", vectorized)]:
+        per_parcel = seconds / args.parcels * 1e6
+        print(f"{name:<12}{seconds * 1000:>12.2f}{per_parcel:>18.3f}")
+    print(f"speedup {scalar / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
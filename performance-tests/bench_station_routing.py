@@ -0,0 +1,54 @@
+"""Routing table build, update and lookup times.
+
+Builds a table over a random network of stations, changes links one at a
+time and times next-hop lookups; sort centres ask for thousands of next hops
+per second.
+
+    PYTHONPATH=. python performance-tests/bench_station_routing.py
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from flasx.core.station_routing import RoutingTable
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stations", type=int, default=500)
+    parser.add_argument("--links", type=int, default=4)  # per station
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    links = {}
+    for from_id in range(1, args.stations + 1):
+        for to_id in rng.choice(args.stations, args.links, replace=False) + 1:
+            if to_id != from_id:
+                links[from_id, int(to_id)] = (float(rng.integers(30, 600)), 0.0)
+
+    started = time.perf_counter()
+    table = RoutingTable((*key, *value) for key, value in links.items())
+    print(f"build {len(links):,} links: {time.perf_counter() - started:.2f} s")
+
+    keys = list(links)
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        from_id, to_id = keys[rng.integers(len(keys))]
+        table.set_link(from_id, to_id, float(rng.integers(30, 600)))
+    elapsed = time.perf_counter() - started
+    print(f"link update: {elapsed / args.updates * 1000:.1f} ms")
+
+    pairs = rng.integers(1, args.stations + 1, (args.lookups, 2)).tolist()
+    started = time.perf_counter()
+    for from_id, to_id in pairs:
+        table.next_hop(from_id, to_id)
+    elapsed = time.perf_counter() - started
+    print(f"next hop: {elapsed / args.lookups * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
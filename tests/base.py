@@ -4,7 +4,15 @@ from httpx import AsyncClient
 from flasx.main import app
 from sqlmodel import SQLModel
 
-from flasx.models import get_session
+from flasx.models import (
+    DBUser,
+    get_session,
+    get_read_session,
+    get_read_session_factory,
+)
+from flasx.core import security
+from flasx.core.cache import MemoryCache, TrackingCache, get_tracking_cache
+from flasx.core.station_directory import reset_station_directory
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
@@ -43,13 +51,23 @@ async def session(engine):
 
 
 @pytest.fixture
-async def client(session):
+async def client(engine, session):
     """Create test client with dependency override."""
 
     async def get_session_override():
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+
+    tracking_cache = TrackingCache(MemoryCache(ttl=60, max_entries=1000))
+    app.dependency_overrides[get_tracking_cache] = lambda: tracking_cache
+
+    # the station directory of a previous test holds another database
+    reset_station_directory()
 
     transport = httpx.ASGITransport(app=app)
     async with AsyncClient(
@@ -58,3 +76,21 @@ async def client(session):
         yield client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def auth_headers(session):
+    """Bearer token header of a stored user."""
+    user = DBUser(
+        email="admin@email.local",
+        username="admin",
+        first_name="Admin",
+        last_name="User",
+        password="",
+    )
+    await user.set_password("password")
+    session.add(user)
+    await session.commit()
+
+    token = security.create_access_token(data={"sub": user.id})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture
+def create_station(client):
+    """Create stations through the API and return their ids."""
+
+    async def create(
+        code,
+        city="City",
+        state="State",
+        postal_code="90110",
+        latitude=None,
+        longitude=None,
+    ):
+        response = await client.post(
+            "/v1/stations",
+            json={
+                "name": f"Station {code}",
+                "code": code,
+                "address": "1 Road",
+                "city": city,
+                "state": state,
+                "postal_code": postal_code,
+                "latitude": latitude,
+                "longitude": longitude,
+            },
+        )
+        return response.json()["id"]
+
+    return create
+
+
+@pytest.fixture
+async def stations(create_station):
+    """BKK and HDY first, then a station in the state of HDY and one in the city of BKK."""
+    return [
+        await create_station(code, city, state)
+        for code, city, state in [
+            ("BKK", "Bangkok", "Bangkok"),
+            ("HDY", "Hat Yai", "Songkhla"),
+            ("SKA", "Songkhla", "Songkhla"),
+            ("DMK", "Bangkok", "Bangkok"),
+        ]
+    ]
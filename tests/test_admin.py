@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from base import session, engine, client, auth_headers
+
+from flasx import models
+from flasx.core import config
+from flasx.models import pool
+
+
+def test_engine_options_use_pool_settings():
+    settings = config.Settings(
+        SQLDB_POOL_SIZE=3,
+        SQLDB_MAX_OVERFLOW=4,
+        SQLDB_POOL_TIMEOUT=5.0,
+        SQLDB_POOL_RECYCLE=60,
+        SQLDB_POOL_PRE_PING=False,
+    )
+
+    options = models.get_engine_options(settings, "postgresql+asyncpg://db/flasx")
+    assert options["poolclass"] is pool.InstrumentedAsyncQueuePool
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 4
+    assert options["pool_timeout"] == 5.0
+    assert options["pool_recycle"] == 60
+    assert options["pool_pre_ping"] is False
+
+    # in-memory SQLite keeps its single connection
+    options = models.get_engine_options(settings, "sqlite+aiosqlite:///:memory:")
+    assert "poolclass" not in options
+
+
+@pytest.mark.asyncio
+async def test_admin_requires_authentication(client):
+    for path in ["/v1/admin/pool", "/v1/admin/cache", "/v1/admin/live"]:
+        response = await client.get(path)
+        assert response.status_code == 401
+
+    response = await client.get(
+        "/v1/admin/pool", headers={"Authorization": "Bearer not-a-token"}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_pool_stats(client, auth_headers, tmp_path, monkeypatch):
+    settings = config.Settings(SQLDB_POOL_SIZE=2, SQLDB_MAX_OVERFLOW=1)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    pool_engine = create_async_engine(url, **models.get_engine_options(settings, url))
+    monkeypatch.setattr(models, "engine", pool_engine)
+    monkeypatch.setattr(models, "read_engine", pool_engine)
+
+    async with pool_engine.connect():
+        response = await client.get("/v1/admin/pool", headers=auth_headers)
+    await pool_engine.dispose()
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["pool_class"] == "InstrumentedAsyncQueuePool"
+    assert stats["size"] == 2
+    assert stats["max_overflow"] == 1
+    assert stats["checked_out"] == 1
+    assert stats["checkouts"] == 1
@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+
+import pytest
+
+from flasx.core import cache
+from flasx.core import resp
+from flasx.schemas import parcel_schema
+
+
+def make_tracking(tracking_number: str) -> parcel_schema.ParcelTracking:
+    now = datetime.datetime.now()
+    return parcel_schema.ParcelTracking(
+        tracking_number=tracking_number,
+        status=parcel_schema.ParcelStatus.IN_TRANSIT,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used():
+    backend = cache.MemoryCache(ttl=60, max_entries=2)
+    await backend.set_many({"a": "1", "b": "2"})
+    await backend.get_many(["a"])
+    await backend.set_many({"c": "3"})
+
+    assert await backend.get_many(["a", "b", "c"]) == ["1", None, "3"]
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_expires_entries():
+    backend = cache.MemoryCache(ttl=0, max_entries=10)
+    await backend.set_many({"a": "1"})
+
+    assert await backend.get_many(["a"]) == [None]
+    assert backend.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_tracking_cache_counts_hits_and_misses():
+    tracking_cache = cache.TrackingCache(cache.MemoryCache(ttl=60, max_entries=10))
+    tracking = make_tracking("PKG20250101A1B2C3")
+
+    assert await tracking_cache.get(tracking.tracking_number) is None
+    await tracking_cache.set(tracking)
+    assert await tracking_cache.get(tracking.tracking_number) == tracking
+    await tracking_cache.invalidate(tracking.tracking_number)
+    assert await tracking_cache.get(tracking.tracking_number) is None
+
+    stats = tracking_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+
+
+async def serve_resp(reader, writer, store):
+    """Answer the few commands the cache sends, like a Redis server."""
+    while True:
+        try:
+            command = await resp.read_reply(reader)
+        except ConnectionError:
+            break
+
+        name, *args = command
+        name = name.decode().upper()
+        if name == "MGET":
+            writer.write(b"*%d\r\n" % len(args))
+            for key in args:
+                value = store.get(key)
+                if value is None:
+                    writer.write(b"$-1\r\n")
+                else:
+                    writer.write(b"$%d\r\n%s\r\n" % (len(value), value))
+        elif name == "SET":
+            store[args[0]] = args[1]
+            writer.write(b"+OK\r\n")
+        elif name == "DEL":
+            deleted = sum(store.pop(key, None) is not None for key in args)
+            writer.write(b":%d\r\n" % deleted)
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_over_resp():
+    store = {}
+    server = await asyncio.start_server(
+        lambda r, w: serve_resp(r, w, store), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+
+    tracking_cache = cache.TrackingCache(
+        cache.RedisCache(f"redis://127.0.0.1:{port}/0", ttl=60)
+    )
+    tracking = make_tracking("PKG20250101A1B2C3")
+    try:
+        await tracking_cache.set(tracking)
+        assert await tracking_cache.get(tracking.tracking_number) == tracking
+
+        await tracking_cache.invalidate(tracking.tracking_number)
+        assert await tracking_cache.get(tracking.tracking_number) is None
+        assert store == {}
+    finally:
+        await tracking_cache.close()
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_is_a_miss():
+    tracking_cache = cache.TrackingCache(
+        cache.RedisCache("redis://127.0.0.1:1/0", ttl=60)
+    )
+
+    assert await tracking_cache.get("PKG20250101A1B2C3") is None
+    assert tracking_cache.stats()["errors"] == 1
@@ -123,3 +123,123 @@ async def test_create_customer_duplicate_email(client, customer_data):
     response = await client.post("/v1/customers", json=customer_data)
     assert response.status_code == 400
     assert "Email already registered" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_update_customer_duplicate_email(client, customer_data):
+    await client.post("/v1/customers", json=customer_data)
+    other = {**customer_data, "email": "other@example.com"}
+    create_resp = await client.post("/v1/customers", json=other)
+    customer_id = create_resp.json()["id"]
+
+    response = await client.put(f"/v1/customers/{customer_id}", json=customer_data)
+    assert response.status_code == 400
+    assert "Email already registered" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_missing_customer(client, customer_data):
+    response = await client.put("/v1/customers/999", json=customer_data)
+    assert response.status_code == 404
+
+    response = await client.patch("/v1/customers/999/activate")
+    assert response.status_code == 404
+
+    response = await client.delete("/v1/customers/999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_customers_cursor_pagination(client):
+    for i in range(5):
+        await client.post(
+            "/v1/customers",
+            json={"name": f"Customer {i}", "email": f"c{i}@example.com", "phone": "0"},
+        )
+
+    response = await client.get("/v1/customers", params={"limit": 2})
+    assert response.status_code == 200
+    ids = [customer["id"] for customer in response.json()]
+
+    while cursor := response.headers.get("X-Next-Cursor"):
+        response = await client.get(
+            "/v1/customers", params={"limit": 2, "cursor": cursor}
+        )
+        assert response.status_code == 200
+        ids += [customer["id"] for customer in response.json()]
+
+    assert ids == sorted(ids)
+    assert len(ids) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_customers_cursor_by_created_at(client):
+    for i in range(3):
+        await client.post(
+            "/v1/customers",
+            json={"name": f"Customer {i}", "email": f"c{i}@example.com", "phone": "0"},
+        )
+
+    params = {"limit": 2, "sort": "created_at"}
+    response = await client.get("/v1/customers", params=params)
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get("/v1/customers", params={**params, "cursor": cursor})
+    assert [customer["name"] for customer in response.json()] == ["Customer 2"]
+    assert "X-Next-Cursor" not in response.headers
+
+    # a cursor only fits the sort order it was made for
+    response = await client.get("/v1/customers", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+async def searchable_customers(client):
+    ids = {}
+    for name, email in [
+        ("Alice Smith", "alice@example.com"),
+        ("Bob Malice", "bob@example.com"),
+        ("Carol Ali", "carol@alicorp.io"),
+        ("Dave", "dave@example.com"),
+    ]:
+        response = await client.post(
+            "/v1/customers", json={"name": name, "email": email, "phone": "1"}
+        )
+        ids[name] = response.json()["id"]
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_search_customers(client, searchable_customers):
+    ids = searchable_customers
+
+    response = await client.get("/v1/customers/search?q=ALIC")
+    assert response.status_code == 200
+    found = [customer["id"] for customer in response.json()]
+    assert set(found) == {ids["Alice Smith"], ids["Bob Malice"], ids["Carol Ali"]}
+
+    response = await client.get("/v1/customers?search=malic")
+    assert [customer["id"] for customer in response.json()] == [ids["Bob Malice"]]
+
+    # kept in sync on writes
+    await client.put(f"/v1/customers/{ids['Dave']}", json={"name": "Dave Alicante"})
+    await client.delete(f"/v1/customers/{ids['Bob Malice']}")
+    response = await client.get("/v1/customers/search?q=alic")
+    found = {customer["id"] for customer in response.json()}
+    assert found == {ids["Alice Smith"], ids["Carol Ali"], ids["Dave"]}
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_customers(client, searchable_customers):
+    ids = searchable_customers
+    await client.patch(f"/v1/customers/{ids['Carol Ali']}/deactivate")
+
+    response = await client.get("/v1/customers/autocomplete?q=al")
+    assert response.status_code == 200
+    suggestions = response.json()
+    assert suggestions[0] == {
+        "id": ids["Alice Smith"],
+        "name": "Alice Smith",
+        "email": "alice@example.com",
+    }
+    assert [s["id"] for s in suggestions] == [ids["Alice Smith"], ids["Bob Malice"]]
@@ -0,0 +1,233 @@
+import numpy as np
+import pytest
+from sqlmodel import update
+
+from base import session, engine, client
+from test_parcel import customers, parcel_data
+
+from flasx.core import load_planner
+from flasx.core.staff_assignment import assign_least_loaded
+from flasx.models import Parcel
+from flasx.routers.v1 import dispatch_router
+
+
+def test_plan_loads_respects_capacities():
+    rng = np.random.default_rng(3)
+    weights = rng.uniform(1, 40, 500)
+    volumes = rng.uniform(0.01, 0.5, 500)
+    weight_left = np.array([500.0, 800.0, 300.0])
+    volume_left = np.array([5.0, np.inf, 2.0])
+
+    assignment = load_planner.plan_loads(weights, volumes, weight_left, volume_left)
+
+    for vehicle in range(3):
+        mask = assignment == vehicle
+        assert weights[mask].sum() <= weight_left[vehicle]
+        assert volumes[mask].sum() <= volume_left[vehicle]
+    assert (assignment == load_planner.UNASSIGNED).any()
+
+
+async def create_vehicle(client, plate, station_id, capacity, volume_capacity=None):
+    response = await client.post(
+        "/v1/vehicles",
+        json={
+            "license_plate": plate,
+            "type": "truck",
+            "capacity": capacity,
+            "volume_capacity": volume_capacity,
+            "station_id": station_id,
+        },
+    )
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_plan_vehicle_loads(client, parcel_data, stations, monkeypatch):
+    parcel_data = {**parcel_data, "weight": 10.0}
+    parcel_ids = [
+        (await client.post("/v1/parcels", json=parcel_data)).json()["id"]
+        for _ in range(5)
+    ]
+    small = await create_vehicle(client, "AA-1", stations[0], capacity=25)
+    large = await create_vehicle(client, "AA-2", stations[0], capacity=20)
+
+    response = await client.post(
+        "/v1/dispatch/load-plan", json={"station_id": stations[0], "dry_run": True}
+    )
+    plan = response.json()
+    assert plan["assigned"] == 4
+    assert plan["applied"] is False
+    assert len(plan["unassigned_parcel_ids"]) == 1
+
+    response = await client.post(
+        "/v1/dispatch/load-plan", json={"station_id": stations[0]}
+    )
+    plan = response.json()
+    assert plan["applied"] is True
+    loads = {vehicle["vehicle_id"]: vehicle for vehicle in plan["vehicles"]}
+    assert loads[small]["weight"] == 20.0
+    assert loads[large]["weight"] == 20.0
+
+    parcel = (await client.get(f"/v1/parcels/{loads[small]['parcel_ids'][0]}")).json()
+    assert parcel["vehicle_id"] == small
+
+    # explicit ids skip the parcels already loaded
+    monkeypatch.setattr(dispatch_router, "IN_CHUNK_SIZE", 2)
+    response = await client.post(
+        "/v1/dispatch/load-plan",
+        json={"station_id": stations[0], "parcel_ids": parcel_ids},
+    )
+    plan = response.json()
+    assert plan["assigned"] == 0
+    assert plan["unassigned_parcel_ids"] == [
+        parcel_id
+        for parcel_id in parcel_ids
+        if all(parcel_id not in v["parcel_ids"] for v in loads.values())
+    ]
+    assert {v["vehicle_id"]: v["weight"] for v in plan["vehicles"]} == {
+        small: 20.0,
+        large: 20.0,
+    }
+
+    # the vehicles are full now
+    response = await client.patch(
+        f"/v1/parcels/{plan['unassigned_parcel_ids'][0]}/assign-vehicle",
+        params={"vehicle_id": large},
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_plan_skips_parcels_loaded_meanwhile(
+    client, parcel_data, stations, monkeypatch
+):
+    parcel_ids = [
+        (await client.post("/v1/parcels", json=parcel_data)).json()["id"]
+        for _ in range(3)
+    ]
+    vehicle = await create_vehicle(client, "AA-1", stations[0], capacity=100)
+    other = await create_vehicle(client, "AA-2", stations[1], capacity=100)
+    select_parcels = dispatch_router.select_parcels
+
+    async def select_then_load_one(session, query, ids):
+        # a concurrent plan loads a parcel after this one read it
+        parcels = await select_parcels(session, query, ids)
+        await session.exec(
+            update(Parcel).where(Parcel.id == parcel_ids[0]).values(vehicle_id=other)
+        )
+        return parcels
+
+    monkeypatch.setattr(dispatch_router, "select_parcels", select_then_load_one)
+    response = await client.post(
+        "/v1/dispatch/load-plan", json={"station_id": stations[0]}
+    )
+    plan = response.json()
+    assert plan["assigned"] == 2
+    assert plan["unassigned_parcel_ids"] == [parcel_ids[0]]
+    assert plan["vehicles"][0]["parcel_ids"] == parcel_ids[1:]
+
+    parcel = (await client.get(f"/v1/parcels/{parcel_ids[0]}")).json()
+    assert parcel["vehicle_id"] == other
+
+
+def test_assign_least_loaded():
+    assert assign_least_loaded([1.0] * 5, [0, 2, 0]) == [0, 2, 0, 2, 1]
+
+    weights = [10.0, 1.0, 1.0, 8.0, 2.0]
+    assignment = assign_least_loaded(weights, [0.0, 0.0], weighted=True)
+    loads = [0.0, 0.0]
+    for weight, index in zip(weights, assignment):
+        loads[index] += weight
+    assert loads == [11.0, 11.0]
+
+
+@pytest.mark.asyncio
+async def test_assign_delivery_staff(client, parcel_data, monkeypatch):
+    staff_ids = []
+    for number in range(3):
+        response = await client.post(
+            "/v1/delivery-staff",
+            json={
+                "name": f"Courier {number}",
+                "email": f"courier{number}@example.com",
+                "phone": "0",
+                "employee_id": f"E{number}",
+            },
+        )
+        staff_ids.append(response.json()["id"])
+
+    parcel_ids = []
+    for _ in range(7):
+        parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+        await client.patch(
+            f"/v1/parcels/{parcel['id']}/status", params={"status": "out_for_delivery"}
+        )
+        parcel_ids.append(parcel["id"])
+
+    response = await client.post("/v1/dispatch/assign-staff", json={})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["assigned"] == 7
+    assert sorted(w["parcels"] for w in result["workloads"]) == [2, 2, 3]
+
+    response = await client.get("/v1/dispatch/workloads")
+    assert {w["delivery_staff_id"]: w["parcels"] for w in response.json()} == {
+        w["delivery_staff_id"]: w["parcels"] for w in result["workloads"]
+    }
+
+    # explicit ids skip the parcels already assigned
+    monkeypatch.setattr(dispatch_router, "IN_CHUNK_SIZE", 2)
+    response = await client.post(
+        "/v1/dispatch/assign-staff", json={"parcel_ids": parcel_ids}
+    )
+    assert response.json()["assigned"] == 0
+    assert response.json()["workloads"] == result["workloads"]
+
+
+@pytest.mark.asyncio
+async def test_assign_skips_parcels_assigned_meanwhile(
+    client, parcel_data, monkeypatch
+):
+    staff_ids = []
+    for number in range(2):
+        response = await client.post(
+            "/v1/delivery-staff",
+            json={
+                "name": f"Courier {number}",
+                "email": f"courier{number}@example.com",
+                "phone": "0",
+                "employee_id": f"E{number}",
+            },
+        )
+        staff_ids.append(response.json()["id"])
+
+    parcel_ids = []
+    for _ in range(3):
+        parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+        await client.patch(
+            f"/v1/parcels/{parcel['id']}/status", params={"status": "out_for_delivery"}
+        )
+        parcel_ids.append(parcel["id"])
+    select_parcels = dispatch_router.select_parcels
+
+    async def select_then_assign_one(session, query, ids):
+        # a concurrent run assigns a parcel after this one read it
+        parcels = await select_parcels(session, query, ids)
+        await session.exec(
+            update(Parcel)
+            .where(Parcel.id == parcel_ids[0])
+            .values(delivery_staff_id=staff_ids[1])
+        )
+        return parcels
+
+    monkeypatch.setattr(dispatch_router, "select_parcels", select_then_assign_one)
+    response = await client.post(
+        "/v1/dispatch/assign-staff", json={"staff_ids": [staff_ids[0]]}
+    )
+    result = response.json()
+    assert result["assigned"] == 2
+    assert result["unassigned_parcel_ids"] == [parcel_ids[0]]
+    assert result["workloads"][0]["parcels"] == 2
+
+    parcel = (await client.get(f"/v1/parcels/{parcel_ids[0]}")).json()
+    assert parcel["delivery_staff_id"] == staff_ids[1]
@@ -0,0 +1,149 @@
+import csv
+import datetime
+import gzip
+import io
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from base import session, engine, client
+
+from flasx.core import export_jobs
+from flasx.core.export_jobs import ExportWorkers, get_export_workers
+from flasx.main import app
+from flasx.models import ExportJob
+
+
+@pytest.fixture
+async def workers(engine, client, tmp_path):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    workers = ExportWorkers(session_factory, str(tmp_path), workers=1)
+    await workers.start()
+    app.dependency_overrides[get_export_workers] = lambda: workers
+    yield workers
+    await workers.close()
+
+
+@pytest.mark.asyncio
+async def test_export_customers_csv(client, workers):
+    for name in ["Alice", "Bob", "Carol"]:
+        await client.post(
+            "/v1/customers",
+            json={"name": name, "email": f"{name.lower()}@example.com", "phone": "0"},
+        )
+
+    response = await client.post(
+        "/v1/exports", json={"entity": "customers", "filters": {"is_active": True}}
+    )
+    assert response.status_code == 201
+    export_id = response.json()["id"]
+
+    await workers.queue.join()
+    response = await client.get(f"/v1/exports/{export_id}")
+    job = response.json()
+    assert job["status"] == "completed", job["error"]
+    assert job["total_rows"] == job["rows_written"] == 3
+    assert job["progress"] == 1.0
+
+    response = await client.get(f"/v1/exports/{export_id}/download")
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert [row["name"] for row in rows] == ["Alice", "Bob", "Carol"]
+
+
+@pytest.mark.asyncio
+async def test_export_parcels_parquet(client, workers):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+    customers = []
+    for name in ["Sender", "Receiver"]:
+        response = await client.post(
+            "/v1/customers",
+            json={"name": name, "email": f"{name.lower()}@example.com", "phone": "0"},
+        )
+        customers.append(response.json()["id"])
+    for price in ["45.00", "12.50"]:
+        await client.post(
+            "/v1/parcels",
+            json={
+                "tracking_number": "",
+                "weight": 1.5,
+                "length": 20,
+                "width": 10,
+                "height": 5,
+                "service_price": price,
+                "sender_id": customers[0],
+                "receiver_id": customers[1],
+            },
+        )
+
+    response = await client.post(
+        "/v1/exports", json={"entity": "parcels", "format": "parquet"}
+    )
+    export_id = response.json()["id"]
+
+    await workers.queue.join()
+    job = (await client.get(f"/v1/exports/{export_id}")).json()
+    assert job["status"] == "completed", job["error"]
+
+    response = await client.get(f"/v1/exports/{export_id}/download")
+    table = pyarrow_parquet.read_table(io.BytesIO(response.content))
+    assert [str(price) for price in table.column("service_price").to_pylist()] == [
+        "45.000000000",
+        "12.500000000",
+    ]
+    assert table.column("status").to_pylist() == ["created", "created"]
+
+
+@pytest.mark.asyncio
+async def test_claim_export_job(client, engine, session, tmp_path):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    first = ExportWorkers(session_factory, str(tmp_path), workers=1)
+    second = ExportWorkers(session_factory, str(tmp_path), workers=1)
+
+    response = await client.post("/v1/exports", json={"entity": "stations"})
+    export_id = response.json()["id"]
+
+    assert (await first.claim(export_id)).entity == "stations"
+    assert await second.claim(export_id) is None
+
+    # a running job without progress for too long is taken over
+    job = await session.get(ExportJob, export_id)
+    job.heartbeat_at = datetime.datetime.now() - datetime.timedelta(hours=1)
+    await session.commit()
+    assert await second.claim(export_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_download_pending_export(client):
+    response = await client.post("/v1/exports", json={"entity": "stations"})
+    export_id = response.json()["id"]
+    assert response.json()["status"] == "pending"
+
+    response = await client.get(f"/v1/exports/{export_id}/download")
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_export_invalid_filters(client):
+    response = await client.post(
+        "/v1/exports", json={"entity": "parcels", "filters": {"weight": 1}}
+    )
+    assert response.status_code == 400
+
+    response = await client.post(
+        "/v1/exports", json={"entity": "parcels", "filters": {"status": "lost"}}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_parquet_requires_pyarrow(client):
+    response = await client.post(
+        "/v1/exports", json={"entity": "stations", "format": "parquet"}
+    )
+    if export_jobs.has_parquet():
+        assert response.status_code == 201
+    else:
+        assert response.status_code == 400
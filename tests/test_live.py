@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from base import session, engine, client
+from test_parcel import customers, parcel_data
+
+from flasx.core import resp
+from flasx.core.live import LiveHub, RedisBroker, get_live_hub
+from flasx.main import app
+
+
+@pytest.fixture
+def hub():
+    hub = LiveHub(buffer=2)
+    app.dependency_overrides[get_live_hub] = lambda: hub
+    yield hub
+    app.dependency_overrides.pop(get_live_hub, None)
+
+
+@pytest.mark.asyncio
+async def test_status_change_is_published(client, parcel_data, stations, hub):
+    parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    with (
+        hub.subscribe(f"parcel:{parcel['tracking_number']}") as by_parcel,
+        hub.subscribe(f"station:{parcel['destination_station_id']}") as by_station,
+    ):
+        await client.patch(
+            f"/v1/parcels/{parcel['id']}/status", params={"status": "in_transit"}
+        )
+
+        message = json.loads(await by_parcel.get())
+        assert message["status"] == "in_transit"
+        assert message["tracking_number"] == parcel["tracking_number"]
+        assert json.loads(await by_station.get()) == message
+
+    assert hub.stats()["subscriptions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest(hub):
+    with hub.subscribe("station:1") as subscription:
+        for index in range(3):
+            await hub.publish("station:1", {"index": index})
+
+        assert subscription.dropped == 1
+        assert json.loads(await subscription.get()) == {"index": 1}
+        assert json.loads(await subscription.get()) == {"index": 2}
+
+
+def test_websocket_station_feed(hub):
+    test_client = TestClient(app)
+    with test_client.websocket_connect("/v1/live/stations/7/ws") as websocket:
+        while not hub.subscriptions:
+            websocket.portal.call(asyncio.sleep, 0.01)
+        websocket.portal.call(hub.publish, "station:7", {"status": "delivered"})
+        assert json.loads(websocket.receive_text()) == {"status": "delivered"}
+
+
+@pytest.mark.asyncio
+async def test_redis_broker_pipelines_a_batch():
+    commands = []
+
+    async def serve(reader, writer):
+        while True:
+            try:
+                command = await resp.read_reply(reader)
+            except ConnectionError:
+                break
+            commands.append(command)
+            writer.write(b":1\r\n")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    broker = RedisBroker(f"redis://127.0.0.1:{port}/0")
+    try:
+        await broker.publish_many(
+            [(f"parcel:{index}", str(index)) for index in range(500)]
+        )
+    finally:
+        await broker.close()
+        server.close()
+        await server.wait_closed()
+
+    assert len(commands) == 500
+    assert commands[-1] == [b"PUBLISH", b"flasx:live:parcel:499", b"499"]
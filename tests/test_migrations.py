@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from flasx import migrations
+
+
+@pytest.fixture
+async def empty_engine():
+    """Create an engine on an empty database."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_upgrade_to_head(empty_engine):
+    assert await migrations.get_current_version(empty_engine) == 0
+
+    applied = await migrations.upgrade(empty_engine)
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert await migrations.get_current_version(empty_engine) == (
+        migrations.head_version()
+    )
+
+    async with empty_engine.connect() as conn:
+        tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+    assert "parcel" in tables
+    assert migrations.SCHEMA_VERSION_TABLE in tables
+
+
+@pytest.mark.asyncio
+async def test_version_lookup_errors_are_raised(empty_engine):
+    async with empty_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE schema_version (id INTEGER)"))
+
+    # the table is there, the database is not taken for an unmigrated one
+    with pytest.raises(OperationalError):
+        await migrations.get_current_version(empty_engine)
+
+
+@pytest.mark.asyncio
+async def test_upgrade_is_noop_at_head(empty_engine):
+    await migrations.upgrade(empty_engine)
+
+    assert await migrations.upgrade(empty_engine) == []
+    history = await migrations.get_history(empty_engine)
+    assert [row["version"] for row in history] == [
+        m.version for m in migrations.MIGRATIONS
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upgrade_to_target(empty_engine):
+    await migrations.upgrade(empty_engine, target=0)
+    assert await migrations.get_current_version(empty_engine) == 0
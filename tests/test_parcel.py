@@ -0,0 +1,360 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from base import session, engine, client, auth_headers
+
+from flasx.core import export
+from flasx.core import station_stats
+from flasx.models import Parcel, ParcelEvent
+
+
+@pytest.fixture
+async def customers(client):
+    ids = []
+    for name in ["Sender", "Receiver"]:
+        response = await client.post(
+            "/v1/customers",
+            json={"name": name, "email": f"{name.lower()}@example.com", "phone": "0"},
+        )
+        ids.append(response.json()["id"])
+    return ids
+
+
+@pytest.fixture
+def parcel_data(customers, stations):
+    sender_id, receiver_id = customers
+    origin_station_id, destination_station_id = stations[:2]
+    return {
+        "tracking_number": "",
+        "weight": 1.5,
+        "length": 20,
+        "width": 10,
+        "height": 5,
+        "service_price": "45.00",
+        "sender_id": sender_id,
+        "receiver_id": receiver_id,
+        "origin_station_id": origin_station_id,
+        "destination_station_id": destination_station_id,
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_parcel(client, parcel_data):
+    response = await client.post("/v1/parcels", json=parcel_data)
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["tracking_number"].startswith("PKG")
+    assert data["status"] == "created"
+
+
+@pytest.mark.asyncio
+async def test_create_parcels_bulk(client, parcel_data):
+    items = [dict(parcel_data, tracking_number=None) for _ in range(3)]
+    items[1]["receiver_id"] = 999
+
+    response = await client.post("/v1/parcels/bulk", json={"parcels": items})
+
+    assert response.status_code == 201
+    data = response.json()
+    assert [item["index"] for item in data["created"]] == [0, 2]
+    assert data["errors"] == [{"index": 1, "detail": "Receiver not found"}]
+
+    tracking_numbers = {item["tracking_number"] for item in data["created"]}
+    assert len(tracking_numbers) == 2
+
+    for item in data["created"]:
+        response = await client.get(f"/v1/parcels/{item['id']}")
+        assert response.json()["tracking_number"] == item["tracking_number"]
+
+
+@pytest.mark.asyncio
+async def test_track_parcel(client, parcel_data):
+    create_resp = await client.post("/v1/parcels", json=parcel_data)
+    tracking_number = create_resp.json()["tracking_number"]
+
+    response = await client.get(f"/v1/parcels/track/{tracking_number}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["origin_station_name"] == "Station BKK"
+    assert data["destination_station_name"] == "Station HDY"
+
+
+@pytest.mark.asyncio
+async def test_track_parcel_malformed_number(client):
+    response = await client.get("/v1/parcels/track/NOT-A-NUMBER")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_track_parcel_cache_invalidated_by_status_update(
+    client, parcel_data, auth_headers
+):
+    create_resp = await client.post("/v1/parcels", json=parcel_data)
+    parcel = create_resp.json()
+    track_url = f"/v1/parcels/track/{parcel['tracking_number']}"
+
+    await client.get(track_url)
+    response = await client.get(track_url)
+    assert response.json()["status"] == "created"
+
+    await client.patch(
+        f"/v1/parcels/{parcel['id']}/status", params={"status": "in_transit"}
+    )
+    response = await client.get(track_url)
+    assert response.json()["status"] == "in_transit"
+
+    stats = (await client.get("/v1/admin/cache", headers=auth_headers)).json()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_track_parcel_cache_invalidated_by_station_rename(
+    client, parcel_data, stations
+):
+    create_resp = await client.post("/v1/parcels", json=parcel_data)
+    track_url = f"/v1/parcels/track/{create_resp.json()['tracking_number']}"
+    await client.get(track_url)
+
+    await client.put(f"/v1/stations/{stations[1]}", json={"name": "Hat Yai Hub"})
+    response = await client.get(track_url)
+    assert response.json()["destination_station_name"] == "Hat Yai Hub"
+
+
+@pytest.mark.asyncio
+async def test_track_parcels_batch(client, parcel_data):
+    tracking_numbers = []
+    for _ in range(3):
+        create_resp = await client.post("/v1/parcels", json=parcel_data)
+        tracking_numbers.append(create_resp.json()["tracking_number"])
+
+    # one of them is already cached
+    await client.get(f"/v1/parcels/track/{tracking_numbers[1]}")
+
+    unknown = "PKG20250101A1B2C3"
+    response = await client.post(
+        "/v1/parcels/track/batch",
+        json={"tracking_numbers": tracking_numbers + [unknown, "bad"]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["tracking_number"] for p in data["parcels"]] == tracking_numbers
+    assert data["parcels"][0]["destination_station_name"] == "Station HDY"
+    assert data["not_found"] == [unknown]
+    assert data["malformed"] == ["bad"]
+
+
+@pytest.mark.asyncio
+async def test_parcel_timeline(client, parcel_data, stations):
+    create_resp = await client.post("/v1/parcels", json=parcel_data)
+    parcel = create_resp.json()
+
+    await client.patch(
+        f"/v1/parcels/{parcel['id']}/status",
+        params={"status": "in_transit", "station_id": stations[1]},
+    )
+
+    response = await client.get(
+        f"/v1/parcels/track/{parcel['tracking_number']}/timeline"
+    )
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert [event["status"] for event in events] == ["created", "in_transit"]
+    assert events[1]["station_name"] == "Station HDY"
+
+    response = await client.patch(
+        f"/v1/parcels/{parcel['id']}/status",
+        params={"status": "delivered", "station_id": 999999},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_parcel_status_bulk(client, parcel_data, stations):
+    first = (await client.post("/v1/parcels", json=parcel_data)).json()
+    second = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    response = await client.post(
+        "/v1/parcels/status/bulk",
+        json={
+            "tracking_numbers": [first["tracking_number"], "bad"],
+            "ids": [second["id"], 999999],
+            "status": "at_destination",
+            "station_id": stations[1],
+        },
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert {item["id"] for item in result["updated"]} == {first["id"], second["id"]}
+    assert result["not_found_ids"] == [999999]
+    assert result["malformed"] == ["bad"]
+
+    response = await client.get(f"/v1/parcels/{second['id']}")
+    assert response.json()["status"] == "at_destination"
+
+    response = await client.get(
+        f"/v1/parcels/track/{first['tracking_number']}/timeline"
+    )
+    assert response.json()["events"][-1]["station_name"] == "Station HDY"
+
+
+@pytest.mark.asyncio
+async def test_update_parcel_status_bulk_requires_parcels(client):
+    response = await client.post(
+        "/v1/parcels/status/bulk", json={"status": "at_destination"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_parcels(client, parcel_data):
+    for _ in range(3):
+        await client.post("/v1/parcels", json=parcel_data)
+    await client.patch("/v1/parcels/1/status", params={"status": "in_transit"})
+
+    response = await client.get(
+        "/v1/parcels/export",
+        params={"status": "created"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [2, 3]
+    assert rows[0]["status"] == "created"
+
+    response = await client.get("/v1/parcels/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert "tracking_number" in lines[0].split(",")
+    assert len(lines) == 4
+
+    response = await client.get(
+        "/v1/parcels/export", headers={"Accept-Encoding": "gzip;q=0, identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_accepts_gzip():
+    assert export.accepts_gzip("gzip, deflate")
+    assert export.accepts_gzip("deflate, gzip;q=0.5")
+    assert export.accepts_gzip("*")
+    assert not export.accepts_gzip("gzip;q=0")
+    assert not export.accepts_gzip("gzip;q=0.0, *;q=1")
+    assert not export.accepts_gzip("identity, *;q=0")
+    assert not export.accepts_gzip("")
+
+
+@pytest.mark.asyncio
+async def test_station_stats(client, session, parcel_data, stations):
+    first = (await client.post("/v1/parcels", json=parcel_data)).json()
+    second = (await client.post("/v1/parcels", json=parcel_data)).json()
+    third = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    await client.patch(
+        f"/v1/parcels/{first['id']}/status", params={"status": "in_transit"}
+    )
+    await client.post(
+        "/v1/parcels/status/bulk",
+        json={"ids": [second["id"]], "status": "delivered"},
+    )
+    await client.delete(f"/v1/parcels/{third['id']}")
+
+    response = await client.get("/v1/stats/stations", params={"direction": "origin"})
+    assert response.json() == [
+        {
+            "station_id": stations[0],
+            "direction": "origin",
+            "counts": {"in_transit": 1, "delivered": 1},
+            "total": 2,
+        }
+    ]
+
+    response = await client.get(
+        "/v1/stats/stations", params={"direction": "destination"}
+    )
+    destination_counts = response.json()
+    assert destination_counts[0]["station_id"] == stations[1]
+
+    # a rebuild from the parcel table finds the incrementally kept counts
+    for statement in station_stats.rebuild_statements("sqlite"):
+        await session.exec(statement)
+    await session.commit()
+    response = await client.get(
+        "/v1/stats/stations", params={"direction": "destination"}
+    )
+    assert response.json() == destination_counts
+
+
+@pytest.mark.asyncio
+async def test_station_stats_lock_parcels():
+    statements = []
+
+    class PostgresSession:
+        bind = SimpleNamespace(dialect=postgresql.dialect())
+
+        async def exec(self, statement):
+            statements.append(statement)
+
+    await station_stats.lock_parcels(PostgresSession(), Parcel.id.in_([2, 1]))
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.endswith("ORDER BY parcel.id FOR UPDATE")
+
+
+@pytest.mark.asyncio
+async def test_delete_referenced_rows(
+    client, session, parcel_data, customers, stations
+):
+    vehicle = await client.post(
+        "/v1/vehicles",
+        json={"license_plate": "1AB 234", "type": "van", "capacity": 500},
+    )
+    staff = await client.post(
+        "/v1/delivery-staff",
+        json={
+            "name": "Courier",
+            "email": "courier@example.com",
+            "phone": "0",
+            "employee_id": "E1",
+        },
+    )
+    parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+    await client.patch(
+        f"/v1/parcels/{parcel['id']}/assign-vehicle",
+        params={"vehicle_id": vehicle.json()["id"]},
+    )
+    await client.patch(
+        f"/v1/parcels/{parcel['id']}/assign-delivery-staff",
+        params={"delivery_staff_id": staff.json()["id"]},
+    )
+
+    response = await client.delete(f"/v1/vehicles/{vehicle.json()['id']}")
+    assert response.status_code == 204
+    response = await client.delete(f"/v1/delivery-staff/{staff.json()['id']}")
+    assert response.status_code == 204
+    response = await client.delete(f"/v1/stations/{stations[0]}")
+    assert response.status_code == 204
+
+    data = (await client.get(f"/v1/parcels/{parcel['id']}")).json()
+    assert data["vehicle_id"] is None
+    assert data["delivery_staff_id"] is None
+    assert data["origin_station_id"] is None
+    assert data["destination_station_id"] == stations[1]
+    result = await session.exec(
+        select(ParcelEvent.station_id).where(ParcelEvent.parcel_id == parcel["id"])
+    )
+    assert result.all() == [None]
+    response = await client.get("/v1/stats/stations", params={"direction": "origin"})
+    assert response.json() == []
+
+    response = await client.delete(f"/v1/customers/{customers[0]}")
+    assert response.status_code == 409
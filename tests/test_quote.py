@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from base import session, engine, client
+
+from flasx.core.pricing import QuoteEngine, RateCard
+
+
+def test_batch_matches_scalar_quotes():
+    quote_engine = QuoteEngine(RateCard())
+    rng = np.random.default_rng(7)
+    size = 2000
+    weight = rng.uniform(0.1, 60, size)
+    length, width, height = rng.uniform(1, 150, (3, size))
+    zone = rng.integers(0, 3, size)
+
+    batch = quote_engine.quote_batch(weight, length, width, height, zone)
+    for i in range(size):
+        quote = quote_engine.quote(
+            weight[i], length[i], width[i], height[i], int(zone[i])
+        )
+        assert quote["price"] == batch["price"][i]
+        assert quote["chargeable_weight"] == batch["chargeable_weight"][i]
+
+
+@pytest.mark.asyncio
+async def test_quote(client, stations):
+    response = await client.post(
+        "/v1/quotes",
+        json={
+            "weight": 2.2,
+            "length": 30,
+            "width": 20,
+            "height": 10,
+            "origin_station_id": stations[1],
+            "destination_station_id": stations[2],
+        },
+    )
+    assert response.status_code == 200
+    quote = response.json()
+    assert quote["zone"] == "same_state"
+    assert quote["chargeable_weight"] == 2.5
+    assert quote["price"] == 57.75  # 55 in the 3 kg bracket, 5% fuel
+
+
+@pytest.mark.asyncio
+async def test_quote_batch(client, stations):
+    parcel = {"weight": 1, "length": 10, "width": 10, "height": 10}
+    response = await client.post(
+        "/v1/quotes/batch",
+        json={
+            "parcels": [
+                {
+                    **parcel,
+                    "origin_station_id": stations[0],
+                    "destination_station_id": stations[3],
+                },
+                {
+                    **parcel,
+                    "origin_station_id": stations[0],
+                    "destination_station_id": stations[1],
+                },
+                {**parcel, "origin_station_id": 999},
+                {**parcel, "weight": 45, "length": 130},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [quote["zone"] for quote in result["quotes"]] == [
+        "same_city",
+        "national",
+        "national",
+    ]
+    assert [quote["index"] for quote in result["quotes"]] == [0, 1, 3]
+    assert result["errors"] == [{"index": 2, "detail": "Origin station not found"}]
+
+    # (240 + 15 kg at 10 above 30 kg + oversize 50 + heavy 80) with 5% fuel
+    assert result["quotes"][2]["price"] == 546.0
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import Request
+
+from base import engine
+
+from flasx import models
+from flasx.models import routing
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(routing.time, "monotonic", clock)
+    return clock
+
+
+def make_request(method: str, client_id: str | None = None) -> Request:
+    headers = [(b"x-client-id", client_id.encode())] if client_id else []
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": "/",
+            "headers": headers,
+            "client": ("10.0.0.1", 5000),
+        }
+    )
+
+
+def test_recent_writes_expire(clock):
+    recent_writes = routing.RecentWrites(window=5, max_clients=2)
+    recent_writes.mark("a")
+    assert recent_writes.is_recent("a")
+    assert not recent_writes.is_recent("b")
+
+    clock.now += 5
+    assert not recent_writes.is_recent("a")
+
+    # the oldest clients are forgotten beyond max_clients
+    for client in ["a", "b", "c"]:
+        recent_writes.mark(client)
+    assert not recent_writes.is_recent("a")
+    assert recent_writes.is_recent("b") and recent_writes.is_recent("c")
+
+
+def test_client_key():
+    assert routing.get_client_key(make_request("GET", "scanner-1")) == "scanner-1"
+    assert routing.get_client_key(make_request("GET")) == "10.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_reads_stay_on_primary_after_write(engine, clock, monkeypatch):
+    primary = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    replica = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(models, "async_session", primary)
+    monkeypatch.setattr(models, "read_async_session", replica)
+    monkeypatch.setattr(models, "recent_writes", routing.RecentWrites(window=5))
+
+    assert models.get_read_session_factory(make_request("GET", "a")) is replica
+
+    # a write marks the client, at the start and at the end of its session
+    sessions = models.get_session(make_request("POST", "a"))
+    await anext(sessions)
+    clock.now += 4
+    await sessions.aclose()
+
+    clock.now += 4
+    assert models.get_read_session_factory(make_request("GET", "a")) is primary
+    assert models.get_read_session_factory(make_request("GET", "b")) is replica
+
+    # reads do not extend the window
+    sessions = models.get_session(make_request("GET", "a"))
+    await anext(sessions)
+    await sessions.aclose()
+
+    clock.now += 2
+    assert models.get_read_session_factory(make_request("GET", "a")) is replica
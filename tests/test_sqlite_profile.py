@@ -0,0 +1,154 @@
+import httpx
+import pytest
+from sqlalchemy import text
+
+from flasx import models
+from flasx.main import app
+
+
+@pytest.fixture
+async def performance_client(tmp_path, monkeypatch):
+    """Client of the app started on a file database in performance mode."""
+    monkeypatch.setenv("SQLDB_URL", f"sqlite+aiosqlite:///{tmp_path / 'flasx.db'}")
+    monkeypatch.setenv("SQLITE_PERFORMANCE_MODE", "true")
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path / "exports"))
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost:8000"
+        ) as client:
+            yield client
+
+
+@pytest.mark.asyncio
+async def test_performance_profile_pragmas(performance_client):
+    async with models.engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 0
+    async with models.read_engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_performance_profile_ignores_read_url(tmp_path, monkeypatch, caplog):
+    database = f"sqlite+aiosqlite:///{tmp_path / 'flasx.db'}"
+    monkeypatch.setenv("SQLDB_URL", database)
+    monkeypatch.setenv("SQLDB_READ_URL", database)
+    monkeypatch.setenv("SQLITE_PERFORMANCE_MODE", "true")
+
+    await models.init_engines()
+    try:
+        assert "SQLDB_READ_URL is ignored" in caplog.text
+        assert models.read_engine is not models.engine
+    finally:
+        await models.engine.dispose()
+        await models.read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_performance_profile_write_then_delete(performance_client):
+    client = performance_client
+
+    customer_ids = []
+    for name in ["Sender", "Receiver"]:
+        response = await client.post(
+            "/v1/customers",
+            json={"name": name, "email": f"{name.lower()}@example.com", "phone": "0"},
+        )
+        assert response.status_code == 201
+        customer_ids.append(response.json()["id"])
+
+    station_ids = []
+    for code in ["BKK", "HDY"]:
+        response = await client.post(
+            "/v1/stations",
+            json={
+                "name": f"Station {code}",
+                "code": code,
+                "address": "1 Road",
+                "city": "City",
+                "state": "State",
+                "postal_code": "90110",
+            },
+        )
+        assert response.status_code == 201
+        station_ids.append(response.json()["id"])
+    response = await client.put(
+        f"/v1/stations/{station_ids[0]}/links/{station_ids[1]}",
+        json={"transit_minutes": 60},
+    )
+    assert response.status_code == 200
+
+    vehicle = await client.post(
+        "/v1/vehicles",
+        json={
+            "license_plate": "1AB 234",
+            "type": "van",
+            "capacity": 500,
+            "station_id": station_ids[0],
+        },
+    )
+    staff = await client.post(
+        "/v1/delivery-staff",
+        json={
+            "name": "Courier",
+            "email": "courier@example.com",
+            "phone": "0",
+            "employee_id": "E1",
+        },
+    )
+
+    response = await client.post(
+        "/v1/parcels",
+        json={
+            "tracking_number": "",
+            "weight": 1.5,
+            "length": 20,
+            "width": 10,
+            "height": 5,
+            "service_price": "45.00",
+            "sender_id": customer_ids[0],
+            "receiver_id": customer_ids[1],
+            "origin_station_id": station_ids[0],
+            "destination_station_id": station_ids[1],
+        },
+    )
+    assert response.status_code == 201
+    parcel = response.json()
+    for path, params in [
+        ("status", {"status": "in_transit", "station_id": station_ids[1]}),
+        ("assign-vehicle", {"vehicle_id": vehicle.json()["id"]}),
+        ("assign-delivery-staff", {"delivery_staff_id": staff.json()["id"]}),
+    ]:
+        response = await client.patch(
+            f"/v1/parcels/{parcel['id']}/{path}", params=params
+        )
+        assert response.status_code == 200
+
+    # every referenced row can go, foreign keys are enforced
+    for path in [
+        f"/v1/vehicles/{vehicle.json()['id']}",
+        f"/v1/delivery-staff/{staff.json()['id']}",
+        f"/v1/stations/{station_ids[0]}",
+        f"/v1/stations/{station_ids[1]}",
+    ]:
+        response = await client.delete(path)
+        assert response.status_code == 204, path
+
+    response = await client.get(f"/v1/parcels/{parcel['id']}")
+    data = response.json()
+    assert data["vehicle_id"] is None
+    assert data["delivery_staff_id"] is None
+    assert data["origin_station_id"] is None
+    assert data["destination_station_id"] is None
+
+    response = await client.delete(f"/v1/customers/{customer_ids[0]}")
+    assert response.status_code == 409
+
+    response = await client.delete(f"/v1/parcels/{parcel['id']}")
+    assert response.status_code == 204
+    for customer_id in customer_ids:
+        response = await client.delete(f"/v1/customers/{customer_id}")
+        assert response.status_code == 204
@@ -0,0 +1,34 @@
+import pytest
+
+from base import session, engine, client
+
+from flasx.models import CacheVersion
+
+
+@pytest.mark.asyncio
+async def test_station_directory(client, session, create_station):
+    bkk = await create_station("BKK", "Bangkok", "Bangkok")
+    bpl = await create_station("BPL", "Bang Phli", "Samut Prakan")
+    hdy = await create_station("HDY", "Hat Yai", "Songkhla")
+
+    response = await client.get("/v1/stations?city=bang")
+    assert [station["id"] for station in response.json()] == [bkk, bpl]
+    response = await client.get("/v1/stations?code=B&state=samut")
+    assert [station["id"] for station in response.json()] == [bpl]
+
+    response = await client.get("/v1/stations?sort=created_at&limit=2")
+    assert [station["id"] for station in response.json()] == [bkk, bpl]
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(f"/v1/stations?sort=created_at&cursor={cursor}")
+    assert [station["id"] for station in response.json()] == [hdy]
+
+    await client.put(f"/v1/stations/{hdy}", json={"city": "Songkhla"})
+    response = await client.get("/v1/stations/code/HDY")
+    assert response.json()["city"] == "Songkhla"
+
+    await client.delete(f"/v1/stations/{bpl}")
+    response = await client.get(f"/v1/stations/{bpl}")
+    assert response.status_code == 404
+
+    version = await session.get(CacheVersion, "station")
+    assert version.version == 5
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from base import session, engine, client
+
+from flasx.core import station_geo
+
+
+def test_kd_tree_matches_brute_force():
+    rng = np.random.default_rng(5)
+    points = station_geo.unit_vectors(
+        rng.uniform(-60, 70, 2000), rng.uniform(-180, 180, 2000)
+    )
+    tree = station_geo.KdTree(points)
+
+    for query in station_geo.unit_vectors(
+        rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50)
+    ):
+        expected = np.argsort(np.linalg.norm(points - query, axis=1))[:7]
+        assert [index for _, index in tree.query(query.tolist(), 7)] == list(expected)
+
+
+def test_postal_code_trie():
+    trie = station_geo.PostalCodeTrie(
+        [("90110", 1), ("90112", 2), ("90250", 3), ("10200", 4)]
+    )
+
+    assert trie.query("90112", 1) == [2]
+    assert trie.query("90119", 3) == [1, 2, 3]
+    assert trie.query("50000", 2) == [4, 1]
+
+
+@pytest.mark.asyncio
+async def test_nearest_stations(client, create_station):
+    bkk = await create_station(
+        "BKK", postal_code="10200", latitude=13.7563, longitude=100.5018
+    )
+    cnx = await create_station(
+        "CNX", postal_code="50000", latitude=18.7883, longitude=98.9853
+    )
+    hdy = await create_station(
+        "HDY", postal_code="90110", latitude=7.0086, longitude=100.4747
+    )
+    sgz = await create_station("SGZ", postal_code="90000")
+
+    response = await client.get("/v1/stations/nearest?lat=7.2&lon=100.6&k=2")
+    assert response.status_code == 200
+    nearest = response.json()
+    assert [station["id"] for station in nearest] == [hdy, bkk]
+    assert nearest[0]["distance_km"] == pytest.approx(25, abs=2)
+
+    response = await client.get("/v1/stations/nearest?postal_code=90120&k=2")
+    assert [station["id"] for station in response.json()] == [hdy, sgz]
+    assert response.json()[0]["distance_km"] is None
+
+    await client.put(f"/v1/stations/{cnx}", json={"is_active": False})
+    response = await client.get("/v1/stations/nearest?lat=18.8&lon=99&k=1")
+    assert [station["id"] for station in response.json()] == [bkk]
+
+    response = await client.get("/v1/stations/nearest?lat=7.2")
+    assert response.status_code == 400
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from base import session, engine, client
+
+from flasx.core import station_routing
+from flasx.core.station_routing import RoutingTable
+
+
+@pytest.fixture(autouse=True)
+def reset_routing_table():
+    station_routing.reset_routing_table()
+    yield
+    station_routing.reset_routing_table()
+
+
+def assert_same_paths(table: RoutingTable, links: dict):
+    rebuilt = RoutingTable(
+        (from_id, to_id, minutes, cost)
+        for (from_id, to_id), (minutes, cost) in links.items()
+    )
+    for from_id in table.station_ids:
+        for to_id in table.station_ids:
+            expected = rebuilt.next_hop(from_id, to_id)
+            actual = table.next_hop(from_id, to_id)
+            if expected is None:
+                assert actual is None
+            else:
+                assert actual.transit_minutes == pytest.approx(expected.transit_minutes)
+                assert actual.cost == pytest.approx(expected.cost)
+
+
+def test_routing_table_next_hop():
+    table = RoutingTable([(1, 2, 60, 10), (2, 3, 60, 10), (1, 3, 180, 5)])
+
+    assert table.next_hop(1, 3) == (2, 120, 20)
+    assert table.next_hop(3, 1) is None
+    assert table.next_hop(1, 1) == (1, 0, 0)
+
+    table.set_link(2, 3, 150, 10)
+    assert table.next_hop(1, 3) == (3, 180, 5)
+
+    table.set_link(1, 4, 10)
+    table.set_link(4, 3, 10)
+    assert table.next_hop(1, 3) == (4, 20, 0)
+
+    table.remove_station(4)
+    assert table.next_hop(1, 3) == (3, 180, 5)
+
+
+def test_routing_table_incremental_updates_match_rebuild():
+    rng = np.random.default_rng(7)
+    table = RoutingTable()
+    links = {}
+    for _ in range(300):
+        from_id, to_id = (int(id) for id in rng.choice(25, 2, replace=False))
+        if links and rng.random() < 0.3:
+            from_id, to_id = list(links)[rng.integers(len(links))]
+            del links[from_id, to_id]
+            table.remove_link(from_id, to_id)
+        else:
+            minutes = float(rng.integers(10, 300))
+            cost = float(rng.integers(0, 50))
+            links[from_id, to_id] = (minutes, cost)
+            table.set_link(from_id, to_id, minutes, cost)
+
+    assert_same_paths(table, links)
+
+
+@pytest.mark.asyncio
+async def test_next_hop(client, create_station):
+    bkk, nsn, hdy = [await create_station(code) for code in "BKK NSN HDY".split()]
+
+    response = await client.get(f"/v1/stations/{bkk}/next-hop?destination={hdy}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No route to destination"
+
+    for from_id, to_id, minutes in [(bkk, nsn, 240), (nsn, hdy, 300), (bkk, hdy, 900)]:
+        response = await client.put(
+            f"/v1/stations/{from_id}/links/{to_id}",
+            json={"transit_minutes": minutes, "cost": 100},
+        )
+        assert response.status_code == 200
+
+    response = await client.get(f"/v1/stations/{bkk}/next-hop?destination={hdy}")
+    assert response.json() == {
+        "station_id": bkk,
+        "destination_station_id": hdy,
+        "next_station_id": nsn,
+        "transit_minutes": 540,
+        "cost": 200,
+    }
+
+    response = await client.delete(f"/v1/stations/{bkk}/links/{nsn}")
+    assert response.status_code == 204
+    response = await client.get(f"/v1/stations/{bkk}/next-hop?destination={hdy}")
+    assert response.json()["next_station_id"] == hdy
+
+    response = await client.get(f"/v1/stations/{bkk}/links")
+    assert [link["to_station_id"] for link in response.json()] == [hdy]
+
+    response = await client.get(f"/v1/stations/{bkk}/next-hop?destination=999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Station not found"
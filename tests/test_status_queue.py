@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from base import session, engine, client, auth_headers
+from test_parcel import customers, parcel_data
+
+from flasx.core.status_queue import StatusWriteQueue, get_status_queue
+from flasx.main import app
+
+
+@pytest.fixture
+async def status_queue(engine, client):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queue = StatusWriteQueue(session_factory, interval=0.01, max_items=100)
+    queue.start()
+    app.dependency_overrides[get_status_queue] = lambda: queue
+    yield queue
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_status_update_is_queued(client, parcel_data, status_queue, auth_headers):
+    parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    response = await client.patch(
+        f"/v1/parcels/{parcel['id']}/status", params={"status": "in_transit"}
+    )
+    assert response.status_code == 202
+    assert response.json()["committed"] is True
+
+    response = await client.get(f"/v1/parcels/{parcel['id']}")
+    assert response.json()["status"] == "in_transit"
+
+    response = await client.get("/v1/admin/status-queue", headers=auth_headers)
+    assert response.json()["flushed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_status_update_of_missing_parcel(client, status_queue):
+    response = await client.patch(
+        "/v1/parcels/999999/status", params={"status": "in_transit"}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_status_updates_are_coalesced(client, parcel_data, engine):
+    parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queue = StatusWriteQueue(session_factory, interval=60, max_items=100)
+    first = queue.submit(parcel["id"], "in_transit")
+    second = queue.submit(parcel["id"], "at_destination")
+    await queue.close()
+
+    assert await first and await second
+    assert queue.stats()["coalesced"] == 1
+    assert queue.stats()["flushes"] == 1
+
+    response = await client.get(f"/v1/parcels/{parcel['id']}")
+    assert response.json()["status"] == "at_destination"
+
+    response = await client.get(
+        f"/v1/parcels/track/{parcel['tracking_number']}/timeline"
+    )
+    statuses = [event["status"] for event in response.json()["events"]]
+    assert statuses == ["created", "in_transit", "at_destination"]
+
+
+@pytest.mark.asyncio
+async def test_failed_accepted_updates_are_counted(engine, caplog):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queue = StatusWriteQueue(
+        session_factory, interval=60, max_items=100, durability="accepted"
+    )
+
+    async def fail(pending, events):
+        raise ConnectionError("database is gone")
+
+    queue._write = fail
+    queue.submit(1, "in_transit")
+    queue.submit(2, "in_transit")
+    with pytest.raises(ConnectionError):
+        await queue.close()
+    await asyncio.sleep(0)
+
+    assert queue.stats()["failed"] == 2
+    assert "Lost the status update of parcel 1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_status_update_of_missing_station(client, parcel_data, status_queue):
+    parcel = (await client.post("/v1/parcels", json=parcel_data)).json()
+
+    response = await client.patch(
+        f"/v1/parcels/{parcel['id']}/status",
+        params={"status": "in_transit", "station_id": 999999},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Station not found"
+    assert status_queue.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_written_one_by_one(
+    client, parcel_data, stations, engine
+):
+    parcels = [(await client.post("/v1/parcels", json=parcel_data)).json()]
+    parcels.append((await client.post("/v1/parcels", json=parcel_data)).json())
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queue = StatusWriteQueue(session_factory, interval=60, max_items=100)
+    write = queue._write
+
+    async def write_rejecting_second_parcel(pending, events):
+        # the in-memory test database does not enforce foreign keys
+        if parcels[1]["id"] in pending:
+            raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY failed"))
+        return await write(pending, events)
+
+    queue._write = write_rejecting_second_parcel
+    good = queue.submit(parcels[0]["id"], "in_transit", stations[1])
+    bad = queue.submit(parcels[1]["id"], "in_transit", 999999)
+    await queue.close()
+
+    assert await good is True
+    with pytest.raises(IntegrityError):
+        await bad
+    await asyncio.sleep(0)
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["flushed"] == 1
+
+    response = await client.get(f"/v1/parcels/{parcels[0]['id']}")
+    assert response.json()["status"] == "in_transit"
+    response = await client.get(f"/v1/parcels/{parcels[1]['id']}")
+    assert response.json()["status"] == "created"
@@ -0,0 +1,104 @@
+import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from base import engine
+
+from flasx.core import tracking
+
+
+def test_tracking_numbers_are_unique():
+    generator = tracking.TrackingNumberGenerator(node_id=7)
+    numbers = [generator.next() for _ in range(10_000)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert numbers == sorted(numbers)
+
+
+def test_tracking_numbers_differ_between_nodes():
+    first = tracking.TrackingNumberGenerator(node_id=1)
+    second = tracking.TrackingNumberGenerator(node_id=2)
+
+    numbers = {first.next() for _ in range(1000)}
+    numbers |= {second.next() for _ in range(1000)}
+    assert len(numbers) == 2000
+
+
+def test_tracking_number_check_character():
+    tracking_number = tracking.TrackingNumberGenerator(node_id=42).next()
+    assert len(tracking_number) == 22
+    assert tracking.is_valid_tracking_number(tracking_number)
+
+    # any single substituted character breaks the check
+    for position in range(11, len(tracking_number)):
+        for char in "0Z":
+            if tracking_number[position] == char:
+                continue
+            changed = (
+                tracking_number[:position] + char + tracking_number[position + 1 :]
+            )
+            assert not tracking.is_valid_tracking_number(changed)
+
+
+@pytest.mark.parametrize(
+    "tracking_number,valid",
+    [
+        ("PKG20250101A1B2C3", True),  # legacy random suffix
+        ("PKG20250101A1B2C", False),
+        ("pkg20250101A1B2C3", False),
+        ("PKG2025010", False),
+        ("", False),
+    ],
+)
+def test_tracking_number_format(tracking_number, valid):
+    assert tracking.is_valid_tracking_number(tracking_number) is valid
+
+
+def test_node_id_range():
+    with pytest.raises(ValueError):
+        tracking.TrackingNumberGenerator(node_id=tracking.NODE_COUNT)
+
+
+@pytest.mark.asyncio
+async def test_lease_node_ids(engine, monkeypatch):
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(tracking, "generator", None)
+    monkeypatch.setattr(tracking, "NODE_COUNT", 2)
+
+    leases = []
+    for pid in [1, 2]:
+        monkeypatch.setattr(
+            tracking, "get_owner", lambda: {"hostname": "h", "pid": pid}
+        )
+        async with session_factory() as session:
+            leases.append(await tracking.take_node(session, ttl=60))
+    assert [lease[0] for lease in leases] == [0, 1]
+
+    # every node id is held
+    monkeypatch.setattr(tracking, "get_owner", lambda: {"hostname": "h", "pid": 3})
+    async with session_factory() as session:
+        with pytest.raises(RuntimeError):
+            await tracking.take_node(session, ttl=60)
+
+    # the holder of node 1 stops, its last sequence is kept for the next holder
+    monkeypatch.setattr(tracking, "get_owner", lambda: {"hostname": "h", "pid": 2})
+    tracking.set_node_id(1)
+    last_number = tracking.generate_tracking_number()
+    assert await tracking.store_node_lease(
+        session_factory, datetime.datetime.now() - datetime.timedelta(seconds=1)
+    )
+
+    monkeypatch.setattr(tracking, "get_owner", lambda: {"hostname": "h", "pid": 3})
+    async with session_factory() as session:
+        node_id, day, sequence = await tracking.take_node(session, ttl=60)
+    assert node_id == 1
+    assert (day, sequence) == tracking.generator.high_water()
+
+    generator = tracking.TrackingNumberGenerator(node_id, day, sequence)
+    assert generator.next() > last_number
+
+    # the previous holder lost its lease
+    monkeypatch.setattr(tracking, "get_owner", lambda: {"hostname": "h", "pid": 2})
+    assert not await tracking.store_node_lease(session_factory, datetime.datetime.now())